@@ -0,0 +1,75 @@
+"""
+Finds the hit objects that are on screen at a given playback time.
+
+An object appears when its approach circle fades in, `ar_fadein_ms` before
+it has to be hit. It stays visible until it ends: its hit time for circles,
+and the end of the last slide or spin for sliders and spinners.
+`ApproachWindow` keeps the start and end times as NumPy columns, so the
+visible set can be found with `searchsorted` instead of scanning the map.
+
+- `query()`: The visible objects at any playback time.
+- `advance()`: The same, for a playback time that only moves forward. The
+  window bounds move incrementally from where they were last time, so the
+  cost per call does not grow with the map length.
+"""
+
+import numpy as np
+
+import parser
+
+
+def object_end_times_ms(beatmap_data):
+    """Returns the time each hit object ends (hit time for circles)."""
+    difficulty = beatmap_data["Difficulty"]
+    timing_points = beatmap_data["TimingPoints"]
+    end_times = []
+    for hit_object in beatmap_data["HitObjects"]:
+        if hit_object['type'] & 8:
+            end_times.append(hit_object['endTime'])
+        elif hit_object.get('curveType') is not None:
+            end_times.append(hit_object['time'] + parser.get_slider_duration(hit_object, difficulty, timing_points))
+        else:
+            end_times.append(hit_object['time'])
+    return end_times
+
+
+class ApproachWindow:
+    """
+    Time index of the hit objects visible inside the AR fade-in window.
+
+    Args:
+        beatmap_data (dict): Parsed (and mod-adjusted) beatmap data.
+        ar_fadein_ms (float): How long before its hit time an object appears.
+    """
+
+    def __init__(self, beatmap_data, ar_fadein_ms):
+        hit_objects = beatmap_data["HitObjects"]
+        self.ar_fadein_ms = ar_fadein_ms
+        self.appear_ms = np.array([o['time'] for o in hit_objects], dtype=np.float64) - ar_fadein_ms
+        self.end_ms = np.array(object_end_times_ms(beatmap_data), dtype=np.float64)
+        # Long sliders can end after later objects, so bound the search with the
+        # running maximum: every object before `lo` has certainly ended.
+        self._end_cummax = np.maximum.accumulate(self.end_ms) if len(hit_objects) else self.end_ms
+        self._lo = 0
+        self._hi = 0
+
+    def _visible(self, lo, hi, now_ms):
+        if hi <= lo:
+            return []
+        candidates = np.arange(lo, hi)
+        return candidates[self.end_ms[lo:hi] >= now_ms].tolist()
+
+    def query(self, now_ms):
+        """Returns the indices of the objects visible at `now_ms`, in hit order."""
+        hi = int(np.searchsorted(self.appear_ms, now_ms, side='right'))
+        lo = int(np.searchsorted(self._end_cummax, now_ms, side='left'))
+        return self._visible(lo, hi, now_ms)
+
+    def advance(self, now_ms):
+        """Like `query()`, but moves the window forward from its last position."""
+        count = self.appear_ms.size
+        if self._hi < count and self.appear_ms[self._hi] <= now_ms:
+            self._hi += int(np.searchsorted(self.appear_ms[self._hi:], now_ms, side='right'))
+        if self._lo < self._hi and self._end_cummax[self._lo] < now_ms:
+            self._lo += int(np.searchsorted(self._end_cummax[self._lo:self._hi], now_ms, side='left'))
+        return self._visible(self._lo, self._hi, now_ms)
@@ -0,0 +1,37 @@
+"""
+Learns how early key presses must be started to land on time.
+
+`config.TIMING_OFFSET_MS` is a static, hand-tuned constant, but the real
+cost of sending a key event changes with machine load and with the input
+API. The `EmitLeadEstimator` watches every key-down the executor sends,
+measures the gap between the moment the press was meant to go out and the
+moment the emit call returned, and keeps an exponentially smoothed estimate
+of that gap. The executor starts each later press earlier by the current
+estimate, so drift is corrected without manual tuning.
+
+The learned value is persisted in `settings.json` between runs.
+"""
+
+import config
+
+
+class EmitLeadEstimator:
+    """
+    Exponentially smoothed estimate of the key-emit lead time.
+
+    Attributes:
+        lead_sec (float): How much earlier than its target each key press
+                          should be started.
+        samples (int): Number of emits observed since construction.
+    """
+
+    def __init__(self, initial_lead_sec=0.0, smoothing=None, max_lead_sec=None):
+        self.smoothing = config.AUTO_OFFSET_SMOOTHING if smoothing is None else smoothing
+        self.max_lead_sec = (config.AUTO_OFFSET_MAX_MS / 1000.0) if max_lead_sec is None else max_lead_sec
+        self.lead_sec = min(max(initial_lead_sec, 0.0), self.max_lead_sec)
+        self.samples = 0
+
+    def observe(self, gap_sec):
+        gap_sec = min(max(gap_sec, 0.0), self.max_lead_sec)
+        self.lead_sec += self.smoothing * (gap_sec - self.lead_sec)
+        self.samples += 1
@@ -0,0 +1,76 @@
+"""
+Provides the clock and input backends used by the Pilot executor.
+
+The executor never talks to the system clock or the input APIs directly.
+Instead it goes through two small objects that can be swapped out, which
+lets the same executor code drive the real game or run headless against a
+virtual clock (see `simulation.py`).
+
+Backends:
+- `SystemClock`: Real monotonic time. `sleep()` really sleeps and
+  `wait_until()` busy-waits for precise timing, exactly like the original
+  executor loops.
+- `DirectInputBackend`: Sends cursor moves and key presses through
+  `pydirectinput` and reads screen geometry through `pyautogui`. Both
+  modules are imported on construction so that importing this module (and
+  `pilot.py`) does not require Windows-only packages.
+"""
+
+import time
+
+
+class SystemClock:
+    """
+    Monotonic time source used during real gameplay.
+
+    Times are `perf_counter` seconds, so they never jump with wall-clock
+    adjustments and can be compared with `perf_counter_ns` hook timestamps.
+    """
+
+    def time(self):
+        return time.perf_counter()
+
+    def from_perf_counter_ns(self, ns):
+        return ns / 1_000_000_000
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def wait_event(self, event, timeout):
+        """Sleeps until `event` is set or `timeout` passes. Returns True if it was set."""
+        return event.wait(timeout)
+
+    def wait_until(self, deadline, should_abort=None):
+        """
+        Busy-waits until `deadline`. Returns False if `should_abort` fired first.
+        """
+        while time.perf_counter() < deadline:
+            if should_abort is not None and should_abort():
+                return False
+        return True
+
+
+class DirectInputBackend:
+    """Emits real input events through pydirectinput."""
+
+    def __init__(self):
+        import pydirectinput
+        import pyautogui
+        pydirectinput.PAUSE = 0
+        self._pydirectinput = pydirectinput
+        self._pyautogui = pyautogui
+
+    def size(self):
+        return self._pyautogui.size()
+
+    def position(self):
+        return self._pyautogui.position()
+
+    def moveTo(self, x, y):
+        self._pydirectinput.moveTo(x, y)
+
+    def keyDown(self, key):
+        self._pydirectinput.keyDown(key)
+
+    def keyUp(self, key):
+        self._pydirectinput.keyUp(key)
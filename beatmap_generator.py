@@ -0,0 +1,259 @@
+"""
+Generates synthetic .osu beatmaps for stress and scaling tests.
+
+Real maps rarely reach the sizes and shapes that show how `parser.py`,
+`mods.py` and the executor scale. `generate_beatmap()` writes a valid
+osu! file format v14 map from a handful of knobs:
+- object count (up to 100k and beyond)
+- share of objects that are stream notes, and stream length
+- share of sliders, their Bezier degree and number of Bezier segments
+- share of perfect-circle sliders, including the edge cases the parser has
+  to survive: collinear points, nearly collinear points (huge radius),
+  almost-full circles and coinciding end points
+- number of uninherited timing points and of SV (inherited) changes
+- share and length of spinners
+
+The same seed and arguments always produce the same file.
+
+- `generate_beatmap()`: Returns the file contents as a string.
+- `write_beatmap()`: Writes one map to disk.
+- `write_corpus()`: Writes the `PRESETS` stress corpus.
+
+Usage (from the repository root):
+    python beatmap_generator.py corpus/                   # all presets
+    python beatmap_generator.py out/ --objects 100000 --sv-changes 5000 --seed 3
+"""
+
+import argparse
+import os
+import random
+
+PLAYFIELD_WIDTH = 512
+PLAYFIELD_HEIGHT = 384
+SLIDER_MULTIPLIER = 1.4
+# Largest distance between stream notes; stays below the executor's
+# STREAM_DISTANCE_THRESHOLD_OSU_PIXELS so generated streams are detected as such.
+STREAM_SPACING = 60
+
+PERFECT_CIRCLE_CASES = ('arc', 'collinear', 'near_collinear', 'near_full', 'coinciding')
+
+# Named stress maps written by `write_corpus()`.
+PRESETS = {
+    "baseline": {"object_count": 1000},
+    "dense_streams": {"object_count": 5000, "stream_density": 0.9, "stream_length": (12, 32)},
+    "slider_heavy": {"object_count": 5000, "slider_share": 0.8},
+    "high_degree_bezier": {"object_count": 2000, "stream_density": 0.0, "slider_share": 1.0,
+                           "perfect_circle_share": 0.0, "bezier_degree": 12, "bezier_segments": 6},
+    "perfect_circles": {"object_count": 2000, "stream_density": 0.0, "slider_share": 1.0,
+                        "perfect_circle_share": 1.0},
+    "sv_heavy": {"object_count": 5000, "slider_share": 0.5, "timing_point_count": 500, "sv_change_count": 5000},
+    "long_spinners": {"object_count": 500, "spinner_share": 0.2, "spinner_length_ms": 8000},
+    "huge": {"object_count": 100000, "timing_point_count": 1000, "sv_change_count": 2000},
+}
+
+
+def _clamp_point(x, y):
+    return (min(max(int(round(x)), 0), PLAYFIELD_WIDTH), min(max(int(round(y)), 0), PLAYFIELD_HEIGHT))
+
+
+def _random_point(rng):
+    return rng.randint(0, PLAYFIELD_WIDTH), rng.randint(0, PLAYFIELD_HEIGHT)
+
+
+def _nearby_point(rng, x, y, spacing):
+    return _clamp_point(x + rng.uniform(-spacing, spacing), y + rng.uniform(-spacing, spacing))
+
+
+def _perfect_circle_points(rng, x, y, case):
+    """Returns the two control points after the head for one perfect-circle case."""
+    if case == 'collinear':
+        dx, dy = rng.randint(20, 80), rng.randint(-40, 40)
+        return [_clamp_point(x + dx, y + dy), _clamp_point(x + 2 * dx, y + 2 * dy)]
+    if case == 'near_collinear':
+        return [_clamp_point(x + 100, y + 1), _clamp_point(x + 200, y)]
+    if case == 'near_full':
+        # Mid point opposite the head, end point just next to it.
+        return [_clamp_point(x + 120, y), _clamp_point(x + 2, y + 3)]
+    if case == 'coinciding':
+        return [_clamp_point(x + 60, y + 60), (x, y)]
+    return [_nearby_point(rng, x, y, 120), _nearby_point(rng, x, y, 120)]
+
+
+def _bezier_points(rng, x, y, degree, segments):
+    """Control points after the head; segments are joined by a repeated (red) point."""
+    points = []
+    last_x, last_y = x, y
+    for segment in range(segments):
+        for _ in range(degree):
+            last_x, last_y = _nearby_point(rng, last_x, last_y, 70)
+            points.append((last_x, last_y))
+        if segment < segments - 1:
+            points.append((last_x, last_y))
+    return points
+
+
+def _timing_section(rng, duration_ms, beat_ms, timing_point_count, sv_change_count):
+    """Returns the timing point lines and a sorted list of `(time, sv_factor)` changes."""
+    entries = []
+    for i in range(max(1, timing_point_count)):
+        time_ms = int(i * duration_ms / max(1, timing_point_count))
+        entries.append((time_ms, 1, f"{time_ms},{beat_ms:.6f},4,2,0,60,1,0"))
+    sv_changes = []
+    for i in range(sv_change_count):
+        time_ms = int((i + 0.5) * duration_ms / sv_change_count)
+        sv_percent = rng.choice((25, 50, 75, 100, 125, 150, 200, 300))
+        entries.append((time_ms, 0, f"{time_ms},{-10000 / sv_percent:.6f},4,2,0,60,0,0"))
+        sv_changes.append((time_ms, sv_percent / 100.0))
+    # Uninherited before inherited at the same time, like the editor writes them.
+    entries.sort(key=lambda e: (e[0], -e[1]))
+    return [line for _, _, line in entries], sv_changes
+
+
+def generate_beatmap(object_count=1000, seed=0, stream_density=0.3, stream_length=(5, 16),
+                     slider_share=0.25, bezier_degree=3, bezier_segments=1, perfect_circle_share=0.2,
+                     timing_point_count=1, sv_change_count=0, spinner_share=0.02,
+                     spinner_length_ms=2000, bpm=180.0, title="Synthetic", artist="Generator",
+                     version=None):
+    """
+    Builds a synthetic beatmap.
+
+    Args:
+        object_count (int): Number of hit objects.
+        seed (int): Seed; the output is a pure function of the arguments.
+        stream_density (float): Share of all objects that are stream notes (0-1).
+        stream_length (tuple): Minimum and maximum notes per stream.
+        slider_share (float): Share of non-stream objects that are sliders.
+        bezier_degree (int): Control points per Bezier segment (excluding its start).
+        bezier_segments (int): Bezier segments per slider.
+        perfect_circle_share (float): Share of sliders that are perfect circles.
+                                      They cycle through `PERFECT_CIRCLE_CASES`.
+        timing_point_count (int): Uninherited (BPM) timing points.
+        sv_change_count (int): Inherited (slider velocity) timing points.
+        spinner_share (float): Share of non-stream objects that are spinners.
+        spinner_length_ms (int): Length of every spinner.
+        bpm (float): Tempo of the map.
+        title, artist, version (str): Metadata, as used in the window title.
+
+    Returns:
+        str: The .osu file contents.
+    """
+    rng = random.Random(seed)
+    beat_ms = 60000.0 / bpm
+    # Chance that the next group is a stream, so that streams make up
+    # `stream_density` of the objects on average.
+    mean_stream_length = (stream_length[0] + stream_length[1]) / 2.0
+    stream_chance = stream_density / (mean_stream_length * (1.0 - stream_density) + stream_density) if stream_density < 1 else 1.0
+    version = version or f"{object_count} objects seed {seed}"
+    # Rough length of the map, only used to spread the timing points over it.
+    estimated_duration_ms = int(object_count * beat_ms * (0.5 + slider_share + spinner_share * spinner_length_ms / beat_ms))
+    timing_lines, sv_changes = _timing_section(rng, estimated_duration_ms, beat_ms,
+                                               timing_point_count, sv_change_count)
+
+    objects = []
+    time_ms = 1000.0
+    x, y = PLAYFIELD_WIDTH // 2, PLAYFIELD_HEIGHT // 2
+    sv_index, sv_factor = 0, 1.0
+    circle_case = 0
+    while len(objects) < object_count:
+        while sv_index < len(sv_changes) and sv_changes[sv_index][0] <= time_ms:
+            sv_factor = sv_changes[sv_index][1]
+            sv_index += 1
+        remaining = object_count - len(objects)
+        roll = rng.random()
+
+        if rng.random() < stream_chance and remaining >= stream_length[0]:
+            for _ in range(min(remaining, rng.randint(*stream_length))):
+                objects.append(f"{x},{y},{int(time_ms)},1,0")
+                x, y = _nearby_point(rng, x, y, STREAM_SPACING)
+                time_ms += beat_ms / 4
+            time_ms += beat_ms / 2
+        elif roll < spinner_share:
+            objects.append(f"256,192,{int(time_ms)},12,0,{int(time_ms + spinner_length_ms)}")
+            time_ms += spinner_length_ms + beat_ms
+        elif roll < spinner_share + slider_share:
+            if rng.random() < perfect_circle_share:
+                curve_type = 'P'
+                points = _perfect_circle_points(rng, x, y, PERFECT_CIRCLE_CASES[circle_case % len(PERFECT_CIRCLE_CASES)])
+                circle_case += 1
+            else:
+                curve_type = 'B'
+                points = _bezier_points(rng, x, y, bezier_degree, bezier_segments)
+            slides = rng.choice((1, 1, 1, 2, 3))
+            pixel_length = rng.randint(60, 320)
+            curve = "|".join(f"{px}:{py}" for px, py in points)
+            objects.append(f"{x},{y},{int(time_ms)},2,0,{curve_type}|{curve},{slides},{pixel_length}")
+            duration_ms = pixel_length / (100.0 * SLIDER_MULTIPLIER * sv_factor) * beat_ms * slides
+            time_ms += duration_ms + beat_ms / 2
+            x, y = _random_point(rng)
+        else:
+            objects.append(f"{x},{y},{int(time_ms)},1,0")
+            x, y = _nearby_point(rng, x, y, 200)
+            time_ms += beat_ms / 2 if rng.random() < 0.5 else beat_ms
+
+    lines = [
+        "osu file format v14", "",
+        "[General]", "AudioFilename: audio.mp3", "Mode: 0", "",
+        "[Metadata]", f"Title:{title}", f"Artist:{artist}", "Creator:beatmap_generator",
+        f"Version:{version}", "",
+        "[Difficulty]", "HPDrainRate:5", "CircleSize:4", "OverallDifficulty:8", "ApproachRate:9",
+        f"SliderMultiplier:{SLIDER_MULTIPLIER}", "SliderTickRate:1", "",
+        "[Events]", "//Break Periods", "",
+        "[TimingPoints]", *timing_lines, "",
+        "[HitObjects]", *objects,
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_beatmap(path, **kwargs):
+    """Writes `generate_beatmap(**kwargs)` to `path` and returns the path."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(generate_beatmap(**kwargs))
+    return path
+
+
+def write_corpus(directory, seed=0, presets=None):
+    """Writes one map per preset in `PRESETS` and returns their paths."""
+    paths = []
+    for name in presets or PRESETS:
+        path = os.path.join(directory, f"{name}.osu")
+        write_beatmap(path, seed=seed, version=name, **PRESETS[name])
+        print(f" -> {path}")
+        paths.append(path)
+    return paths
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Write synthetic .osu beatmaps.")
+    arg_parser.add_argument("output_dir")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--preset", action="append", choices=sorted(PRESETS),
+                            help="Only write these presets (repeatable). Ignored with --objects.")
+    arg_parser.add_argument("--objects", type=int, help="Write one custom map with this many objects.")
+    arg_parser.add_argument("--stream-density", type=float, default=0.3)
+    arg_parser.add_argument("--slider-share", type=float, default=0.25)
+    arg_parser.add_argument("--bezier-degree", type=int, default=3)
+    arg_parser.add_argument("--bezier-segments", type=int, default=1)
+    arg_parser.add_argument("--perfect-circle-share", type=float, default=0.2)
+    arg_parser.add_argument("--timing-points", type=int, default=1)
+    arg_parser.add_argument("--sv-changes", type=int, default=0)
+    arg_parser.add_argument("--spinner-share", type=float, default=0.02)
+    arg_parser.add_argument("--spinner-length-ms", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    if args.objects is None:
+        write_corpus(args.output_dir, args.seed, args.preset)
+        return
+    path = os.path.join(args.output_dir, f"custom_{args.objects}_seed{args.seed}.osu")
+    write_beatmap(path, object_count=args.objects, seed=args.seed, stream_density=args.stream_density,
+                  slider_share=args.slider_share, bezier_degree=args.bezier_degree,
+                  bezier_segments=args.bezier_segments, perfect_circle_share=args.perfect_circle_share,
+                  timing_point_count=args.timing_points, sv_change_count=args.sv_changes,
+                  spinner_share=args.spinner_share, spinner_length_ms=args.spinner_length_ms)
+    print(f" -> {path}")
+
+
+if __name__ == "__main__":
+    main()
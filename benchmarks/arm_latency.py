@@ -0,0 +1,202 @@
+"""
+End-to-end benchmark: window title change until the Pilot is ARMED.
+
+Builds a fake osu! directory whose Songs folder holds thousands of filler
+mapsets, plus a few target maps of realistic size from `beatmap_generator`.
+A real Pilot runs on a background thread with a `ScriptedTitleWatcher` and
+headless backends. For every target, the benchmark sets the in-map window
+title, waits for the ARMED status, then goes back to the menu title.
+
+Each target is loaded twice:
+- cold: the first load in this process (parse cache miss)
+- warm: the same title again (parse cache hit)
+The operating system's file cache cannot be dropped from here, so "cold"
+does not include disk latency for a map that was never read before.
+
+For each pass, the report shows the end-to-end latency and the Pilot's own
+phase timers for each stage: folder lookup, file read, parse and mod
+application. Runs headless: no Windows modules or overlay.
+
+Usage (from the repository root):
+    python -m benchmarks.arm_latency
+    python -m benchmarks.arm_latency --mapsets 5000 --mods HR,DT --json arm.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import beatmap_generator
+import parser
+import utils
+from mods import ModHandler
+from pilot import Pilot
+from simulation import HeadlessOverlay, RecordingInput, VirtualClock
+from window_watcher import ScriptedTitleWatcher
+
+MAPSETS = 2000
+DIFFICULTIES = 4
+# Object counts of the target maps; one mapset each.
+TARGET_OBJECTS = (300, 600, 1000, 1500, 2500, 4000)
+FILLER_OBJECTS = 50
+MENU_TITLE = "osu!"
+STATE_TIMEOUT_SEC = 30.0
+
+STAGES = ('beatmap_lookup', 'beatmap_read', 'beatmap_parse', 'apply_mods')
+
+
+class _StatusOverlay(HeadlessOverlay):
+    """Headless overlay that lets the benchmark wait for a Pilot state."""
+
+    def __init__(self):
+        super().__init__()
+        self.status = None
+        self._changed = threading.Condition()
+
+    def update_status(self, status):
+        with self._changed:
+            self.status = status
+            self._changed.notify_all()
+
+    def wait_for(self, status, timeout=STATE_TIMEOUT_SEC):
+        with self._changed:
+            if not self._changed.wait_for(lambda: self.status == status, timeout):
+                raise TimeoutError(f"Pilot did not reach {status} (last status: {self.status})")
+
+
+class _BenchmarkPilot(Pilot):
+    def _setup_hotkeys(self):
+        pass
+
+
+def build_library(osu_dir, mapsets, difficulties, seed=0):
+    """
+    Writes `Songs/` under `osu_dir` and returns the window titles of the targets.
+
+    Mapset folders are named `"<id> <Artist> - <Title>"` and their files
+    `"<Artist> - <Title> (<creator>) [<Version>].osu"`, like osu! does.
+    The targets get the highest ids, the way newly downloaded maps do.
+    """
+    songs_dir = os.path.join(osu_dir, "Songs")
+    os.makedirs(songs_dir)
+    with open(os.path.join(osu_dir, "osu!.db"), 'wb'):
+        pass
+    filler_text = beatmap_generator.generate_beatmap(object_count=FILLER_OBJECTS, seed=seed)
+    versions = ["Easy", "Normal", "Hard", "Insane", "Expert", "Extra"]
+    for set_id in range(mapsets):
+        artist, title = f"Filler Artist {set_id:05d}", f"Filler Song {set_id:05d}"
+        folder = os.path.join(songs_dir, f"{100000 + set_id} {artist} - {title}")
+        os.mkdir(folder)
+        for i in range(difficulties):
+            version = versions[i % len(versions)] + (f" {i}" if i >= len(versions) else "")
+            with open(os.path.join(folder, f"{artist} - {title} (mapper) [{version}].osu"), 'w') as f:
+                f.write(filler_text)
+
+    titles = []
+    for i, object_count in enumerate(TARGET_OBJECTS):
+        artist, title, version = "Bench Artist", f"Target Song {chr(ord('A') + i)}", f"{object_count} Objects"
+        folder = os.path.join(songs_dir, f"{900000 + i} {artist} - {title}")
+        os.mkdir(folder)
+        beatmap_generator.write_beatmap(os.path.join(folder, f"{artist} - {title} (mapper) [{version}].osu"),
+                                        object_count=object_count, seed=seed + i,
+                                        artist=artist, title=title, version=version)
+        titles.append(f"{MENU_TITLE}  - {artist} - {title} [{version}]")
+    return titles
+
+
+def _arm(pilot, overlay, watcher, window_title):
+    """Returns `(end_to_end_ms, {stage: ms})` for one title change."""
+    # Stay in the menu for one debounce window first, like a player picking
+    # the next map; otherwise the change would be merged as part of a burst.
+    time.sleep(watcher.debounce_sec)
+    started = time.perf_counter()
+    watcher.set_title(window_title)
+    overlay.wait_for("ARMED")
+    end_to_end_ms = (time.perf_counter() - started) * 1000
+    watcher.set_title(MENU_TITLE)
+    overlay.wait_for("IDLE")
+    # The timers are only reset by the next load, so they still hold this one.
+    summary = pilot.phases.summary()
+    stages = {stage: summary.get(stage, {}).get('ms', 0.0) for stage in STAGES}
+    return end_to_end_ms, stages
+
+
+def run(mapsets=MAPSETS, difficulties=DIFFICULTIES, mods=(), debounce_ms=0.0, seed=0):
+    """
+    Returns `{'cold': [...], 'warm': [...]}`, one `{'title', 'end_to_end_ms',
+    <stage>...}` dict per target map and pass.
+    """
+    results = {'cold': [], 'warm': []}
+    with tempfile.TemporaryDirectory() as osu_dir:
+        build_started = time.perf_counter()
+        titles = build_library(osu_dir, mapsets, difficulties, seed)
+        print(f" -> Built {mapsets} mapsets x {difficulties} difficulties + {len(titles)} targets "
+              f"in {time.perf_counter() - build_started:.1f}s.")
+
+        saved_paths = utils._OSU_PATHS_CACHE
+        utils._OSU_PATHS_CACHE = utils._osu_paths_for(osu_dir)
+        parser._parse_cache.clear()
+        mod_handler = ModHandler()
+        mod_handler.active_mods = set(mods)
+        rng = random.Random(seed)
+        clock = VirtualClock(rng)
+        overlay = _StatusOverlay()
+        watcher = ScriptedTitleWatcher(MENU_TITLE, debounce_sec=debounce_ms / 1000.0)
+        pilot = _BenchmarkPilot(overlay, 0.0, mod_handler, clock=clock,
+                                input_backend=RecordingInput(clock, rng), seed=seed, window_watcher=watcher)
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                threading.Thread(target=pilot.run, daemon=True).start()
+                overlay.wait_for("IDLE")
+                for pass_name in ('cold', 'warm'):
+                    for window_title in titles:
+                        end_to_end_ms, stages = _arm(pilot, overlay, watcher, window_title)
+                        results[pass_name].append(dict(stages, title=window_title, end_to_end_ms=end_to_end_ms))
+        finally:
+            utils._OSU_PATHS_CACHE = saved_paths
+    return results
+
+
+def format_results(results):
+    columns = ('end_to_end_ms',) + STAGES
+    lines = [f"{'pass':<6}" + "".join(f"{name.replace('beatmap_', '').replace('_ms', ''):>16}" for name in columns)]
+    for pass_name, rows in results.items():
+        medians = [statistics.median(row[name] for row in rows) for name in columns]
+        lines.append(f"{pass_name:<6}" + "".join(f"{value:>14.2f}ms" for value in medians))
+    return "\n".join(lines)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Measure title change to ARMED latency on a synthetic Songs library.")
+    arg_parser.add_argument("--mapsets", type=int, default=MAPSETS, help="Filler mapsets (default %(default)s).")
+    arg_parser.add_argument("--difficulties", type=int, default=DIFFICULTIES,
+                            help="Difficulties per filler mapset (default %(default)s).")
+    arg_parser.add_argument("--mods", default="", help="Comma-separated mods to apply, e.g. HR,DT.")
+    arg_parser.add_argument("--debounce-ms", type=float, default=0.0,
+                            help="Title debounce; the app uses config.TITLE_DEBOUNCE_MS (default %(default)s).")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--json", help="Also write the per-map results to this file.")
+    args = arg_parser.parse_args()
+
+    mods = tuple(mod.strip().upper() for mod in args.mods.split(",") if mod.strip())
+    results = run(args.mapsets, args.difficulties, mods, args.debounce_ms, args.seed)
+    print(f"Median over {len(TARGET_OBJECTS)} maps ({'+'.join(mods) or 'NM'}):")
+    print(format_results(results))
+    if args.json:
+        report = {"mapsets": args.mapsets, "difficulties": args.difficulties, "mods": list(mods),
+                  "debounce_ms": args.debounce_ms, "results": results}
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f" -> Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Benchmark suite for the parser, mod and geometry hot paths.
+
+Times each case with `timeit` (best of `REPEAT` runs) and measures the peak
+memory of one call with `tracemalloc`:
+- `parse_osu_file` on maps of 100 to 100k objects from `beatmap_generator`
+- `calculate_slider_path` for each curve type and control-point count
+- `get_slider_duration` against the number of timing points
+- `ModHandler.apply_mods` for each mod combination
+- `Pilot._find_stream_group` on a stream-heavy map
+- `utils.convert_coordinates`
+
+Results are printed as ops/sec and saved as JSON. With a baseline file,
+every case is compared against it, and the run fails (exit code 1) when a
+case is slower by more than the threshold, or uses more than the threshold
+of extra memory. Runs headless: no Windows modules or overlay.
+
+Usage (from the repository root):
+    python -m benchmarks.hot_paths --save-baseline        # record a baseline
+    python -m benchmarks.hot_paths                        # compare against it
+    python -m benchmarks.hot_paths --threshold 0.1 --filter slider
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+import beatmap_generator
+import parser
+import utils
+from mods import ModHandler
+from pilot import Pilot
+from simulation import HeadlessOverlay, RecordingInput, VirtualClock
+
+REPEAT = 5
+# Each timed run lasts at least this long; the loop count is picked to match.
+MIN_RUN_SEC = 0.05
+# A case regresses when it is this much slower (or uses this much more memory).
+REGRESSION_THRESHOLD = 0.25
+# Memory differences below this are noise (tracemalloc rounding, interning).
+MEMORY_SLACK_BYTES = 4096
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+MOD_COMBINATIONS = [(), ('HR',), ('DT',), ('NC',), ('HR', 'DT'), ('HR', 'NC')]
+
+
+class _NullWriter:
+    """Swallows the progress messages some of the benchmarked functions print."""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _slider(curve_type, control_points, seed=0):
+    rng = random.Random(seed)
+    points = [(rng.randint(0, 512), rng.randint(0, 384)) for _ in range(control_points)]
+    return {'x': points[0][0], 'y': points[0][1], 'time': 1000, 'type': 2, 'curveType': curve_type,
+            'curvePoints': points, 'slides': 1, 'pixelLength': 200.0}
+
+
+def _timing_points(count):
+    return [{'time': i * 100.0, 'beatLength': 500.0 if i % 2 == 0 else -75.0} for i in range(count)]
+
+
+def _headless_pilot(beatmap_data):
+    rng = random.Random(0)
+    clock = VirtualClock(rng)
+    pilot = Pilot(HeadlessOverlay(), 0.0, ModHandler(), clock=clock,
+                  input_backend=RecordingInput(clock, rng), title_source=lambda: "", seed=0)
+    pilot.beatmap_data = beatmap_data
+    return pilot
+
+
+def _parse_case(work_dir, object_count):
+    path = beatmap_generator.write_beatmap(os.path.join(work_dir, f"map_{object_count}.osu"),
+                                           object_count=object_count, seed=0)
+    return lambda: parser.parse_osu_file(path)
+
+
+def _slider_path_case(curve_type, count):
+    slider = _slider(curve_type, count)
+    return lambda: parser.calculate_slider_path(slider)
+
+
+def _slider_duration_case(count):
+    slider = dict(_slider('B', 3), time=count * 100)
+    difficulty = {"SliderMultiplier": 1.4}
+    timing_points = _timing_points(count)
+    return lambda: parser.get_slider_duration(slider, difficulty, timing_points)
+
+
+def _map_1000(work_dir):
+    path = os.path.join(work_dir, "map_1000.osu")
+    if not os.path.exists(path):
+        beatmap_generator.write_beatmap(path, object_count=1000, seed=0)
+    # Shared by the mod and stream cases through the parse cache; neither modifies it.
+    return parser.load_osu_file(path)
+
+
+def _apply_mods_case(work_dir, mods):
+    beatmap_data = _map_1000(work_dir)
+    handler = ModHandler()
+    handler.active_mods = set(mods)
+    return lambda: handler.apply_mods(beatmap_data)
+
+
+def _stream_group_case(work_dir):
+    beatmap_data = _map_1000(work_dir)
+    pilot = _headless_pilot(beatmap_data)
+    object_count = len(beatmap_data["HitObjects"])
+    return lambda: [pilot._find_stream_group(i) for i in range(0, object_count, 20)]
+
+
+def build_cases(work_dir):
+    """
+    Returns `[(name, factory)]` for every benchmark case.
+
+    A factory builds the case's fixtures and returns the callable to time.
+    It is only called for cases that pass the filter.
+    """
+    cases = []
+    for object_count in (100, 1000, 10000, 100000):
+        cases.append((f"parse_osu_file[{object_count} objects]",
+                      lambda object_count=object_count: _parse_case(work_dir, object_count)))
+
+    for curve_type, counts in (('L', (2,)), ('P', (3,)), ('B', (3, 5, 10, 20))):
+        for count in counts:
+            cases.append((f"calculate_slider_path[{curve_type}, {count} points]",
+                          lambda curve_type=curve_type, count=count: _slider_path_case(curve_type, count)))
+
+    for count in (2, 100, 1000, 5000):
+        cases.append((f"get_slider_duration[{count} timing points]",
+                       lambda count=count: _slider_duration_case(count)))
+
+    for mods in MOD_COMBINATIONS:
+        cases.append((f"apply_mods[{'+'.join(mods) or 'NM'}]", lambda mods=mods: _apply_mods_case(work_dir, mods)))
+
+    cases.append(("find_stream_group[whole map]", lambda: _stream_group_case(work_dir)))
+    cases.append(("convert_coordinates", lambda: lambda: utils.convert_coordinates(256, 192, 1920, 1080)))
+    return cases
+
+
+def measure(func):
+    """Returns `(ops_per_sec, peak_memory_bytes)` for one case."""
+    with contextlib.redirect_stdout(_NullWriter()):
+        timer = timeit.Timer(func)
+        number = 1
+        while timer.timeit(number) < MIN_RUN_SEC:
+            number *= 2
+        best_sec = min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+        tracemalloc.start()
+        func()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return 1.0 / best_sec, peak_bytes
+
+
+def compare(results, baseline, threshold):
+    """Returns a list of `(name, message)` for every case that regressed."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result["ops_per_sec"] < reference["ops_per_sec"] * (1.0 - threshold):
+            regressions.append((name, f"{result['ops_per_sec']:.0f} ops/s vs {reference['ops_per_sec']:.0f} in the baseline"))
+        memory_limit = reference["peak_bytes"] * (1.0 + threshold) + MEMORY_SLACK_BYTES
+        if result["peak_bytes"] > memory_limit:
+            regressions.append((name, f"{result['peak_bytes']} bytes peak vs {reference['peak_bytes']} in the baseline"))
+    return regressions
+
+
+def run(name_filter=None):
+    with tempfile.TemporaryDirectory() as work_dir:
+        cases = build_cases(work_dir)
+        results = {}
+        print(f"{'case':<44}{'ops/sec':>14}{'peak KiB':>11}")
+        for name, factory in cases:
+            if name_filter and name_filter not in name:
+                continue
+            with contextlib.redirect_stdout(_NullWriter()):
+                func = factory()
+            ops_per_sec, peak_bytes = measure(func)
+            results[name] = {"ops_per_sec": ops_per_sec, "peak_bytes": peak_bytes}
+            print(f"{name:<44}{ops_per_sec:>14,.1f}{peak_bytes / 1024:>11.1f}")
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the parser, mod and geometry hot paths.")
+    arg_parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against.")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline.")
+    arg_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                            help="Allowed slowdown / memory growth as a fraction (default %(default)s).")
+    arg_parser.add_argument("--filter", help="Only run cases whose name contains this text.")
+    arg_parser.add_argument("--json", help="Also write the results to this file.")
+    args = arg_parser.parse_args()
+
+    results = run(args.filter)
+    report = {"python": sys.version.split()[0], "machine": platform.machine(),
+              "platform": platform.platform(), "results": results}
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f" -> Results written to {args.json}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get("results", {})
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(report, results=baseline), f, indent=4)
+        print(f" -> Baseline saved: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f" -> No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline.get("results", {}), args.threshold)
+    if not regressions:
+        print(f" -> No regressions beyond {args.threshold:.0%} against {args.baseline}.")
+        return 0
+    for name, message in regressions:
+        print(f" ! Regression in {name}: {message}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
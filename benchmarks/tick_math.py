@@ -0,0 +1,84 @@
+"""
+Microbenchmark for the per-tick math of the executor's motion loops.
+
+Compares the NumPy implementations the motion loops used to run every
+tick against the scalar versions in `fastmath.py`:
+- eased quadratic Bezier step (cursor moves between objects)
+- linear segment interpolation (stream paths)
+
+Usage (from the repository root):
+    python -m benchmarks.tick_math
+"""
+
+import timeit
+
+import numpy as np
+
+import fastmath
+import utils
+
+REPEAT = 5
+NUMBER = 100_000
+
+
+def _numpy_bezier_tick(p0, p1, p2, progress):
+    eased = utils.ease_in_out_sine(min(progress, 1.0))
+    p0, p1, p2 = np.array(p0), np.array(p1), np.array(p2)
+    point = ((1 - eased) ** 2 * p0) + (2 * (1 - eased) * eased * p1) + (eased ** 2 * p2)
+    return int(point[0]), int(point[1])
+
+
+def _scalar_bezier_tick(p0x, p0y, p1x, p1y, p2x, p2y, progress):
+    eased = fastmath.ease_in_out_sine_lut(progress)
+    x, y = fastmath.bezier2(p0x, p0y, p1x, p1y, p2x, p2y, eased)
+    return int(x), int(y)
+
+
+def _numpy_stream_tick(path, progress):
+    segment_progress = progress * (len(path) - 1)
+    path_idx = int(segment_progress)
+    local = segment_progress - path_idx
+    p_start = np.array(path[path_idx])
+    p_end = np.array(path[min(path_idx + 1, len(path) - 1)])
+    pos = p_start * (1 - local) + p_end * local
+    return int(pos[0]), int(pos[1])
+
+
+def _scalar_stream_tick(xs, ys, last_idx, progress):
+    segment_progress = progress * last_idx
+    path_idx = int(segment_progress)
+    local = segment_progress - path_idx
+    next_idx = min(path_idx + 1, last_idx)
+    x, y = fastmath.lerp2(xs[path_idx], ys[path_idx], xs[next_idx], ys[next_idx], local)
+    return int(x), int(y)
+
+
+def _best_ns_per_call(func):
+    return min(timeit.repeat(func, repeat=REPEAT, number=NUMBER)) / NUMBER * 1e9
+
+
+def run():
+    p0, p1, p2 = (100.0, 200.0), (340.5, 120.25), (600.0, 420.0)
+    path = [(100 + i * 40, 300 + (i % 2) * 25) for i in range(8)]
+    xs = [float(x) for x, _ in path]
+    ys = [float(y) for _, y in path]
+
+    results = {
+        "bezier_tick": (
+            _best_ns_per_call(lambda: _numpy_bezier_tick(p0, p1, p2, 0.37)),
+            _best_ns_per_call(lambda: _scalar_bezier_tick(p0[0], p0[1], p1[0], p1[1], p2[0], p2[1], 0.37)),
+        ),
+        "stream_tick": (
+            _best_ns_per_call(lambda: _numpy_stream_tick(path, 0.61)),
+            _best_ns_per_call(lambda: _scalar_stream_tick(xs, ys, len(path) - 1, 0.61)),
+        ),
+    }
+
+    print(f"{'tick':<14}{'numpy (ns)':>12}{'scalar (ns)':>13}{'speed-up':>10}")
+    for name, (before, after) in results.items():
+        print(f"{name:<14}{before:>12.0f}{after:>13.0f}{before / after:>9.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -3,6 +3,9 @@ from tkinter import ttk, font
 import time
 import random
 import statistics
+import threading
+
+import config
 
 class CalibrationState:
     """Class to manage the state of the reaction test."""
@@ -153,4 +156,100 @@ def run_calibration(parent, previous_reaction_time_sec=None):
     
     parent.wait_window(result_window)
     
-    return median_reaction_time
\ No newline at end of file
+    return median_reaction_time
+
+def _summarize_latencies(samples_ns):
+    samples_ms = sorted(ns / 1_000_000 for ns in samples_ns)
+    if not samples_ms:
+        return None
+    p95_index = min(len(samples_ms) - 1, int(round(0.95 * (len(samples_ms) - 1))))
+    return {
+        "samples": len(samples_ms),
+        "median_ms": statistics.median(samples_ms),
+        "p95_ms": samples_ms[p95_index],
+        "min_ms": samples_ms[0],
+        "max_ms": samples_ms[-1],
+    }
+
+
+def run_pipeline_calibration(input_backend, trials=20, key=None, timeout_sec=0.25):
+    """
+    Measures how long the bot's own input pipeline takes to reach the OS.
+
+    Reaction-time calibration only measures the user. This second stage loops
+    synthetic key presses and cursor moves through the same input backend the
+    executor uses and times when the OS actually sees them:
+    1.  Key path: a low-level keyboard hook is installed, then `trials` key
+        presses are sent. Each press is timestamped with `perf_counter_ns`
+        right after the emit call returns and again inside the hook
+        callback. The emit call's own cost is left out (and reported as
+        `key_call`): the executor's `EmitLeadEstimator` already learns and
+        compensates it on every press.
+    2.  Cursor path: the cursor is nudged back and forth by a few pixels and
+        its reported position is polled until it lands, again timestamped
+        with `perf_counter_ns` on both ends.
+
+    Args:
+        input_backend: The executor's input backend (e.g. `DirectInputBackend`).
+        trials (int): Number of presses and moves to measure.
+        key (str, optional): Key to press. Defaults to
+                             `config.PIPELINE_CALIBRATION_KEY`.
+        timeout_sec (float): How long to wait for each event before giving up.
+
+    Returns:
+        dict: `{'key': summary, 'key_call': summary, 'move': summary}` where
+              each summary holds the median/p95/min/max latency in
+              milliseconds, or None if no event of that kind was observed.
+    """
+    import keyboard
+
+    key = key or config.PIPELINE_CALIBRATION_KEY
+    seen = threading.Event()
+    seen_at = {'ns': 0}
+
+    def on_key_event(event):
+        if event.event_type == keyboard.KEY_DOWN and event.name == key and not seen.is_set():
+            seen_at['ns'] = time.perf_counter_ns()
+            seen.set()
+
+    key_samples = []
+    call_samples = []
+    hook = keyboard.hook(on_key_event)
+    try:
+        for _ in range(trials):
+            seen.clear()
+            sent_ns = time.perf_counter_ns()
+            input_backend.keyDown(key)
+            returned_ns = time.perf_counter_ns()
+            call_samples.append(returned_ns - sent_ns)
+            if seen.wait(timeout_sec):
+                # The hook can fire before keyDown returns; that press had no latency left after the call.
+                key_samples.append(max(0, seen_at['ns'] - returned_ns))
+            input_backend.keyUp(key)
+            time.sleep(0.01)
+    finally:
+        keyboard.unhook(hook)
+
+    move_samples = []
+    origin_x, origin_y = input_backend.position()
+    for i in range(trials):
+        target = (origin_x + (3 if i % 2 == 0 else -3), origin_y)
+        sent_ns = time.perf_counter_ns()
+        input_backend.moveTo(*target)
+        deadline_ns = sent_ns + int(timeout_sec * 1_000_000_000)
+        while time.perf_counter_ns() < deadline_ns:
+            if tuple(input_backend.position()) == target:
+                move_samples.append(time.perf_counter_ns() - sent_ns)
+                break
+        time.sleep(0.01)
+    input_backend.moveTo(origin_x, origin_y)
+
+    results = {"key": _summarize_latencies(key_samples), "key_call": _summarize_latencies(call_samples),
+               "move": _summarize_latencies(move_samples)}
+    for name, summary in results.items():
+        if summary:
+            print(f"  Pipeline {name} latency: median {summary['median_ms']:.2f} ms, "
+                  f"p95 {summary['p95_ms']:.2f} ms, max {summary['max_ms']:.2f} ms ({summary['samples']} samples)")
+        else:
+            print(f"  Pipeline {name} latency: no events observed.")
+    return results
@@ -17,4 +17,107 @@ REACTION_TIME_DEFAULT = 0.150
 # Use a negative value (e.g., -5) to hit earlier.
 # Use a positive value (e.g., 5) to hit later.
 # This is useful for fine-tuning accuracy on your specific system.
-TIMING_OFFSET_MS = 0
\ No newline at end of file
+TIMING_OFFSET_MS = 0
+
+# Automatically learn how long sending a key press takes on this machine and
+# start each press that much earlier. Applied on top of TIMING_OFFSET_MS.
+AUTO_TIMING_OFFSET = True
+
+# How quickly the learned lead follows new measurements (0-1, higher is faster).
+AUTO_OFFSET_SMOOTHING = 0.1
+
+# Upper bound for the learned lead, in milliseconds.
+AUTO_OFFSET_MAX_MS = 20
+
+# Measure the bot's own input latency (key press and cursor move to the OS)
+# on startup and start every map that much earlier.
+PIPELINE_CALIBRATION = True
+
+# Key used for the synthetic presses of the input latency measurement.
+# It should be a key that does nothing in the focused window.
+PIPELINE_CALIBRATION_KEY = 'shift'
+
+# When the bot falls behind by more than this many milliseconds, it stops
+# easing the cursor and snaps to the next notes until it is back on time.
+CATCHUP_LATENESS_MS = 15
+
+# During break periods the bot parks the cursor and sleeps. It wakes up this
+# many seconds before the break ends to get ready for the next notes.
+BREAK_REWARM_SEC = 0.5
+
+# How many upcoming objects to prepare when waking up from a break.
+BREAK_PRETOUCH_OBJECTS = 8
+
+# How many 'q' taps to average for synchronization. With a value above 1,
+# keep tapping 'q' as each of the next approach circles appears; the first
+# tap starts the bot and later taps refine its timing.
+SYNC_TAP_COUNT = 1
+
+# The area of the screen the game draws in, as (left, top, width, height) in
+# pixels. Leave as None when osu! runs fullscreen. Set it to the game's
+# client area when playing windowed or letterboxed.
+GAME_WINDOW_RECT = None
+
+# When the window title changes several times in quick succession (e.g. while
+# scrolling through song select), wait until it has been stable this long.
+# The first change after a quiet period is handled immediately.
+TITLE_DEBOUNCE_MS = 100
+
+# How often to check the window title when the Windows event hook is not
+# available.
+TITLE_POLL_INTERVAL_MS = 100
+
+# After a failed map load (osu! not found, no matching .osu file), try again
+# this often while the title stays the same.
+BEATMAP_RETRY_MS = 1000
+
+# --- OVERLAY ---
+
+# Run the overlay window in its own process. Drawing the overlay (especially
+# in Debug Mode) then no longer competes with the bot for the Python
+# interpreter. The effect on the bot's timing has not been measured yet.
+OVERLAY_PROCESS = False
+
+# --- REAL-TIME MODE ---
+
+# While a map is playing, turn off Python's garbage collector (it can pause the
+# bot for milliseconds mid-slider), pin the bot thread to one CPU and raise the
+# process and thread priority where the OS allows it. Everything is restored
+# when the map ends. Off by default, as it takes a core away from other programs.
+REALTIME_MODE = False
+
+# CPU the bot thread is pinned to in real-time mode. None uses the last CPU.
+REALTIME_CPU = None
+
+# --- DIAGNOSTICS ---
+# These settings control the reports the bot writes about its own timing.
+
+# Folder where a per-hit timing report (JSON + CSV) is written after each map.
+# Set to None to disable the export.
+TIMING_REPORT_DIR = "timing_reports"
+
+# Folder where 'Ctrl + End' writes a cProfile (.prof) file of the current map.
+PROFILE_DIR = "profiles"
+
+# Folder where a timeline of each map is written as a Chrome trace
+# (.trace.json, open it in https://ui.perfetto.dev). None disables tracing.
+TRACE_DIR = None
+
+# The timeline is sized from each map's length, at TRACE_SPANS_PER_MS spans per
+# millisecond (a 1ms cursor tick records two or three), but never beyond
+# TRACE_CAPACITY spans: about 11 minutes of play. Only longer maps lose their
+# oldest spans; the map load spans are always kept.
+TRACE_SPANS_PER_MS = 3
+TRACE_CAPACITY = 2000000
+
+# How often the live metrics in the overlay (loop rate, CPU, lateness, cache
+# hit rates) are refreshed, in milliseconds.
+METRICS_SAMPLE_MS = 250
+
+# File the live metrics are written to as JSON on every refresh, for external
+# monitoring. None disables the snapshot.
+METRICS_SNAPSHOT_PATH = None
+
+# Print how long each module took to import during startup, and how long it
+# took until the first window was on screen.
+IMPORT_TIME_REPORT = False
@@ -0,0 +1,49 @@
+"""
+Allocation-free 2D math for the executor's per-tick motion loops.
+
+The motion loops run about once per millisecond and work on 2-element
+points. Wrapping those in `np.array` costs far more than the arithmetic
+itself, so this module works on plain floats and returns plain tuples.
+
+Contents:
+- `ease_in_out_sine_lut()`: `utils.ease_in_out_sine` read from a
+  precomputed lookup table with linear interpolation instead of a `cos`.
+- `bezier2()`: A point on a quadratic Bezier curve from unpacked
+  coordinates.
+- `lerp2()`: Linear interpolation between two unpacked points.
+
+Run `python -m benchmarks.tick_math` to compare the per-tick cost with the
+NumPy version.
+"""
+
+import math
+
+EASE_LUT_SIZE = 1024
+
+_EASE_LUT = [-(math.cos(math.pi * (i / (EASE_LUT_SIZE - 1))) - 1) / 2 for i in range(EASE_LUT_SIZE)]
+_EASE_LUT.append(1.0)  # Guard entry so t == 1.0 can read index + 1.
+_EASE_SCALE = EASE_LUT_SIZE - 1
+
+
+def ease_in_out_sine_lut(t):
+    if t <= 0.0:
+        return 0.0
+    if t >= 1.0:
+        return 1.0
+    pos = t * _EASE_SCALE
+    i = int(pos)
+    frac = pos - i
+    a = _EASE_LUT[i]
+    return a + (_EASE_LUT[i + 1] - a) * frac
+
+
+def bezier2(p0x, p0y, p1x, p1y, p2x, p2y, t):
+    u = 1.0 - t
+    a = u * u
+    b = 2.0 * u * t
+    c = t * t
+    return a * p0x + b * p1x + c * p2x, a * p0y + b * p1y + c * p2y
+
+
+def lerp2(ax, ay, bx, by, t):
+    return ax + (bx - ax) * t, ay + (by - ay) * t
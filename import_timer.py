@@ -0,0 +1,82 @@
+"""
+Built-in import-time report for startup, in the style of `python -X importtime`.
+
+`ImportTimer` wraps `builtins.__import__` on the thread that installs it
+and records each module's first import. Like `-X importtime`, it keeps two
+numbers per module: the time spent in the module itself (`self`) and the
+time including everything it imported in turn (`cumulative`). Imports that
+are already cached pass straight through.
+
+Enable it with `IMPORT_TIME_REPORT` in `config.py`. `main.py` then prints the
+slowest imports and the time until the overlay was on screen.
+"""
+
+import builtins
+import sys
+import threading
+import time
+
+
+class ImportTimer:
+    """
+    Records first-time imports made on the installing thread.
+
+    Attributes:
+        records (list): `(module, self_ms, cumulative_ms, depth)` in import order.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._original_import = None
+        self._thread_id = None
+        self._child_ns = []
+
+    def install(self):
+        self._original_import = builtins.__import__
+        self._thread_id = threading.get_ident()
+        builtins.__import__ = self._import
+        return self
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original_import = self._original_import
+        if threading.get_ident() != self._thread_id:
+            return original_import(name, globals, locals, fromlist, level)
+        module_name = name
+        if level:
+            # Relative import: name it after the importing package.
+            package = (globals or {}).get('__package__') or ''
+            module_name = f"{package}.{name}" if name else package
+        if module_name in sys.modules:
+            return original_import(name, globals, locals, fromlist, level)
+
+        depth = len(self._child_ns)
+        self._child_ns.append(0)
+        start = time.perf_counter_ns()
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            child = self._child_ns.pop()
+            if self._child_ns:
+                self._child_ns[-1] += elapsed
+            self.records.append((module_name, (elapsed - child) / 1e6, elapsed / 1e6, depth))
+
+    @property
+    def total_ms(self):
+        return sum(cumulative for _, _, cumulative, depth in self.records if depth == 0)
+
+    def report(self, top=15):
+        """Prints the slowest top-level imports and the slowest modules overall."""
+        print(f" -> Import time: {self.total_ms:.1f}ms in {len(self.records)} modules.")
+        top_level = sorted((r for r in self.records if r[3] == 0), key=lambda r: r[2], reverse=True)
+        print("    cumulative  top-level import")
+        for name, _, cumulative, _ in top_level[:top]:
+            print(f"    {cumulative:8.1f}ms  {name}")
+        print("    self        module")
+        for name, self_ms, _, _ in sorted(self.records, key=lambda r: r[1], reverse=True)[:top]:
+            print(f"    {self_ms:8.1f}ms  {name}")
@@ -1,12 +1,21 @@
+import time
+STARTED_AT = time.perf_counter()
+
+import config
+if config.IMPORT_TIME_REPORT and __name__ == "__main__":
+    from import_timer import ImportTimer
+    import_timer = ImportTimer().install()
+else:
+    import_timer = None
+
+import sys
 import threading
-import keyboard
 import math
 
 from mods import ModHandler
 from overlay import OverlayWindow
-from pilot import Pilot
 from calibration import run_calibration
-from config import REACTION_TIME_DEFAULT
+from config import REACTION_TIME_DEFAULT, PIPELINE_CALIBRATION, OVERLAY_PROCESS
 import utils
 
 def main():
@@ -16,26 +25,44 @@ def main():
     This function serves as the primary entry point, orchestrating the setup
     and execution of all core components. The process includes:
     
-    1.  Creating the main GUI overlay window.
-    2.  Running a mandatory reaction time calibration test. It allows the user
+    1.  Creating the main GUI overlay window. With `OVERLAY_PROCESS`, the
+        overlay is started in a child process after calibration instead, and
+        a temporary Tk root hosts the calibration windows. Only the GUI
+        modules are imported before this point; the bot logic, NumPy and the
+        Windows input modules are imported once the first window is up.
+    2.  Checking the saved osu! install path (one file check) and, only if it
+        is no longer valid, searching for osu! in the background.
+    3.  Running a mandatory reaction time calibration test. It allows the user
         to perform a new test or use a previously saved value. If the calibration
         is cancelled or fails, it reverts to a default value.
-    3.  Initializing the main 'Pilot' bot logic with the determined
-        reaction time.
-    4.  Spawning a separate daemon thread for the Pilot's continuous execution,
+    4.  Measuring the latency of the bot's own input pipeline by sending
+        synthetic key presses and cursor moves. If the measurement fails, the
+        last saved value is used.
+    5.  Initializing the main 'Pilot' bot logic with the determined
+        reaction time and input latency.
+    6.  Spawning a separate daemon thread for the Pilot's continuous execution,
         ensuring the GUI remains responsive.
-    5.  Registering global hotkeys (`Ctrl+PgUp` to toggle the overlay,
+    7.  Registering global hotkeys (`Ctrl+PgUp` to toggle the overlay,
         `Ctrl+PgDn` to exit).
-    6.  Starting the Tkinter main event loop, which listens for events and
+    8.  Starting the Tkinter main event loop, which listens for events and
         keeps the application running until explicitly quit.
     """
     mod_handler = ModHandler()
-    overlay = OverlayWindow(mod_handler) 
+    if OVERLAY_PROCESS:
+        import tkinter as tk
+        calibration_root = tk.Tk()
+        calibration_root.withdraw()
+    else:
+        overlay = OverlayWindow(mod_handler)
+        calibration_root = overlay.root
+    calibration_root.update()
+    print(f" -> First window ready {(time.perf_counter() - STARTED_AT) * 1000:.0f}ms after start.")
+    utils.start_osu_discovery()
 
     try:
         previous_rt = utils.load_calibration_data()
         
-        chosen_reaction_time = run_calibration(overlay.root, previous_rt)
+        chosen_reaction_time = run_calibration(calibration_root, previous_rt)
 
         is_new_calibration = (chosen_reaction_time is not None and 
                               (previous_rt is None or not math.isclose(chosen_reaction_time, previous_rt)))
@@ -51,22 +78,55 @@ def main():
         print("Calibration cancelled, using default value.")
         chosen_reaction_time = REACTION_TIME_DEFAULT
 
+    if OVERLAY_PROCESS:
+        from overlay_process import OverlayProxy
+        calibration_root.destroy()
+        overlay = OverlayProxy(mod_handler)
+        print(" -> Overlay running in a separate process.")
+
     overlay.update_reaction_time(chosen_reaction_time)
+
+    import keyboard
+    from pilot import Pilot
+    from calibration import run_pipeline_calibration
+    from backends import DirectInputBackend
+
+    input_backend = DirectInputBackend()
+    pipeline_latency_sec = utils.load_pipeline_latency() or 0.0
+    if PIPELINE_CALIBRATION:
+        try:
+            print("\nMeasuring input pipeline latency...")
+            results = run_pipeline_calibration(input_backend)
+            if results["key"]:
+                pipeline_latency_sec = results["key"]["median_ms"] / 1000.0
+                utils.save_pipeline_latency(pipeline_latency_sec)
+        except Exception as e:
+            print(f"Could not measure input pipeline latency due to an error: {e}.")
     
     print("\nBot starting...")
     print("Press 'Ctrl + PgUp' to toggle overlay. Press 'Ctrl + PgDn' to exit.")
 
-    osu_pilot = Pilot(overlay, chosen_reaction_time, mod_handler)
+    osu_pilot = Pilot(overlay, chosen_reaction_time, mod_handler, input_backend=input_backend,
+                      pipeline_latency_sec=pipeline_latency_sec)
 
     bot_thread = threading.Thread(target=osu_pilot.run, daemon=True)
     bot_thread.start()
 
     keyboard.add_hotkey('ctrl+page up', overlay.toggle_visibility)
-    keyboard.add_hotkey('ctrl+page down', lambda: overlay.root.quit())
+    keyboard.add_hotkey('ctrl+page down', overlay.request_quit)
+
+    if import_timer is not None:
+        import_timer.uninstall()
+        import_timer.report()
 
     overlay.run()
 
     print("Exiting script.")
 
 if __name__ == "__main__":
+    # freeze_support() only acts in a frozen Windows build, where the overlay
+    # child process starts here too; elsewhere, skip importing multiprocessing.
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Live performance metrics of the executor.
+
+The executor only bumps plain counters on `ExecutorMetrics` (no locks, no
+allocation): cursor ticks, moves sent and how many of them repeated the
+previous target pixel, key-press lateness, missed deadlines and slider path
+cache lookups. Every `METRICS_SAMPLE_MS`, a `MetricsSampler` thread turns the
+counters into rates (motion loop Hz, executor CPU %), shows them in the
+overlay and, with `METRICS_SNAPSHOT_PATH` set, writes them as a JSON
+snapshot for automated monitoring. The file is replaced atomically, so a
+reader never sees a half-written snapshot.
+"""
+
+import json
+import os
+import threading
+import time
+
+import parser
+
+
+class ExecutorMetrics:
+    """
+    Counters written by the executor thread and read by the sampler.
+
+    `cpu_sec` is the executor thread's own CPU time. Only that thread can
+    read it, so the executor refreshes it every 64 ticks and once per object.
+    """
+
+    def __init__(self):
+        self.ticks = 0
+        self.moves_sent = 0
+        self.moves_redundant = 0
+        self.presses = 0
+        self.lateness_ms = 0.0
+        self.max_lateness_ms = 0.0
+        self.missed_deadlines = 0
+        self.dropped = 0
+        self.slider_path_hits = 0
+        self.slider_path_misses = 0
+        self.cpu_sec = 0.0
+        self._last_sample = None
+
+    def start_map(self):
+        """Resets the per-map values. Counters used for rates keep running."""
+        self.presses = 0
+        self.lateness_ms = 0.0
+        self.max_lateness_ms = 0.0
+        self.missed_deadlines = 0
+        self.dropped = 0
+
+    def record_press(self, lateness_ms):
+        self.presses += 1
+        self.lateness_ms = lateness_ms
+        if lateness_ms > self.max_lateness_ms:
+            self.max_lateness_ms = lateness_ms
+
+    def sample(self, now=None):
+        """Returns a snapshot dict; rates cover the time since the previous call."""
+        now = time.perf_counter() if now is None else now
+        ticks, cpu_sec = self.ticks, self.cpu_sec
+        loop_hz = cpu_percent = 0.0
+        if self._last_sample is not None:
+            last_now, last_ticks, last_cpu = self._last_sample
+            elapsed = now - last_now
+            if elapsed > 0:
+                loop_hz = (ticks - last_ticks) / elapsed
+                cpu_percent = max(0.0, cpu_sec - last_cpu) / elapsed * 100.0
+        self._last_sample = (now, ticks, cpu_sec)
+        parse_cache = parser.parse_cache_stats
+        return {
+            "time": time.time(),
+            "loop_hz": loop_hz,
+            "cpu_percent": cpu_percent,
+            "lateness_ms": self.lateness_ms,
+            "max_lateness_ms": self.max_lateness_ms,
+            "presses": self.presses,
+            "missed_deadlines": self.missed_deadlines,
+            "dropped": self.dropped,
+            "moves_sent": self.moves_sent,
+            "moves_redundant": self.moves_redundant,
+            "slider_path_hit_rate": _hit_rate(self.slider_path_hits, self.slider_path_misses),
+            "parse_cache_hit_rate": _hit_rate(parse_cache['hits'], parse_cache['misses']),
+        }
+
+
+def _hit_rate(hits, misses):
+    total = hits + misses
+    return hits / total if total else None
+
+
+def _format_rate(rate):
+    return "-" if rate is None else f"{rate * 100:.0f}%"
+
+
+def format_metrics(snapshot):
+    return (f"Loop {snapshot['loop_hz']:.0f}Hz | CPU {snapshot['cpu_percent']:.0f}% | "
+            f"Late {snapshot['lateness_ms']:.1f}/{snapshot['max_lateness_ms']:.1f}ms | "
+            f"Missed {snapshot['missed_deadlines']}\n"
+            f"Moves {snapshot['moves_sent']} sent, {snapshot['moves_redundant']} redundant | "
+            f"Cache: maps {_format_rate(snapshot['parse_cache_hit_rate'])}, "
+            f"sliders {_format_rate(snapshot['slider_path_hit_rate'])}")
+
+
+def write_snapshot(snapshot, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(snapshot, f, indent=4)
+    os.replace(temp_path, path)
+
+
+class MetricsSampler:
+    """
+    Background thread that samples `metrics` and publishes the result.
+
+    Args:
+        metrics (ExecutorMetrics): The executor's counters.
+        overlay: Anything with `update_metrics(text)`.
+        interval_sec (float): Time between samples.
+        snapshot_path (str, optional): JSON file replaced on every sample.
+    """
+
+    def __init__(self, metrics, overlay, interval_sec, snapshot_path=None):
+        self.metrics = metrics
+        self.overlay = overlay
+        self.interval_sec = interval_sec
+        self.snapshot_path = snapshot_path
+        self._stop = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        self.metrics.sample()
+        while not self._stop.wait(self.interval_sec):
+            snapshot = self.metrics.sample()
+            self.overlay.update_metrics(format_metrics(snapshot))
+            if self.snapshot_path:
+                try:
+                    write_snapshot(snapshot, self.snapshot_path)
+                except OSError as e:
+                    print(f" ! Could not write metrics snapshot: {e}")
+                    self.snapshot_path = None
@@ -26,7 +26,7 @@ class ModHandler:
         - Hard Rock (HR): Flips the entire playfield vertically. All Y-coordinates
           for hit circles and slider paths are inverted.
         - Double Time (DT) / Nightcore (NC): Speeds up the map by a factor of 1.5.
-          This shortens all timing values (hit times, slider durations) and
+          This shortens all timing values (hit times, slider durations, breaks) and
           recalculates difficulty settings like Approach Rate (AR) and Overall
           Difficulty (OD) to match the increased speed.
     """
@@ -97,6 +97,10 @@ class ModHandler:
             if 'endTime' in hit_object:
                 hit_object['endTime'] = int(hit_object['endTime'] / speed_multiplier)
 
+        for break_period in data.get("Breaks", []):
+            break_period['startTime'] = int(break_period['startTime'] / speed_multiplier)
+            break_period['endTime'] = int(break_period['endTime'] / speed_multiplier)
+
         for timing_point in data["TimingPoints"]:
             timing_point['time'] = int(timing_point['time'] / speed_multiplier)
             if timing_point['beatLength'] > 0:
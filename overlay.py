@@ -2,7 +2,24 @@ import tkinter as tk
 from tkinter import font, ttk
 from collections import deque
 
+# How often the Tk thread applies updates posted by the bot thread (ms).
+UPDATE_PUMP_MS = 16
+
+# Color and circle radius of the first three visible notes in debug mode.
+# Any further notes are drawn white with a 15 px radius.
+DEBUG_NOTE_COLORS = ["#76F776", "#FFC777", "#FF6347"]
+DEBUG_CIRCLE_RADII = [35, 30, 25]
+
 class OverlayWindow:
+    """
+    The bot's on-screen overlay.
+
+    All `update_*` methods, `toggle_visibility()` and `request_quit()` are safe
+    to call from any thread: they only append to a queue, which the Tk thread
+    drains every `UPDATE_PUMP_MS`. When several updates of the same kind are
+    waiting, only the newest is applied. The checkbox settings are mirrored
+    into plain attributes, so reading them never touches Tk either.
+    """
     def __init__(self, mod_handler=None):
         self.root = tk.Tk()
         self.root.withdraw()
@@ -12,7 +29,7 @@ class OverlayWindow:
         self._create_detail_window()
         self._create_debug_canvas()
         self.show_idle_window()
-        self._debug_loop()
+        self._pump_updates()
 
     def _initialize_vars(self):
         self.colors = {
@@ -29,21 +46,51 @@ class OverlayWindow:
         self.beatmap_var = tk.StringVar(value="...")
         self.difficulty_var = tk.StringVar(value="...")
         self.note_info_var = tk.StringVar(value="...")
+        self.timing_var = tk.StringVar(value="Late: N/A")
+        self.metrics_var = tk.StringVar(value="")
         self.rt_var = tk.StringVar(value="RT: N/A")
         self.hr_var = tk.BooleanVar()
         self.dt_var = tk.BooleanVar()
         self.nc_var = tk.BooleanVar()
         self.flow_aim_var = tk.BooleanVar(value=False)
         self.debug_mode_var = tk.BooleanVar(value=False)
+        self.flow_aim_var.trace_add("write", self._mirror_settings)
         self.debug_mode_var.trace_add("write", self._toggle_debug_window_visibility)
-        
+        self.flow_aim_enabled = False
+        self.debug_mode_enabled = False
+
         self.future_notes = []
+        self._debug_items = {}
+        self._debug_dirty = False
+        self._debug_loop_running = False
+        self._updates = deque()
+        self._detail_size = None
 
         self._offset_x = 0
         self._offset_y = 0
         self.is_visible = True
+        self._visibility_target = True
         self.padding = 20
 
+    def _mirror_settings(self, *args):
+        self.flow_aim_enabled = self.flow_aim_var.get()
+        self.debug_mode_enabled = self.debug_mode_var.get()
+
+    def _post(self, kind, *args):
+        self._updates.append((kind, args))
+
+    def _pump_updates(self):
+        if self._updates:
+            latest = {}
+            while self._updates:
+                kind, args = self._updates.popleft()
+                # Re-insert so the newest update of each kind keeps its place in line.
+                latest.pop(kind, None)
+                latest[kind] = args
+            for kind, args in latest.items():
+                getattr(self, f"_apply_{kind}")(*args)
+        self.root.after(UPDATE_PUMP_MS, self._pump_updates)
+
     def _configure_toplevel(self, window):
         window.overrideredirect(True)
         window.attributes("-topmost", True, "-transparentcolor", "black", "-alpha", 1)
@@ -109,10 +156,10 @@ class OverlayWindow:
             if self.nc_var.get(): self.dt_var.set(False)
 
     def is_flow_aim_active(self):
-        return self.flow_aim_var.get()
+        return self.flow_aim_enabled
 
     def is_debug_mode_active(self):
-        return self.debug_mode_var.get()
+        return self.debug_mode_enabled
 
     def _create_debug_canvas(self):
         self.debug_window = tk.Toplevel(self.root)
@@ -127,42 +174,79 @@ class OverlayWindow:
         self.debug_window.withdraw()
 
     def _debug_loop(self):
-        if self.debug_mode_var.get() and self.is_visible:
-            self.debug_canvas.delete("all")
-
-            note_colors = ["#76F776", "#FFC777", "#FF6347"]
-            for i, note in enumerate(self.future_notes):
-                note_type = note.get('type')
-                color = note_colors[i] if i < len(note_colors) else "#FFFFFF"
-
-                if note_type == 'slider':
-                    path = note.get('path', [])
-                    if len(path) > 1:
-                        flat_coords = [coord for point in path for coord in point]
-                        self.debug_canvas.create_line(flat_coords, fill=color, width=5)
-                
-                elif note_type == 'circle':
-                    x, y = note['screen_pos']
-                    radius = note.get('radius', 15)
-                    self.debug_canvas.create_oval(
-                        x - radius, y - radius, x + radius, y + radius,
-                        fill=color,
-                        outline=""
-                    )
-        else:
-            self.debug_canvas.delete("all")
-
+        """
+        Redraws the debug canvas at most every 16 ms, and only after new notes
+        arrived. Canvas items are kept per object and only recolored or resized
+        when the object moves to another lookahead slot. The loop ends while
+        debug mode is off or the overlay is hidden.
+        """
+        if not (self.debug_mode_enabled and self.is_visible):
+            self._clear_debug_items()
+            self._debug_loop_running = False
+            return
+        if self._debug_dirty:
+            self._debug_dirty = False
+            self._render_debug_notes()
         self.root.after(16, self._debug_loop)
 
+    def _start_debug_loop(self):
+        if not self._debug_loop_running:
+            self._debug_loop_running = True
+            self._debug_dirty = True
+            self._debug_loop()
+
+    def _render_debug_notes(self):
+        visible = {note['index']: (slot, note) for slot, note in enumerate(self.future_notes)}
+        for index in [i for i in self._debug_items if i not in visible]:
+            self.debug_canvas.delete(self._debug_items.pop(index)[0])
+
+        for index, (slot, note) in visible.items():
+            color = DEBUG_NOTE_COLORS[slot] if slot < len(DEBUG_NOTE_COLORS) else "#FFFFFF"
+            entry = self._debug_items.get(index)
+            if entry is None:
+                item = self._create_debug_item(note, slot, color)
+                if item is not None:
+                    self._debug_items[index] = (item, slot)
+            elif entry[1] != slot:
+                item = entry[0]
+                self.debug_canvas.itemconfig(item, fill=color)
+                if note['type'] == 'circle':
+                    self.debug_canvas.coords(item, *self._debug_circle_bounds(note, slot))
+                self._debug_items[index] = (item, slot)
+
+    def _create_debug_item(self, note, slot, color):
+        if note['type'] == 'slider':
+            flat_path = note['flat_path']
+            if len(flat_path) < 4:
+                return None
+            return self.debug_canvas.create_line(flat_path, fill=color, width=5)
+        return self.debug_canvas.create_oval(*self._debug_circle_bounds(note, slot), fill=color, outline="")
+
+    def _debug_circle_bounds(self, note, slot):
+        x, y = note['screen_pos']
+        radius = DEBUG_CIRCLE_RADII[slot] if slot < len(DEBUG_CIRCLE_RADII) else 15
+        return x - radius, y - radius, x + radius, y + radius
+
+    def _clear_debug_items(self):
+        if self._debug_items:
+            self.debug_canvas.delete(*[item for item, _ in self._debug_items.values()])
+            self._debug_items = {}
+
     def update_debug_visuals(self, debug_data=None):
-        if debug_data and self.debug_mode_var.get():
+        self._post('debug_visuals', debug_data)
+
+    def _apply_debug_visuals(self, debug_data):
+        if debug_data and self.debug_mode_enabled:
             self.future_notes = debug_data.get('future_notes', [])
         else:
             self.future_notes = []
-            
+        self._debug_dirty = True
+
     def _toggle_debug_window_visibility(self, *args):
-        if self.debug_mode_var.get() and self.is_visible:
+        self._mirror_settings()
+        if self.debug_mode_enabled and self.is_visible:
             self.debug_window.deiconify()
+            self._start_debug_loop()
         else:
             self.debug_window.withdraw()
 
@@ -190,7 +274,11 @@ class OverlayWindow:
         tk.Label(frame, textvariable=self.difficulty_var, font=self.fonts["main"],
                  fg=self.colors["foreground"], bg=self.colors["background"], justify="left").pack(side="top", anchor="w", padx=10, pady=2)
         tk.Label(frame, textvariable=self.note_info_var, font=self.fonts["main"],
-                 fg=self.colors["accent"], bg=self.colors["background"], justify="left").pack(side="top", anchor="w", padx=10, pady=(0, 5))
+                 fg=self.colors["accent"], bg=self.colors["background"], justify="left").pack(side="top", anchor="w", padx=10, pady=(0, 2))
+        tk.Label(frame, textvariable=self.timing_var, font=self.fonts["main"],
+                 fg=self.colors["foreground"], bg=self.colors["background"], justify="left").pack(side="top", anchor="w", padx=10, pady=(0, 2))
+        tk.Label(frame, textvariable=self.metrics_var, font=self.fonts["main"],
+                 fg=self.colors["foreground"], bg=self.colors["background"], justify="left").pack(side="top", anchor="w", padx=10, pady=(0, 5))
         self.detail_frame = frame
         self.detail_canvas = canvas
 
@@ -220,6 +308,9 @@ class OverlayWindow:
         self.root.after_idle(lambda: self._update_geometry(self.detail_window, self.detail_canvas, self.detail_frame))
 
     def update_status(self, status):
+        self._post('status', status)
+
+    def _apply_status(self, status):
         current_status = status.upper()
         self.status_var.set(current_status)
         color = self.colors["status_idle"]
@@ -233,6 +324,9 @@ class OverlayWindow:
             self.show_idle_window()
 
     def update_beatmap(self, beatmap_name=None):
+        self._post('beatmap', beatmap_name)
+
+    def _apply_beatmap(self, beatmap_name):
         if beatmap_name and "not found" not in str(beatmap_name).lower():
             active_mods_str = ""
             if self.mod_handler and self.mod_handler.active_mods:
@@ -243,6 +337,9 @@ class OverlayWindow:
             self.show_idle_window()
 
     def update_difficulty(self, diff_dict=None):
+        self._post('difficulty', diff_dict)
+
+    def _apply_difficulty(self, diff_dict):
         if diff_dict:
             hp = diff_dict.get('HPDrainRate', '?')
             cs = diff_dict.get('CircleSize', '?')
@@ -253,19 +350,54 @@ class OverlayWindow:
             self.difficulty_var.set("...")
 
     def update_note_info(self, hit_object=None, index=None):
+        self._post('note_info', hit_object, index)
+
+    def _apply_note_info(self, hit_object, index):
         if hit_object and index is not None:
             self.note_info_var.set(f"Note #{index + 1}: (X: {hit_object['x']}, Y: {hit_object['y']}) @ {hit_object['time']}ms")
         else:
             self.note_info_var.set("...")
 
+    def update_timing_summary(self, summary_text=None):
+        self._post('timing_summary', summary_text)
+
+    def _apply_timing_summary(self, summary_text):
+        self.timing_var.set(summary_text or "Late: N/A")
+
+    def update_metrics(self, metrics_text=None):
+        self._post('metrics', metrics_text)
+
+    def _apply_metrics(self, metrics_text):
+        self.metrics_var.set(metrics_text or "")
+        if self.detail_window.winfo_viewable():
+            # The numbers change width; grow or shrink the window only when its size changes.
+            self.detail_frame.update_idletasks()
+            size = (self.detail_frame.winfo_reqwidth(), self.detail_frame.winfo_reqheight())
+            if size != self._detail_size:
+                self._detail_size = size
+                self._update_geometry(self.detail_window, self.detail_canvas, self.detail_frame)
+
     def update_reaction_time(self, rt_sec=None):
+        self._post('reaction_time', rt_sec)
+
+    def _apply_reaction_time(self, rt_sec):
         if rt_sec is not None and isinstance(rt_sec, (int, float)):
             self.rt_var.set(f"RT: {rt_sec * 1000:.0f}ms")
         else:
             self.rt_var.set("RT: N/A")
 
     def toggle_visibility(self):
-        self.is_visible = not self.is_visible
+        self._visibility_target = not self._visibility_target
+        self._post('visibility', self._visibility_target)
+
+    def request_quit(self):
+        self._post('quit')
+
+    def _apply_quit(self):
+        self.root.quit()
+
+    def _apply_visibility(self, visible):
+        self.is_visible = visible
         if self.is_visible:
             if self.status_var.get() == 'IDLE':
                 self.show_idle_window()
@@ -0,0 +1,304 @@
+"""
+Runs the Tk overlay in a child process.
+
+In the default setup, the overlay's Tk main loop and the Pilot executor
+thread share one interpreter and one GIL, so every canvas redraw competes
+with the timing-critical loop. With `config.OVERLAY_PROCESS` enabled,
+`main.py` starts the overlay in its own process and hands the Pilot an
+`OverlayProxy` instead. The proxy has the same methods as `OverlayWindow`.
+
+Two channels connect the processes:
+- A `multiprocessing.shared_memory` block carries the frequent updates:
+  status, note info and debug geometry. The bot thread writes plain int32
+  words guarded by a sequence counter (a seqlock). The child polls the
+  counter every `overlay.UPDATE_PUMP_MS` and only decodes after a change.
+  Writing never blocks on the child.
+- A duplex pipe carries the rare messages. Beatmap, difficulty, timing,
+  metrics and reaction-time text, visibility and quit go to the child. Mod toggles, the
+  Flow Aim / Debug Mode settings and window close come back.
+
+Shared memory layout (int32 words):
+    [0] sequence (odd while a write is in progress)
+    [1] status code          [2] note info present
+    [3..6] note index, x, y, time
+    [7] debug data present   [8] debug note count
+    [9] debug version (bumped on every debug write)
+    [NOTE_TABLE..] per note: index, type, coordinate offset, coordinate count
+    [COORD_POOL..] coordinates of all notes, back to back
+"""
+
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from mods import ModHandler
+
+SHM_WORDS = 16384
+MAX_DEBUG_NOTES = 64
+NOTE_TABLE = 16
+COORD_POOL = NOTE_TABLE + 4 * MAX_DEBUG_NOTES
+
+STATUS_CODES = {'IDLE': 0, 'ARMED': 1, 'RUNNING': 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+NOTE_TYPES = {'circle': 0, 'slider': 1}
+NOTE_TYPE_NAMES = {code: name for name, code in NOTE_TYPES.items()}
+# Reads of the shared words per poll before the frame is skipped. A write
+# takes microseconds, so this is only reached if the writer died mid-write.
+SNAPSHOT_READ_ATTEMPTS = 1000
+
+# Overlay methods the parent may call in the child over the pipe.
+REMOTE_CALLS = {'update_beatmap', 'update_difficulty', 'update_timing_summary',
+                'update_reaction_time', 'update_metrics', 'toggle_visibility', 'request_quit'}
+
+
+class OverlayProxy:
+    """
+    Stand-in for `OverlayWindow` in the parent process.
+
+    Args:
+        mod_handler (ModHandler): The parent's handler. Mod toggles made in the
+                                  child's window are applied to it.
+    """
+
+    def __init__(self, mod_handler=None):
+        self.mod_handler = mod_handler
+        self.flow_aim_enabled = False
+        self.debug_mode_enabled = False
+        self._shm = shared_memory.SharedMemory(create=True, size=SHM_WORDS * 4)
+        self._words = np.ndarray((SHM_WORDS,), dtype=np.int32, buffer=self._shm.buf)
+        self._words[:] = 0
+        self._write_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._conn, child_conn = multiprocessing.Pipe(duplex=True)
+        self._closed = threading.Event()
+        self._process = multiprocessing.Process(target=_run_overlay_process,
+                                                args=(self._shm.name, child_conn), daemon=True)
+        self._process.start()
+        threading.Thread(target=self._listen, daemon=True).start()
+
+    # --- Parent -> child: shared memory ---
+
+    def _begin_write(self):
+        self._write_lock.acquire()
+        self._words[0] += 1
+
+    def _end_write(self):
+        self._words[0] += 1
+        self._write_lock.release()
+
+    def update_status(self, status):
+        self._begin_write()
+        self._words[1] = STATUS_CODES.get(status.upper(), 0)
+        self._end_write()
+
+    def update_note_info(self, hit_object=None, index=None):
+        self._begin_write()
+        if hit_object and index is not None:
+            self._words[2:7] = (1, index, hit_object['x'], hit_object['y'], hit_object['time'])
+        else:
+            self._words[2] = 0
+        self._end_write()
+
+    def update_debug_visuals(self, debug_data=None):
+        notes = debug_data.get('future_notes', []) if debug_data else None
+        self._begin_write()
+        words = self._words
+        if notes is None:
+            words[7] = 0
+        else:
+            offset = COORD_POOL
+            count = 0
+            for note in notes[:MAX_DEBUG_NOTES]:
+                coords = note['flat_path'] if note['type'] == 'slider' else note['screen_pos']
+                if offset + len(coords) > SHM_WORDS:
+                    break
+                row = NOTE_TABLE + 4 * count
+                words[row:row + 4] = (note['index'], NOTE_TYPES[note['type']], offset, len(coords))
+                words[offset:offset + len(coords)] = coords
+                offset += len(coords)
+                count += 1
+            words[7] = 1
+            words[8] = count
+        words[9] += 1
+        self._end_write()
+
+    # --- Parent -> child: pipe ---
+
+    def _send(self, message):
+        if self._closed.is_set():
+            return
+        try:
+            with self._send_lock:
+                self._conn.send(message)
+        except (OSError, EOFError):
+            self._closed.set()
+
+    def update_beatmap(self, beatmap_name=None):
+        self._send(('call', 'update_beatmap', (beatmap_name,)))
+
+    def update_difficulty(self, diff_dict=None):
+        self._send(('call', 'update_difficulty', (diff_dict,)))
+
+    def update_timing_summary(self, summary_text=None):
+        self._send(('call', 'update_timing_summary', (summary_text,)))
+
+    def update_reaction_time(self, rt_sec=None):
+        self._send(('call', 'update_reaction_time', (rt_sec,)))
+
+    def update_metrics(self, metrics_text=None):
+        self._send(('call', 'update_metrics', (metrics_text,)))
+
+    def toggle_visibility(self):
+        self._send(('call', 'toggle_visibility', ()))
+
+    def request_quit(self):
+        self._send(('call', 'request_quit', ()))
+
+    # --- Child -> parent ---
+
+    def _listen(self):
+        while True:
+            try:
+                message = self._conn.recv()
+            except (OSError, EOFError):
+                break
+            kind = message[0]
+            if kind == 'mods' and self.mod_handler is not None:
+                self.mod_handler.active_mods = set(message[1])
+            elif kind == 'settings':
+                self.flow_aim_enabled, self.debug_mode_enabled = message[1], message[2]
+            elif kind == 'closed':
+                break
+        self._closed.set()
+
+    def is_flow_aim_active(self):
+        return self.flow_aim_enabled
+
+    def is_debug_mode_active(self):
+        return self.debug_mode_enabled
+
+    def run(self):
+        """Blocks until the overlay window closes, then releases the shared memory."""
+        try:
+            self._closed.wait()
+        except KeyboardInterrupt:
+            self.request_quit()
+        finally:
+            self._process.join(timeout=2)
+            # The bot thread may still post an update; let it write to a detached buffer.
+            # Holding the write lock, no write is using the old view when the block is closed.
+            with self._write_lock:
+                self._words = np.zeros(SHM_WORDS, dtype=np.int32)
+                self._shm.close()
+            self._shm.unlink()
+
+
+class _ForwardingModHandler(ModHandler):
+    """The child's copy of the mod state. Every toggle is reported to the parent."""
+
+    def __init__(self, send):
+        super().__init__()
+        self._send = send
+
+    def toggle_hr(self):
+        super().toggle_hr()
+        self._send(('mods', sorted(self.active_mods)))
+
+    def toggle_dt(self):
+        super().toggle_dt()
+        self._send(('mods', sorted(self.active_mods)))
+
+    def toggle_nc(self):
+        super().toggle_nc()
+        self._send(('mods', sorted(self.active_mods)))
+
+
+def read_snapshot(words, attempts=SNAPSHOT_READ_ATTEMPTS):
+    """
+    Copies a consistent snapshot of the shared words.
+
+    Returns:
+        tuple: `(seq, snapshot)`, or None if every attempt overlapped a write.
+               The caller skips the frame and tries again at the next poll, so
+               a writer that died mid-write cannot hang the overlay.
+    """
+    for _ in range(attempts):
+        seq = int(words[0])
+        if seq % 2:
+            continue
+        snapshot = words.copy()
+        if int(words[0]) == seq:
+            return seq, snapshot
+    return None
+
+
+def _decode_debug_notes(snapshot):
+    notes = []
+    for i in range(int(snapshot[8])):
+        row = NOTE_TABLE + 4 * i
+        index, type_code, offset, length = (int(v) for v in snapshot[row:row + 4])
+        coords = snapshot[offset:offset + length].tolist()
+        if NOTE_TYPE_NAMES[type_code] == 'slider':
+            notes.append({'index': index, 'type': 'slider', 'flat_path': coords})
+        else:
+            notes.append({'index': index, 'type': 'circle', 'screen_pos': tuple(coords)})
+    return notes
+
+
+def _run_overlay_process(shm_name, conn):
+    from overlay import OverlayWindow, UPDATE_PUMP_MS
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    words = np.ndarray((SHM_WORDS,), dtype=np.int32, buffer=shm.buf)
+    overlay = OverlayWindow(_ForwardingModHandler(conn.send))
+    state = {'seq': 0, 'status': None, 'note': None, 'debug_version': 0, 'settings': None}
+
+    def report_settings(*args):
+        settings = (overlay.flow_aim_var.get(), overlay.debug_mode_var.get())
+        if settings != state['settings']:
+            state['settings'] = settings
+            conn.send(('settings',) + settings)
+
+    overlay.flow_aim_var.trace_add("write", report_settings)
+    overlay.debug_mode_var.trace_add("write", report_settings)
+
+    def poll():
+        try:
+            while conn.poll():
+                kind, name, args = conn.recv()
+                if kind == 'call' and name in REMOTE_CALLS:
+                    getattr(overlay, name)(*args)
+        except (OSError, EOFError):
+            overlay.request_quit()
+
+        result = read_snapshot(words) if int(words[0]) != state['seq'] else None
+        if result is not None:
+            state['seq'], snapshot = result
+            status = STATUS_NAMES.get(int(snapshot[1]), 'IDLE')
+            if status != state['status']:
+                state['status'] = status
+                overlay.update_status(status)
+            note = tuple(int(v) for v in snapshot[2:7])
+            if note != state['note']:
+                state['note'] = note
+                if note[0]:
+                    overlay.update_note_info({'x': note[2], 'y': note[3], 'time': note[4]}, note[1])
+                else:
+                    overlay.update_note_info(None, None)
+            if int(snapshot[9]) != state['debug_version']:
+                state['debug_version'] = int(snapshot[9])
+                overlay.update_debug_visuals({'future_notes': _decode_debug_notes(snapshot)} if snapshot[7] else None)
+        overlay.root.after(UPDATE_PUMP_MS, poll)
+
+    poll()
+    try:
+        overlay.run()
+    finally:
+        try:
+            conn.send(('closed',))
+        except (OSError, EOFError):
+            pass
+        del words
+        shm.close()
@@ -11,10 +11,15 @@ Core Workflow:
 1.  `find_and_process_beatmap()`: The main entry point function. It takes a
     beatmap name and searches a given songs directory. It uses string
     simplification and matching to locate the specific .osu file
-    corresponding to the active map and difficulty.
+    corresponding to the active map and difficulty. The search itself is
+    `find_beatmap_file()`, which returns the path without parsing it.
 2.  `parse_osu_file()`: Once a file is found, this function reads it section by
-    section, parsing metadata, difficulty settings, timing points, and a
-    list of all hit objects (circles, sliders, spinners).
+    section, parsing metadata, difficulty settings, break periods, timing
+    points, and a list of all hit objects (circles, sliders, spinners).
+    `load_osu_file()` wraps it with a small cache, so going back to a map
+    that was played recently does not parse it again. The file is read by
+    `read_osu_file()` and parsed by `parse_osu_lines()`, so the two steps
+    can be timed separately.
 
 Key Calculation Functions:
 - `calculate_slider_path()`: For slider objects, this function computes the
@@ -31,9 +36,17 @@ simulate gameplay for a given beatmap.
 import os
 import re
 import math
+import time
 import numpy as np
+from collections import OrderedDict
 
 import utils
+import profiling
+
+# Parsed beatmaps kept by `load_osu_file()`, most recently used last.
+PARSE_CACHE_SIZE = 8
+_parse_cache = OrderedDict()
+parse_cache_stats = {'hits': 0, 'misses': 0}
 
 def get_slider_duration(hit_object, difficulty_data, timing_points):
     slider_multiplier = difficulty_data.get("SliderMultiplier", 1.4)
@@ -148,72 +161,142 @@ def calculate_slider_path(hit_object, num_points=100):
 
     return [tuple(p.astype(int)) for p in path]
 
-def parse_osu_file(file_path):
+def load_osu_file(file_path, timers=None):
+    """
+    Like `parse_osu_file()`, but keeps the last `PARSE_CACHE_SIZE` results.
+
+    Entries are keyed by path, size and modification time, so an edited file
+    is parsed again. Callers must not modify the returned data
+    (`ModHandler.apply_mods()` works on a copy).
+
+    Args:
+        file_path (str): Path of the .osu file.
+        timers (profiling.PhaseTimers, optional): On a cache miss, receives the
+                                                  file read and parse times.
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    key = (file_path, stat.st_size, stat.st_mtime_ns)
+    beatmap_data = _parse_cache.get(key)
+    if beatmap_data is not None:
+        _parse_cache.move_to_end(key)
+        parse_cache_stats['hits'] += 1
+        return beatmap_data
+    parse_cache_stats['misses'] += 1
+    started = time.perf_counter_ns()
+    lines = read_osu_file(file_path)
+    if timers is not None:
+        timers.add(profiling.BEATMAP_READ, started)
+    if lines is None:
+        return None
+    started = time.perf_counter_ns()
+    beatmap_data = parse_osu_lines(lines, os.path.basename(file_path))
+    if timers is not None:
+        timers.add(profiling.BEATMAP_PARSE, started)
+    if beatmap_data is not None:
+        _parse_cache[key] = beatmap_data
+        while len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return beatmap_data
+
+def read_osu_file(file_path):
+    """Returns the lines of a .osu file, or None if it cannot be read."""
     if not os.path.exists(file_path):
         return None
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+    except Exception as e:
+        print(f"   ! Error reading file {os.path.basename(file_path)}: {e}")
+        return None
 
-    beatmap_data = {"General": {}, "Difficulty": {}, "HitObjects": [], "TimingPoints": []}
+def parse_osu_file(file_path):
+    lines = read_osu_file(file_path)
+    if lines is None:
+        return None
+    return parse_osu_lines(lines, os.path.basename(file_path))
+
+def parse_osu_lines(lines, name=""):
+    """Parses the lines of a .osu file (see `read_osu_file()`)."""
+    beatmap_data = {"General": {}, "Difficulty": {}, "HitObjects": [], "TimingPoints": [], "Breaks": []}
     current_section = None
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('//'):
-                    continue
-                if line.startswith('[') and line.endswith(']'):
-                    current_section = line[1:-1]
-                    continue
-
-                if current_section in ["General", "Difficulty"]:
-                    if ':' in line:
-                        key, value = map(str.strip, line.split(':', 1))
-                        if current_section == "Difficulty":
-                            try:
-                                beatmap_data[current_section][key] = float(value)
-                            except ValueError:
-                                beatmap_data[current_section][key] = value
-                        else:
-                            beatmap_data[current_section][key] = value
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('//'):
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                current_section = line[1:-1]
+                continue
 
-                elif current_section == "TimingPoints":
-                    parts = line.split(',')
-                    if len(parts) >= 2:
-                        beatmap_data["TimingPoints"].append({
-                            'time': float(parts[0]),
-                            'beatLength': float(parts[1])
-                        })
+            if current_section in ["General", "Difficulty"]:
+                if ':' in line:
+                    key, value = map(str.strip, line.split(':', 1))
+                    if current_section == "Difficulty":
+                        try:
+                            beatmap_data[current_section][key] = float(value)
+                        except ValueError:
+                            beatmap_data[current_section][key] = value
+                    else:
+                        beatmap_data[current_section][key] = value
 
-                elif current_section == "HitObjects":
-                    parts = line.split(',')
-                    if len(parts) < 4: continue
+            elif current_section == "Events":
+                parts = line.split(',')
+                if len(parts) >= 3 and parts[0].strip() in ("2", "Break"):
                     try:
-                        hit_object = {"x": int(parts[0]), "y": int(parts[1]), "time": int(parts[2]),
-                                      "type": int(parts[3])}
-                        obj_type = hit_object['type']
-
-                        if obj_type & 8:
-                            hit_object['endTime'] = int(parts[5])
-                        elif obj_type & 2:
-                            slider_parts = parts[5].split('|')
-                            hit_object['curveType'] = slider_parts[0]
-                            curve_points = [(hit_object['x'], hit_object['y'])]
-                            for point_str in slider_parts[1:]:
-                                p = point_str.split(':')
-                                curve_points.append((int(p[0]), int(p[1])))
-                            hit_object['curvePoints'] = curve_points
-                            hit_object['slides'] = int(parts[6])
-                            hit_object['pixelLength'] = float(parts[7])
-                        beatmap_data["HitObjects"].append(hit_object)
-                    except (ValueError, IndexError):
+                        beatmap_data["Breaks"].append({
+                            'startTime': int(float(parts[1])),
+                            'endTime': int(float(parts[2]))
+                        })
+                    except ValueError:
                         pass
+
+            elif current_section == "TimingPoints":
+                parts = line.split(',')
+                if len(parts) >= 2:
+                    beatmap_data["TimingPoints"].append({
+                        'time': float(parts[0]),
+                        'beatLength': float(parts[1])
+                    })
+
+            elif current_section == "HitObjects":
+                parts = line.split(',')
+                if len(parts) < 4: continue
+                try:
+                    hit_object = {"x": int(parts[0]), "y": int(parts[1]), "time": int(parts[2]),
+                                  "type": int(parts[3])}
+                    obj_type = hit_object['type']
+
+                    if obj_type & 8:
+                        hit_object['endTime'] = int(parts[5])
+                    elif obj_type & 2:
+                        slider_parts = parts[5].split('|')
+                        hit_object['curveType'] = slider_parts[0]
+                        curve_points = [(hit_object['x'], hit_object['y'])]
+                        for point_str in slider_parts[1:]:
+                            p = point_str.split(':')
+                            curve_points.append((int(p[0]), int(p[1])))
+                        hit_object['curvePoints'] = curve_points
+                        hit_object['slides'] = int(parts[6])
+                        hit_object['pixelLength'] = float(parts[7])
+                    beatmap_data["HitObjects"].append(hit_object)
+                except (ValueError, IndexError):
+                    pass
         return beatmap_data
     except Exception as e:
-        print(f"   ! Error parsing file {os.path.basename(file_path)}: {e}")
+        print(f"   ! Error parsing file {name}: {e}")
         return None
 
 def find_and_process_beatmap(beatmap_name_from_title, songs_directory):
     print(f"Beatmap Detected: {beatmap_name_from_title}")
+    file_path = find_beatmap_file(beatmap_name_from_title, songs_directory)
+    return parse_osu_file(file_path) if file_path else None
+
+def find_beatmap_file(beatmap_name_from_title, songs_directory):
+    """Returns the path of the .osu file for a window title, or None."""
     cleaned_title = utils.clean_filename(beatmap_name_from_title)
     simplified_title = utils.simplify_string(cleaned_title)
     found_folder_path = None
@@ -247,7 +330,7 @@ def find_and_process_beatmap(beatmap_name_from_title, songs_directory):
                 if simplified_filename_no_ext.endswith(simplified_difficulty):
                     full_path = os.path.join(found_folder_path, f)
                     print(f" -> Found .osu file: {f}")
-                    return parse_osu_file(full_path)
+                    return full_path
 
         print(f" -> FAILED: Could not find .osu file with difficulty '{difficulty_part}'")
         return None
@@ -1,17 +1,28 @@
+import math
 import time
 import random
+import threading
 from enum import Enum, auto
-import os
 
-import keyboard
-import pydirectinput
-import pyautogui
 import numpy as np
-import noise
 
 import utils
 import parser
 import config
+import fastmath
+from backends import SystemClock, DirectInputBackend
+from timing_recorder import HitTimingRecorder, format_summary
+from auto_offset import EmitLeadEstimator
+from sync import SyncEstimator
+from spinner import SpinnerTrajectory
+from approach_window import ApproachWindow
+from window_watcher import create_watcher
+from realtime import RealtimeSession, format_summary as format_realtime_summary
+from profiling import (PhaseTimers, MapProfiler, format_phases, STREAM_DETECT, STREAM_GROUP, CURVE, MOVE,
+                       KEY, WAIT, SLEEP, OVERLAY, SLIDER_PATH, BEATMAP_LOOKUP, APPLY_MODS,
+                       MAP_LOAD, APPROACH, CIRCLE, SLIDER, SPINNER)
+from timeline import TraceRecorder, SPANS_PER_OBJECT
+from metrics import ExecutorMetrics, MetricsSampler
 
 # --- Stream Detection Constants ---
 # The maximum time between two notes to be considered part of a stream (in milliseconds)
@@ -29,55 +40,318 @@ class State(Enum):
     RUNNING = auto()
 
 class Pilot:
-    def __init__(self, overlay, reaction_time_sec, mod_handler):
+    def __init__(self, overlay, reaction_time_sec, mod_handler, clock=None, input_backend=None,
+                 title_source=None, seed=None, pipeline_latency_sec=0.0, window_watcher=None):
         self.overlay = overlay
         self.calibrated_reaction_time_sec = reaction_time_sec
+        self.pipeline_latency_sec = pipeline_latency_sec
         self.mod_handler = mod_handler
+        self.clock = clock or SystemClock()
+        self.input = input_backend or DirectInputBackend()
+        self.title_source = title_source
+        self.watcher = window_watcher
+        self.idle_stats = {'idle_sec': 0.0, 'cpu_sec': 0.0}
+        self.retry_load = False
+        self.rng = random.Random(seed)
+        self.timing_recorder = None
+        self.timing_report_dir = config.TIMING_REPORT_DIR
+        self.catch_up_threshold_sec = config.CATCHUP_LATENESS_MS / 1000.0
+        self.drop_window_sec = 0.0
+        self._slider_paths = {}
+        self._slider_screen_paths = {}
+        self._stream_groups = None
+        self._debug_notes = {}
+        self._debug_lookahead = None
+        self.approach_window = None
+        self.auto_offset_enabled = config.AUTO_TIMING_OFFSET
+        self.persist_emit_lead = True
+        self.realtime_mode = config.REALTIME_MODE
+        self.realtime = None
+        self.worst_tick_sec = 0.0
+        self.phases = PhaseTimers()
+        self.profiler = MapProfiler(config.PROFILE_DIR)
+        self.metrics = ExecutorMetrics()
+        self._last_move_x = self._last_move_y = None
+        self.trace_dir = config.TRACE_DIR
+        if self.trace_dir:
+            self.phases.trace = TraceRecorder(config.TRACE_CAPACITY)
+        self.lead_estimator = EmitLeadEstimator(utils.load_emit_lead() or 0.0)
         self.state = State.IDLE
         self.beatmap_data = None
         self.last_beatmap_title = None
-        self.screen_width, self.screen_height = pyautogui.size()
-        pydirectinput.PAUSE = 0
-        self.q_pressed_flag = False
+        self.screen_width, self.screen_height = self.input.size()
+        self.playfield = utils.get_playfield(self.screen_width, self.screen_height)
+        self.q_event = threading.Event()
         self.q_press_time = 0
-        self.esc_pressed_flag = False
+        self.sync = None
+        self.esc_event = threading.Event()
+        self.flow_aim = False
+        self.debug_mode = False
+        import noise
+        self._pnoise1 = noise.pnoise1
         self.noise_strength = 1
         self.noise_scale = 10.0
         self.noise_octaves = 2
         self.noise_persistence = 0.6
         self.noise_lacunarity = 2.0
-        self.noise_base_x = random.randint(0, 1024)
-        self.noise_base_y = random.randint(0, 1024)
+        self.noise_base_x = self.rng.randint(0, 1024)
+        self.noise_base_y = self.rng.randint(0, 1024)
 
-    def _on_q_press(self):
+    def _on_q_event(self, event):
+        """
+        Keyboard-hook callback for 'q'. Timestamps the tap before anything else.
+
+        `event.time` is stamped with `time.time()` by the `keyboard` library's
+        own hook handler when it queues the event, not when the OS received
+        the key. The gap to now is therefore only the library's queue dispatch
+        delay, which is subtracted from the monotonic capture time. The time
+        between the OS receiving the key and the library's handler running
+        is not covered (that would need `KBDLLHOOKSTRUCT.time` from a
+        low-level hook of our own).
+        """
+        captured_ns = time.perf_counter_ns()
+        dispatch_delay_sec = max(0.0, time.time() - event.time)
+        tap_time = self.clock.from_perf_counter_ns(captured_ns) - dispatch_delay_sec
         if self.state == State.ARMED:
-            self.q_press_time = time.time()
-            self.q_pressed_flag = True
+            self.q_press_time = tap_time
+            self.q_event.set()
+            if self.watcher is not None:
+                self.watcher.wake()
+        elif self.state == State.RUNNING and self.sync is not None:
+            if self.sync.add_tap(tap_time):
+                print(f"  -> Sync tap {self.sync.tap_count} used (dispatch delay {dispatch_delay_sec * 1000:.2f}ms).")
 
     def _on_esc_press(self):
         if self.state == State.RUNNING:
-            self.esc_pressed_flag = True
+            self.esc_event.set()
     
+    def _tick(self):
+        """Sleeps one cursor tick and keeps the worst oversleep of the map."""
+        started = time.perf_counter_ns()
+        before = self.clock.time()
+        self.clock.sleep(0.001)
+        overshoot = self.clock.time() - before - 0.001
+        self.phases.add(SLEEP, started)
+        if overshoot > self.worst_tick_sec:
+            self.worst_tick_sec = overshoot
+        metrics = self.metrics
+        metrics.ticks += 1
+        if not metrics.ticks & 63:
+            metrics.cpu_sec = time.thread_time()
+
+    def _move(self, x, y):
+        """Moves the cursor and counts moves to the same pixel as the previous one."""
+        started = time.perf_counter_ns()
+        self.input.moveTo(x, y)
+        self.phases.add(MOVE, started)
+        metrics = self.metrics
+        metrics.moves_sent += 1
+        if x == self._last_move_x and y == self._last_move_y:
+            metrics.moves_redundant += 1
+        self._last_move_x, self._last_move_y = x, y
+
+    def _record_catch_up(self, index, lateness_sec, dropped=False):
+        self.timing_recorder.record_catch_up(index, lateness_sec, dropped)
+        self.metrics.missed_deadlines += 1
+        if dropped:
+            self.metrics.dropped += 1
+
+    def _should_abort(self):
+        return self.esc_event.is_set()
+
+    def _emit_lead_sec(self):
+        return self.lead_estimator.lead_sec if self.auto_offset_enabled else 0.0
+
+    def _press_key(self, key, scheduled_sec, intended_emit_sec, object_index, learn=True):
+        """
+        Sends a key-down and feeds its timing to the recorder and lead estimator.
+
+        Presses made while catching up pass `learn=False`, so a one-off stall
+        is not mistaken for a slower input path.
+        """
+        started = time.perf_counter_ns()
+        self.input.keyDown(key)
+        returned = self.clock.time()
+        if learn:
+            self.lead_estimator.observe(returned - intended_emit_sec)
+        self.timing_recorder.record(object_index, scheduled_sec, returned)
+        self.metrics.record_press((returned - scheduled_sec) * 1000.0)
+        self.phases.add(KEY, started)
+
+    def _get_slider_path(self, index):
+        path = self._slider_paths.get(index)
+        if path is None:
+            path = parser.calculate_slider_path(self.beatmap_data["HitObjects"][index])
+            self._slider_paths[index] = path
+        return path
+
+    def _get_slider_screen_path(self, index):
+        """Returns the slider path as a list of screen-pixel tuples, converted once per run."""
+        screen_path = self._slider_screen_paths.get(index)
+        if screen_path is not None:
+            self.metrics.slider_path_hits += 1
+        else:
+            self.metrics.slider_path_misses += 1
+            path = self._get_slider_path(index)
+            screen_path = [tuple(p) for p in self.playfield.to_screen(path).tolist()] if path else []
+            self._slider_screen_paths[index] = screen_path
+        return screen_path
+
+    def _get_debug_note(self, index):
+        """Returns the debug overlay entry for an object, with its screen geometry prepared once per run."""
+        note_info = self._debug_notes.get(index)
+        if note_info is None:
+            note = self.beatmap_data["HitObjects"][index]
+            if note.get('curveType') is not None:
+                flat_path = [c for point in self._get_slider_screen_path(index) for c in point]
+                note_info = {'index': index, 'type': 'slider', 'flat_path': flat_path}
+            else:
+                note_info = {'index': index, 'type': 'circle',
+                             'screen_pos': self.playfield.to_screen_point(note['x'], note['y'])}
+            self._debug_notes[index] = note_info
+        return note_info
+
+    def _send_debug_lookahead(self, start_time):
+        """Sends every object inside the approach window to the debug overlay, only when that set has changed."""
+        now_ms = (self.clock.time() - start_time) * 1000.0
+        visible = tuple(self.approach_window.advance(now_ms))
+        if self._debug_lookahead == visible:
+            return
+        self._debug_lookahead = visible
+        self.overlay.update_debug_visuals({'future_notes': [self._get_debug_note(i) for i in visible]})
+
+    def _clear_debug_lookahead(self):
+        if self._debug_lookahead is not None:
+            self._debug_lookahead = None
+            self.overlay.update_debug_visuals(None)
+
+    def _map_breaks_to_objects(self):
+        """
+        Returns a dict mapping the index of the first object after each break
+        period to that break.
+        """
+        hit_objects = self.beatmap_data["HitObjects"]
+        object_times = np.array([obj['time'] for obj in hit_objects])
+        breaks_by_next_object = {}
+        for break_period in self.beatmap_data.get("Breaks", []):
+            next_index = int(np.searchsorted(object_times, break_period['endTime'], side='left'))
+            if 0 < next_index < len(hit_objects):
+                breaks_by_next_object[next_index] = break_period
+        return breaks_by_next_object
+
+    def _park_for_break(self, break_period, start_time, next_index, break_stats):
+        """
+        Idles through a break period instead of interpolating toward the next note.
+
+        The cursor stays still and the thread blocks on the ESC event until
+        `config.BREAK_REWARM_SEC` before the break ends or the next object is
+        due. It then re-warms by preparing the slider paths of the next few
+        objects.
+
+        Returns:
+            bool: True if the executor parked.
+        """
+        hit_objects = self.beatmap_data["HitObjects"]
+        resume_ms = min(break_period['endTime'], hit_objects[next_index]['time'])
+        resume_at = start_time + resume_ms / 1000.0 - config.BREAK_REWARM_SEC
+        park_start = self.clock.time()
+        if resume_at - park_start < config.BREAK_REWARM_SEC:
+            return False
+
+        print(f"  -> Break detected. Parking for {resume_at - park_start:.1f}s.")
+        self._clear_debug_lookahead()
+        cpu_start = time.thread_time()
+        remaining = resume_at - self.clock.time()
+        if remaining > 0:
+            self.clock.wait_event(self.esc_event, remaining)
+
+        for i in range(next_index, min(next_index + config.BREAK_PRETOUCH_OBJECTS, len(hit_objects))):
+            if hit_objects[i].get('curveType'):
+                self._get_slider_screen_path(i)
+
+        break_stats['breaks'] += 1
+        break_stats['parked_sec'] += self.clock.time() - park_start
+        break_stats['cpu_sec'] += time.thread_time() - cpu_start
+        return True
+
+    def _report_breaks(self, break_stats):
+        """
+        Prints the CPU time parking saved over the map's breaks.
+
+        Without parking, the executor would have busy-ticked through each
+        break. That cost is estimated from this map's own CPU time per cursor
+        tick outside the breaks, and the CPU actually used while parked is
+        subtracted from it.
+        """
+        active_ticks = self.metrics.ticks - break_stats['ticks_start']
+        active_cpu_sec = time.thread_time() - break_stats['cpu_start'] - break_stats['cpu_sec']
+        tick_cpu_sec = active_cpu_sec / active_ticks if active_ticks else 0.0
+        busy_cpu_sec = tick_cpu_sec * break_stats['parked_sec'] / 0.001
+        saved_sec = busy_cpu_sec - break_stats['cpu_sec']
+        print(f"  -> Parked {break_stats['parked_sec']:.1f}s over {break_stats['breaks']} break(s): "
+              f"~{saved_sec * 1000:.1f}ms CPU saved ({break_stats['cpu_sec'] * 1000:.1f}ms used vs "
+              f"~{busy_cpu_sec * 1000:.1f}ms busy-ticking at {tick_cpu_sec * 1e6:.1f}us per tick).")
+
     def _setup_hotkeys(self):
-        keyboard.add_hotkey('q', self._on_q_press)
+        import keyboard
+        keyboard.on_press_key('q', self._on_q_event)
         keyboard.add_hotkey('esc', self._on_esc_press)
-        print(" -> 'q' and 'esc' hotkeys are now active.")
+        keyboard.add_hotkey('ctrl+end', self.profiler.toggle)
+        print(" -> 'q', 'esc' and 'ctrl+end' (profile) hotkeys are now active.")
 
     def run(self):
         self._setup_hotkeys()
+        MetricsSampler(self.metrics, self.overlay, config.METRICS_SAMPLE_MS / 1000.0,
+                       config.METRICS_SNAPSHOT_PATH).start()
+        if self.watcher is None:
+            self.watcher = create_watcher(self.title_source)
         try:
+            title, detected_at = self.watcher.current_title or "", time.perf_counter()
+            shown_state = None
             while True:
-                self.overlay.update_status(self.state.name)
+                state_before = self.state
                 if self.state == State.IDLE:
-                    self._handle_idle_state()
+                    self._handle_idle_state(title, detected_at)
                 elif self.state == State.ARMED:
-                    self._handle_armed_state()
-                time.sleep(0.01)
+                    self._handle_armed_state(title)
+                if state_before == State.ARMED and self.state == State.IDLE:
+                    # Back from a map (or it was left): look at the title again without waiting for a change.
+                    title, detected_at = self.watcher.current_title or "", time.perf_counter()
+                    continue
+                # Publish the state before blocking, so ARMED shows as soon as the map is loaded.
+                if self.state != shown_state:
+                    shown_state = self.state
+                    self.overlay.update_status(self.state.name)
+                change = self._wait_for_title_change()
+                if change is not None:
+                    title, detected_at = change
         except KeyboardInterrupt:
-            self.overlay.root.quit()
+            self.overlay.request_quit()
         except Exception as e:
             print(f"\nAn unexpected critical error occurred: {e}")
-            self.overlay.root.quit()
+            self.overlay.request_quit()
+        finally:
+            # Turn the collector back on and drop the raised priority however the loop ended.
+            if self.realtime is not None:
+                self.realtime.exit()
+
+    def _wait_for_title_change(self):
+        """
+        Blocks until the window title changes or a 'q' press wakes the watcher.
+
+        Time spent blocked while IDLE is added to `idle_stats` together with
+        the process CPU time used meanwhile. After a failed map load, it only
+        blocks for `config.BEATMAP_RETRY_MS`, so the load is retried even if
+        the title does not change (osu! not found yet, map still extracting).
+        """
+        if self.state != State.IDLE:
+            return self.watcher.next_title()
+        timeout = config.BEATMAP_RETRY_MS / 1000.0 if self.retry_load else None
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        change = self.watcher.next_title(timeout)
+        self.idle_stats['idle_sec'] += time.perf_counter() - wall_start
+        self.idle_stats['cpu_sec'] += time.process_time() - cpu_start
+        return change
 
     def _reset_to_idle(self):
         self.overlay.update_debug_visuals(None)
@@ -87,52 +361,101 @@ class Pilot:
         self.beatmap_data = None
         self.overlay.update_beatmap()
         self.overlay.update_difficulty()
-        self.esc_pressed_flag = False
-        self.q_pressed_flag = False
+        self.esc_event.clear()
+        self.q_event.clear()
+        self.sync = None
 
-    def _handle_idle_state(self):
-        active_title = utils.get_active_window_title()
+    def _handle_idle_state(self, active_title, detected_at):
         is_in_map = active_title.startswith("osu!") and " - " in active_title
+        self.retry_load = False
         if is_in_map:
             current_beatmap_title = active_title.split(" - ", 1)[1]
             if current_beatmap_title != self.last_beatmap_title:
                 self.last_beatmap_title = current_beatmap_title
-                osu_dir = utils.find_osu_directory()
-                if not osu_dir:
+                self.phases.reset()
+                load_started = started = time.perf_counter_ns()
+                osu_paths = utils.find_osu_paths()
+                if not osu_paths:
                     self.overlay.update_beatmap("CRITICAL: osu! directory not found.")
                     self.last_beatmap_title = None
-                    time.sleep(5)
+                    self.retry_load = True
+                    self.clock.sleep(5)
                     return
-                songs_dir = os.path.join(osu_dir, "Songs")
-                original_data = parser.find_and_process_beatmap(current_beatmap_title, songs_dir)
+                songs_dir = osu_paths['songs_directory']
+                print(f"Beatmap Detected: {current_beatmap_title}")
+                beatmap_path = parser.find_beatmap_file(current_beatmap_title, songs_dir)
+                if beatmap_path is None:
+                    # The saved Songs directory may be stale (moved, or BeatmapDirectory changed).
+                    osu_paths = utils.refresh_osu_paths()
+                    if osu_paths and osu_paths['songs_directory'] != songs_dir:
+                        beatmap_path = parser.find_beatmap_file(current_beatmap_title, osu_paths['songs_directory'])
+                self.phases.add(BEATMAP_LOOKUP, started)
+                original_data = parser.load_osu_file(beatmap_path, self.phases) if beatmap_path else None
                 if original_data and original_data.get("HitObjects"):
+                    started = time.perf_counter_ns()
                     self.beatmap_data = self.mod_handler.apply_mods(original_data)
+                    self.phases.add(APPLY_MODS, started)
+                    self._prepare_map()
                     self.overlay.update_beatmap(current_beatmap_title)
                     self.overlay.update_difficulty(self.beatmap_data.get("Difficulty"))
                     self.state = State.ARMED
+                    self.phases.add(MAP_LOAD, load_started)
+                    self._reserve_trace()
+                    latency_ms = (time.perf_counter() - detected_at) * 1000
+                    print(f"  -> Armed {latency_ms:.1f}ms after the title change "
+                          f"(idle so far: {self.idle_stats['idle_sec']:.0f}s, {self.idle_stats['cpu_sec'] * 1000:.0f}ms CPU).")
                 else:
                     self.last_beatmap_title = None
+                    self.retry_load = True
                     self.overlay.update_beatmap("Beatmap file not found.")
                     self.overlay.update_difficulty(None)
 
-    def _handle_armed_state(self):
-        active_title = utils.get_active_window_title()
+    def _handle_armed_state(self, active_title):
         is_in_map = active_title.startswith("osu!") and " - " in active_title
         if not is_in_map:
             self._reset_to_idle()
             return
-        if self.q_pressed_flag:
-            self.q_pressed_flag = False
+        if self.q_event.is_set():
+            self.q_event.clear()
             print("  -> 'q' press detected. Synchronizing...")
             ar = self.beatmap_data["Difficulty"].get("ApproachRate", 9)
             ar_fadein_ms = utils.calculate_ar_fadein_ms(ar)
-            first_note_time_ms = self.beatmap_data["HitObjects"][0]['time']
-            song_timeline_at_keypress_sec = (first_note_time_ms - ar_fadein_ms) / 1000.0
-            time_circle_actually_appeared = self.q_press_time - self.calibrated_reaction_time_sec
-            start_time = time_circle_actually_appeared - song_timeline_at_keypress_sec
+            self.sync = SyncEstimator(self.beatmap_data["HitObjects"], ar_fadein_ms,
+                                      self.calibrated_reaction_time_sec, self.pipeline_latency_sec,
+                                      config.SYNC_TAP_COUNT)
+            self.sync.add_tap(self.q_press_time)
             print("  -> Sync complete. Engaging.")
-            self._execute_beatmap(start_time)
+            self._execute_beatmap(self.sync.start_time)
             
+    def _prepare_map(self):
+        """
+        Resets the per-map caches once the map is loaded. In real-time mode it
+        also fills them: the screen path of every slider and the stream group
+        (or None) starting at every object. Otherwise both are built lazily
+        inside the loop, with the collector off.
+
+        Runs at arm time: on a long map this takes seconds, and the first
+        object can be due a few hundred milliseconds after the 'q' tap.
+        """
+        self._slider_paths = {}
+        self._slider_screen_paths = {}
+        self._stream_groups = None
+        if not self.realtime_mode:
+            return
+        hit_objects = self.beatmap_data["HitObjects"]
+        for i, hit_object in enumerate(hit_objects):
+            if hit_object.get('curveType') is not None:
+                self._get_slider_screen_path(i)
+        self._stream_groups = [self._find_stream_group(i) for i in range(len(hit_objects))]
+
+    def _reserve_trace(self):
+        """Sizes the trace ring for the armed map, so the loop never allocates it after the sync tap."""
+        if self.phases.trace is None:
+            return
+        hit_objects = self.beatmap_data["HitObjects"]
+        self.phases.trace.reserve(int(max(0.0, hit_objects[-1]['time']) * config.TRACE_SPANS_PER_MS)
+                                  + SPANS_PER_OBJECT * len(hit_objects))
+
     def _find_stream_group(self, start_index):
         """
         Looks ahead from a given index to find a consecutive group of notes that form a stream.
@@ -150,7 +473,7 @@ class Pilot:
                 break
 
             time_delta = next_obj['time'] - current_obj['time']
-            dist = np.linalg.norm(np.array([current_obj['x'], current_obj['y']]) - np.array([next_obj['x'], next_obj['y']]))
+            dist = math.hypot(current_obj['x'] - next_obj['x'], current_obj['y'] - next_obj['y'])
 
             if time_delta <= STREAM_TIME_THRESHOLD_MS and dist <= STREAM_DISTANCE_THRESHOLD_OSU_PIXELS:
                 if not stream_candidates:
@@ -164,25 +487,25 @@ class Pilot:
             
         return None
 
-    def _execute_stream_group(self, stream_notes, start_time, last_screen_pos, use_s_key_ref):
+    def _execute_stream_group(self, stream_notes, start_time, last_screen_pos, use_s_key_ref, first_index):
         """
         Executes a pre-identified group of stream notes with continuous movement.
         """
         print(f"  -> Stream detected with {len(stream_notes)} notes. Executing.")
-        stream_start_time_sec = start_time + (stream_notes[0]['time'] / 1000.0) + (config.TIMING_OFFSET_MS / 1000.0)
+        stream_start_time_sec = start_time + (stream_notes[0]['time'] / 1000.0) + (config.TIMING_OFFSET_MS / 1000.0) - self._emit_lead_sec()
         stream_end_time_sec = start_time + (stream_notes[-1]['time'] / 1000.0) + (config.TIMING_OFFSET_MS / 1000.0)
         total_duration_sec = stream_end_time_sec - stream_start_time_sec
 
         # Create a path of screen coordinates for the entire stream
-        stream_path_screen = [utils.convert_coordinates(note['x'], note['y'], self.screen_width, self.screen_height) for note in stream_notes]
+        stream_path_screen = [tuple(p) for p in self.playfield.to_screen([(note['x'], note['y']) for note in stream_notes]).tolist()]
         
         # Prepend the starting mouse position to the path for a smooth entry into the stream
         entry_path = [last_screen_pos, stream_path_screen[0]]
-        entry_duration_sec = stream_start_time_sec - time.time()
+        entry_duration_sec = stream_start_time_sec - self.clock.time()
 
         # Move into the start of the stream
         if entry_duration_sec > 0.01:
-            move_start_time = time.time()
+            move_start_time = self.clock.time()
             p0, p2 = np.array(entry_path[0]), np.array(entry_path[1])
             midpoint = (p0 + p2) / 2
             vec = p2 - p0
@@ -190,241 +513,346 @@ class Pilot:
             if dist > 0: perp_vec = np.array([-vec[1], vec[0]]) / dist
             else: perp_vec = np.array([0, 0])
             max_offset = dist * 0.20
-            offset = random.uniform(-max_offset, max_offset)
+            offset = self.rng.uniform(-max_offset, max_offset)
             p1 = midpoint + perp_vec * offset
-
-            while time.time() < move_start_time + entry_duration_sec:
-                if self.esc_pressed_flag: return last_screen_pos, time.time()
-                progress = (time.time() - move_start_time) / entry_duration_sec
-                eased_progress = utils.ease_in_out_sine(min(progress, 1.0))
-                bezier_pos = utils.calculate_quadratic_bezier_point(p0, p1, p2, eased_progress)
-                pydirectinput.moveTo(int(bezier_pos[0]), int(bezier_pos[1]))
-                time.sleep(0.001)
-
-        # Execute the main stream path with continuous movement
-        stream_exec_start_time = time.time()
+            p0x, p0y, p1x, p1y, p2x, p2y = float(p0[0]), float(p0[1]), float(p1[0]), float(p1[1]), float(p2[0]), float(p2[1])
+
+            while self.clock.time() < move_start_time + entry_duration_sec:
+                if self.esc_event.is_set(): return last_screen_pos, self.clock.time()
+                started = time.perf_counter_ns()
+                progress = (self.clock.time() - move_start_time) / entry_duration_sec
+                eased_progress = fastmath.ease_in_out_sine_lut(progress)
+                bezier_x, bezier_y = fastmath.bezier2(p0x, p0y, p1x, p1y, p2x, p2y, eased_progress)
+                self.phases.add(CURVE, started)
+                self._move(int(bezier_x), int(bezier_y))
+                self._tick()
+
+        # Execute the main stream path with continuous movement. The path is
+        # anchored to the schedule, so a late entry joins it mid-way.
+        stream_exec_start_time = stream_start_time_sec
         note_index_in_stream = 0
+        path_xs = [float(x) for x, _ in stream_path_screen]
+        path_ys = [float(y) for _, y in stream_path_screen]
+        last_path_idx = len(stream_path_screen) - 1
         
-        while time.time() < stream_exec_start_time + total_duration_sec:
-            if self.esc_pressed_flag: break
+        while self.clock.time() < stream_exec_start_time + total_duration_sec:
+            if self.esc_event.is_set(): break
             
             # Continuous cursor movement
-            stream_progress = (time.time() - stream_exec_start_time) / total_duration_sec
+            stream_progress = (self.clock.time() - stream_exec_start_time) / total_duration_sec
             stream_progress = min(stream_progress, 1.0)
             
             # Find which segment of the path we are on
-            segment_progress = stream_progress * (len(stream_path_screen) - 1)
+            segment_progress = stream_progress * last_path_idx
             path_idx = int(segment_progress)
             local_progress = segment_progress - path_idx
+            next_idx = min(path_idx + 1, last_path_idx)
 
-            p_start = np.array(stream_path_screen[path_idx])
-            p_end = np.array(stream_path_screen[min(path_idx + 1, len(stream_path_screen) - 1)])
-            
-            current_pos = p_start * (1 - local_progress) + p_end * local_progress
-            pydirectinput.moveTo(int(current_pos[0]), int(current_pos[1]))
+            current_x, current_y = fastmath.lerp2(path_xs[path_idx], path_ys[path_idx], path_xs[next_idx], path_ys[next_idx], local_progress)
+            self._move(int(current_x), int(current_y))
             
             # Decoupled clicking logic
             if note_index_in_stream < len(stream_notes):
                 note_hit_time_sec = start_time + (stream_notes[note_index_in_stream]['time'] / 1000.0) + (config.TIMING_OFFSET_MS / 1000.0)
-                if time.time() >= note_hit_time_sec:
+                note_emit_time_sec = note_hit_time_sec - self._emit_lead_sec()
+                lateness_sec = self.clock.time() - note_emit_time_sec
+                if lateness_sec > self.drop_window_sec:
+                    self._record_catch_up(first_index + note_index_in_stream, lateness_sec, dropped=True)
+                    note_index_in_stream += 1
+                elif lateness_sec >= 0:
                     key_to_press = 's' if use_s_key_ref['value'] else 'a'
-                    pydirectinput.keyDown(key_to_press)
-                    time.sleep(0.01)
-                    pydirectinput.keyUp(key_to_press)
+                    self._press_key(key_to_press, note_hit_time_sec, note_emit_time_sec, first_index + note_index_in_stream)
+                    self.clock.sleep(0.01)
+                    self.input.keyUp(key_to_press)
                     use_s_key_ref['value'] = not use_s_key_ref['value']
                     note_index_in_stream += 1
             
-            time.sleep(0.001)
+            self._tick()
 
         # Ensure all clicks in the stream are executed if timing was tight
         while note_index_in_stream < len(stream_notes):
-            if self.esc_pressed_flag: break
+            if self.esc_event.is_set(): break
             note_hit_time_sec = start_time + (stream_notes[note_index_in_stream]['time'] / 1000.0) + (config.TIMING_OFFSET_MS / 1000.0)
-            while time.time() < note_hit_time_sec:
-                 if self.esc_pressed_flag: break
-            if self.esc_pressed_flag: break
+            note_emit_time_sec = note_hit_time_sec - self._emit_lead_sec()
+            if not self.clock.wait_until(note_emit_time_sec, self._should_abort): break
+            lateness_sec = self.clock.time() - note_emit_time_sec
+            if lateness_sec > self.drop_window_sec:
+                self._record_catch_up(first_index + note_index_in_stream, lateness_sec, dropped=True)
+                note_index_in_stream += 1
+                continue
             key_to_press = 's' if use_s_key_ref['value'] else 'a'
-            pydirectinput.keyDown(key_to_press)
-            time.sleep(0.01)
-            pydirectinput.keyUp(key_to_press)
+            self._press_key(key_to_press, note_hit_time_sec, note_emit_time_sec, first_index + note_index_in_stream)
+            self.clock.sleep(0.01)
+            self.input.keyUp(key_to_press)
             use_s_key_ref['value'] = not use_s_key_ref['value']
             note_index_in_stream += 1
             
         final_pos = stream_path_screen[-1]
-        return final_pos, time.time()
+        return final_pos, self.clock.time()
 
 
+    def _snapshot_overlay_settings(self):
+        """Copies the overlay toggles once per map so the hot loop never asks the overlay."""
+        self.flow_aim = self.overlay.is_flow_aim_active()
+        self.debug_mode = self.overlay.is_debug_mode_active()
+
     def _execute_beatmap(self, start_time):
+        self._snapshot_overlay_settings()
         self.state = State.RUNNING
         hit_object_index = 0
         use_s_key_ref = {'value': True} # Use dict to pass by reference
-        last_action_time_sec = time.time()
-        last_screen_pos = pyautogui.position()
+        last_action_time_sec = self.clock.time()
+        last_screen_pos = self.input.position()
         p_minus_1 = None
+        self.timing_recorder = HitTimingRecorder(len(self.beatmap_data["HitObjects"]))
+        od = self.beatmap_data["Difficulty"].get("OverallDifficulty", 5)
+        self.drop_window_sec = utils.hit_windows_ms(od)[2] / 1000.0
+        self._debug_notes = {}
+        self._debug_lookahead = None
+        if self.debug_mode:
+            ar = self.beatmap_data["Difficulty"].get("ApproachRate", 9)
+            self.approach_window = ApproachWindow(self.beatmap_data, utils.calculate_ar_fadein_ms(ar))
+        breaks_by_next_object = self._map_breaks_to_objects()
+        break_stats = {'breaks': 0, 'parked_sec': 0.0, 'cpu_sec': 0.0,
+                       'cpu_start': time.thread_time(), 'ticks_start': self.metrics.ticks}
+        self.worst_tick_sec = 0.0
+        self.metrics.start_map()
+        self._last_move_x = self._last_move_y = None
+        if self.phases.trace is not None:
+            self.phases.trace.rewind()
+        # In real-time mode the per-map caches were filled when the map was
+        # armed (`_prepare_map`). The loop still creates small per-object values (control points, tuples);
+        # reference counting frees those, so they do not need the collector.
+        self.realtime = RealtimeSession(self.realtime_mode, config.REALTIME_CPU).enter()
 
-        while hit_object_index < len(self.beatmap_data["HitObjects"]):
-            if self.esc_pressed_flag:
-                print("  -> ESC press detected. Autopilot STOPPED.")
-                self.overlay.update_debug_visuals(None)
-                break
+        try:
+            while hit_object_index < len(self.beatmap_data["HitObjects"]):
+                if self.sync is not None:
+                    start_time = self.sync.start_time
+                if self.esc_event.is_set():
+                    print("  -> ESC press detected. Autopilot STOPPED.")
+                    self.overlay.update_debug_visuals(None)
+                    break
+
+                # --- Break Periods ---
+                break_period = breaks_by_next_object.pop(hit_object_index, None)
+                if break_period and self._park_for_break(break_period, start_time, hit_object_index, break_stats):
+                    if self.esc_event.is_set(): continue
+                    if self.sync is not None:
+                        start_time = self.sync.start_time
+                    last_action_time_sec = self.clock.time()
             
-            self.overlay.update_status(self.state.name)
+                self.profiler.sync()
+                self.metrics.cpu_sec = time.thread_time()
+                started = time.perf_counter_ns()
+                self.overlay.update_status(self.state.name)
+                self.phases.add(OVERLAY, started)
             
-            # --- Stream Detection Logic ---
-            stream_group = self._find_stream_group(hit_object_index)
+                # --- Stream Detection Logic ---
+                started = time.perf_counter_ns()
+                if self._stream_groups is not None:
+                    stream_group = self._stream_groups[hit_object_index]
+                else:
+                    stream_group = self._find_stream_group(hit_object_index)
+                self.phases.add(STREAM_DETECT, started)
             
-            if stream_group:
-                # Execute the entire stream as one atomic operation
-                new_last_pos, new_last_action_time = self._execute_stream_group(stream_group, start_time, last_screen_pos, use_s_key_ref)
+                if stream_group:
+                    # Execute the entire stream as one atomic operation
+                    started = time.perf_counter_ns()
+                    new_last_pos, new_last_action_time = self._execute_stream_group(stream_group, start_time, last_screen_pos, use_s_key_ref, hit_object_index)
+                    self.phases.add(STREAM_GROUP, started, hit_object_index)
                 
-                # Update state after stream execution
-                last_screen_pos = new_last_pos
-                p_minus_1 = np.array(last_screen_pos)
-                last_action_time_sec = new_last_action_time
-                hit_object_index += len(stream_group)
-                continue # Skip to the next iteration of the main loop
-            # --- End of Stream Logic ---
-
-            # --- Default (Non-Stream) Object Logic ---
-            hit_object = self.beatmap_data["HitObjects"][hit_object_index]
-            self.overlay.update_note_info(hit_object, hit_object_index)
-
-            offset_sec = config.TIMING_OFFSET_MS / 1000.0
-            target_time_sec = start_time + (hit_object['time'] / 1000.0) + offset_sec
-            target_screen_pos = utils.convert_coordinates(hit_object['x'], hit_object['y'], self.screen_width, self.screen_height)
-            time_to_move_sec = target_time_sec - last_action_time_sec
+                    # Update state after stream execution
+                    last_screen_pos = new_last_pos
+                    p_minus_1 = last_screen_pos
+                    last_action_time_sec = new_last_action_time
+                    hit_object_index += len(stream_group)
+                    continue # Skip to the next iteration of the main loop
+                # --- End of Stream Logic ---
+
+                # --- Default (Non-Stream) Object Logic ---
+                hit_object = self.beatmap_data["HitObjects"][hit_object_index]
+                is_spinner = hit_object['type'] & 8
+                is_slider = hit_object.get('curveType') is not None
+
+                offset_sec = config.TIMING_OFFSET_MS / 1000.0
+                target_time_sec = start_time + (hit_object['time'] / 1000.0) + offset_sec
+                emit_time_sec = target_time_sec - self._emit_lead_sec()
+                target_screen_pos = self.playfield.to_screen_point(hit_object['x'], hit_object['y'])
+                time_to_move_sec = emit_time_sec - last_action_time_sec
+
+                # --- Catch-Up Policy ---
+                # Once the executor is late, it snaps to the target instead of easing
+                # there, skips cosmetic overlay work, and drops circles whose hit
+                # window has already passed. Sliders and spinners are timed from
+                # their own deadlines, so joining them late does not add lateness.
+                lateness_sec = self.clock.time() - emit_time_sec
+                catching_up = lateness_sec > self.catch_up_threshold_sec
+                if catching_up:
+                    drop = not (is_spinner or is_slider) and lateness_sec > self.drop_window_sec
+                    self._record_catch_up(hit_object_index, lateness_sec, dropped=drop)
+                    if drop:
+                        hit_object_index += 1
+                        continue
+                else:
+                    started = time.perf_counter_ns()
+                    self.overlay.update_note_info(hit_object, hit_object_index)
+                    self.phases.add(OVERLAY, started)
             
-            p0 = np.array(last_screen_pos)
-            p2 = np.array(target_screen_pos)
-            dist = np.linalg.norm(p2 - p0)
+                p0 = np.array(last_screen_pos)
+                p2 = np.array(target_screen_pos)
+                dist = np.linalg.norm(p2 - p0)
             
-            if self.overlay.is_flow_aim_active():
-                midpoint = (p0 + p2) / 2
-                if p_minus_1 is not None and dist > 0:
-                    vec_in = p0 - p_minus_1; vec_out = p2 - p0
-                    norm_in = np.linalg.norm(vec_in); norm_out = np.linalg.norm(vec_out)
-                    if norm_in > 0 and norm_out > 0:
-                        flow_vec = (vec_in / norm_in) + (vec_out / norm_out)
-                        norm_flow = np.linalg.norm(flow_vec)
-                        if norm_flow > 0: perp_vec = np.array([-flow_vec[1], flow_vec[0]]) / norm_flow
+                if self.flow_aim:
+                    midpoint = (p0 + p2) / 2
+                    if p_minus_1 is not None and dist > 0:
+                        vec_in = p0 - p_minus_1; vec_out = p2 - p0
+                        norm_in = np.linalg.norm(vec_in); norm_out = np.linalg.norm(vec_out)
+                        if norm_in > 0 and norm_out > 0:
+                            flow_vec = (vec_in / norm_in) + (vec_out / norm_out)
+                            norm_flow = np.linalg.norm(flow_vec)
+                            if norm_flow > 0: perp_vec = np.array([-flow_vec[1], flow_vec[0]]) / norm_flow
+                            else: perp_vec = np.array([-(p2-p0)[1], (p2-p0)[0]]) / dist
                         else: perp_vec = np.array([-(p2-p0)[1], (p2-p0)[0]]) / dist
-                    else: perp_vec = np.array([-(p2-p0)[1], (p2-p0)[0]]) / dist
-                    max_offset = dist * 0.4; offset = random.uniform(max_offset * 0.25, max_offset)
-                    if np.cross(vec_in, vec_out) < 0: offset = -offset
-                    p1 = midpoint + perp_vec * offset
+                        max_offset = dist * 0.4; offset = self.rng.uniform(max_offset * 0.25, max_offset)
+                        if np.cross(vec_in, vec_out) < 0: offset = -offset
+                        p1 = midpoint + perp_vec * offset
+                    else:
+                        if dist > 0: perp_vec = np.array([-(p2-p0)[1], (p2-p0)[0]]) / dist
+                        else: perp_vec = np.array([0, 0])
+                        max_offset = dist * 0.25; offset = self.rng.uniform(-max_offset, max_offset)
+                        p1 = midpoint + perp_vec * offset
                 else:
-                    if dist > 0: perp_vec = np.array([-(p2-p0)[1], (p2-p0)[0]]) / dist
+                    midpoint = (p0 + p2) / 2; vec = p2 - p0
+                    if dist > 0: perp_vec = np.array([-vec[1], vec[0]]) / dist
                     else: perp_vec = np.array([0, 0])
-                    max_offset = dist * 0.25; offset = random.uniform(-max_offset, max_offset)
+                    max_offset = dist * 0.20; offset = self.rng.uniform(-max_offset, max_offset)
                     p1 = midpoint + perp_vec * offset
-            else:
-                midpoint = (p0 + p2) / 2; vec = p2 - p0
-                if dist > 0: perp_vec = np.array([-vec[1], vec[0]]) / dist
-                else: perp_vec = np.array([0, 0])
-                max_offset = dist * 0.20; offset = random.uniform(-max_offset, max_offset)
-                p1 = midpoint + perp_vec * offset
-
-            if self.overlay.is_debug_mode_active():
-                future_notes_to_draw = []
-                for i in range(1, 4):
-                    if hit_object_index + i < len(self.beatmap_data["HitObjects"]):
-                        note = self.beatmap_data["HitObjects"][hit_object_index + i]
-                        is_slider = note.get('curveType') is not None
-                        
-                        note_info = {}
-                        if is_slider:
-                            osu_pixel_path = parser.calculate_slider_path(note)
-                            screen_path = [utils.convert_coordinates(px, py, self.screen_width, self.screen_height) for px, py in osu_pixel_path]
-                            note_info['type'] = 'slider'
-                            note_info['path'] = screen_path
-                        else:
-                            pos = utils.convert_coordinates(note['x'], note['y'], self.screen_width, self.screen_height)
-                            note_info['type'] = 'circle'
-                            note_info['screen_pos'] = pos
-                            note_info['radius'] = 40 - (i * 5)
-                        
-                        future_notes_to_draw.append(note_info)
-
-                self.overlay.update_debug_visuals({'future_notes': future_notes_to_draw})
-            else:
-                self.overlay.update_debug_visuals(None)
-
-            if time_to_move_sec > 0.01:
-                move_start_time = last_action_time_sec
-                while time.time() < move_start_time + time_to_move_sec:
-                    if self.esc_pressed_flag: break
-                    progress = (time.time() - move_start_time) / time_to_move_sec
-                    eased_progress = utils.ease_in_out_sine(min(progress, 1.0))
-                    bezier_pos = utils.calculate_quadratic_bezier_point(p0, p1, p2, eased_progress)
-                    noise_input = progress * self.noise_scale
-                    noise_x = noise.pnoise1(noise_input, octaves=self.noise_octaves, persistence=self.noise_persistence, lacunarity=self.noise_lacunarity, base=self.noise_base_x)
-                    noise_y = noise.pnoise1(noise_input, octaves=self.noise_octaves, persistence=self.noise_persistence, lacunarity=self.noise_lacunarity, base=self.noise_base_y)
-                    final_x = bezier_pos[0] + noise_x * self.noise_strength
-                    final_y = bezier_pos[1] + noise_y * self.noise_strength
-                    pydirectinput.moveTo(int(final_x), int(final_y))
-                    time.sleep(0.001)
-
-            if self.esc_pressed_flag: break
-            
-            pydirectinput.moveTo(target_screen_pos[0], target_screen_pos[1])
-            while time.time() < target_time_sec:
-                pass
-
-            if self.esc_pressed_flag: break
 
-            key_to_press = 's' if use_s_key_ref['value'] else 'a'
-            is_spinner = hit_object['type'] & 8
-            is_slider = hit_object.get('curveType') is not None
-            if is_spinner:
-                duration = (hit_object['endTime'] - hit_object['time']) / 1000.0
-                spin_center_screen = utils.convert_coordinates(256, 192, self.screen_width, self.screen_height)
-                pydirectinput.keyDown(key_to_press)
-                spinner_start_time = time.time()
-                while time.time() < spinner_start_time + duration:
-                    if self.esc_pressed_flag: break
-                    elapsed = time.time() - spinner_start_time
-                    angle = (elapsed * (config.SPINNER_RPM / 60)) * (2 * np.pi)
-                    radius = config.SPINNER_RADIUS + random.uniform(-config.SPINNER_RADIUS_FLUCTUATION, config.SPINNER_RADIUS_FLUCTUATION) * utils.ease_in_out_sine(elapsed / duration if duration > 0 else 1)
-                    screen_x = spin_center_screen[0] + radius * np.cos(angle)
-                    screen_y = spin_center_screen[1] + radius * np.sin(angle)
-                    pydirectinput.moveTo(int(screen_x), int(screen_y))
-                    time.sleep(0.001)
-                pydirectinput.keyUp(key_to_press)
-                last_screen_pos = spin_center_screen
-            elif is_slider:
-                duration_per_slide = parser.get_slider_duration(hit_object, self.beatmap_data["Difficulty"], self.beatmap_data["TimingPoints"]) / hit_object['slides']
-                path = parser.calculate_slider_path(hit_object)
-                if path:
-                    pydirectinput.keyDown(key_to_press)
-                    for slide_num in range(hit_object['slides']):
-                        if self.esc_pressed_flag: break
-                        slide_start_time = time.time()
-                        current_path = path if slide_num % 2 == 0 else path[::-1]
-                        time_to_spend_on_slide = duration_per_slide / 1000.0
-                        while time.time() < slide_start_time + time_to_spend_on_slide:
-                            if self.esc_pressed_flag: break
-                            progress = (time.time() - slide_start_time) / time_to_spend_on_slide if time_to_spend_on_slide > 0 else 1.0
-                            path_index = int((len(current_path) - 1) * min(progress, 1.0))
-                            current_pos = current_path[path_index]
-                            screen_x, screen_y = utils.convert_coordinates(current_pos[0], current_pos[1], self.screen_width, self.screen_height)
-                            pydirectinput.moveTo(screen_x, screen_y)
-                            time.sleep(0.001)
-                    pydirectinput.keyUp(key_to_press)
-                    if not self.esc_pressed_flag:
-                        final_slider_pos_osu = path[-1] if hit_object['slides'] % 2 == 1 else path[0]
-                        last_screen_pos = utils.convert_coordinates(final_slider_pos_osu[0], final_slider_pos_osu[1], self.screen_width, self.screen_height)
-            else: # Circle
-                pydirectinput.keyDown(key_to_press)
-                time.sleep(0.01)
-                pydirectinput.keyUp(key_to_press)
-                last_screen_pos = target_screen_pos
+                started = time.perf_counter_ns()
+                if catching_up:
+                    pass
+                elif self.debug_mode:
+                    self._send_debug_lookahead(start_time)
+                else:
+                    self._clear_debug_lookahead()
+                self.phases.add(OVERLAY, started)
+
+                if time_to_move_sec > 0.01 and not catching_up:
+                    approach_started = time.perf_counter_ns()
+                    move_start_time = last_action_time_sec
+                    p0x, p0y, p1x, p1y, p2x, p2y = float(p0[0]), float(p0[1]), float(p1[0]), float(p1[1]), float(p2[0]), float(p2[1])
+                    while self.clock.time() < move_start_time + time_to_move_sec:
+                        if self.esc_event.is_set(): break
+                        started = time.perf_counter_ns()
+                        progress = (self.clock.time() - move_start_time) / time_to_move_sec
+                        eased_progress = fastmath.ease_in_out_sine_lut(progress)
+                        bezier_x, bezier_y = fastmath.bezier2(p0x, p0y, p1x, p1y, p2x, p2y, eased_progress)
+                        noise_input = progress * self.noise_scale
+                        noise_x = self._pnoise1(noise_input, octaves=self.noise_octaves, persistence=self.noise_persistence, lacunarity=self.noise_lacunarity, base=self.noise_base_x)
+                        noise_y = self._pnoise1(noise_input, octaves=self.noise_octaves, persistence=self.noise_persistence, lacunarity=self.noise_lacunarity, base=self.noise_base_y)
+                        final_x = bezier_x + noise_x * self.noise_strength
+                        final_y = bezier_y + noise_y * self.noise_strength
+                        self.phases.add(CURVE, started)
+                        self._move(int(final_x), int(final_y))
+                        self._tick()
+                    self.phases.add(APPROACH, approach_started, hit_object_index)
+
+                if self.esc_event.is_set(): break
+
+                if is_spinner:
+                    # Build the whole spin table before the press so the spin loop only does lookups.
+                    duration = (hit_object['endTime'] - hit_object['time']) / 1000.0
+                    spinner_path = SpinnerTrajectory(self.playfield.to_screen_point(256, 192), duration, config.SPINNER_RPM,
+                                                     config.SPINNER_RADIUS, config.SPINNER_RADIUS_FLUCTUATION, self.rng)
+
+                self._move(target_screen_pos[0], target_screen_pos[1])
+                started = time.perf_counter_ns()
+                self.clock.wait_until(emit_time_sec, self._should_abort)
+                self.phases.add(WAIT, started)
+
+                if self.esc_event.is_set(): break
+
+                key_to_press = 's' if use_s_key_ref['value'] else 'a'
+                hit_started = time.perf_counter_ns()
+                if is_spinner:
+                    self._press_key(key_to_press, target_time_sec, emit_time_sec, hit_object_index, not catching_up)
+                    spinner_start_time = emit_time_sec
+                    while self.clock.time() < spinner_start_time + duration:
+                        if self.esc_event.is_set(): break
+                        screen_x, screen_y = spinner_path.next_position(self.clock.time() - spinner_start_time)
+                        self._move(screen_x, screen_y)
+                        spinner_path.record_emit(self.clock.time())
+                        self._tick()
+                    self.input.keyUp(key_to_press)
+                    self.phases.add(SPINNER, hit_started, hit_object_index)
+                    self._report_spinner(hit_object_index, spinner_path)
+                    last_screen_pos = (spinner_path.center_x, spinner_path.center_y)
+                elif is_slider:
+                    duration_per_slide = parser.get_slider_duration(hit_object, self.beatmap_data["Difficulty"], self.beatmap_data["TimingPoints"]) / hit_object['slides']
+                    started = time.perf_counter_ns()
+                    path = self._get_slider_screen_path(hit_object_index)
+                    self.phases.add(SLIDER_PATH, started)
+                    if path:
+                        self._press_key(key_to_press, target_time_sec, emit_time_sec, hit_object_index, not catching_up)
+                        for slide_num in range(hit_object['slides']):
+                            if self.esc_event.is_set(): break
+                            time_to_spend_on_slide = duration_per_slide / 1000.0
+                            slide_start_time = emit_time_sec + slide_num * time_to_spend_on_slide
+                            current_path = path if slide_num % 2 == 0 else path[::-1]
+                            while self.clock.time() < slide_start_time + time_to_spend_on_slide:
+                                if self.esc_event.is_set(): break
+                                progress = (self.clock.time() - slide_start_time) / time_to_spend_on_slide if time_to_spend_on_slide > 0 else 1.0
+                                path_index = int((len(current_path) - 1) * min(progress, 1.0))
+                                screen_x, screen_y = current_path[path_index]
+                                self._move(screen_x, screen_y)
+                                self._tick()
+                        self.input.keyUp(key_to_press)
+                        self.phases.add(SLIDER, hit_started, hit_object_index)
+                        if not self.esc_event.is_set():
+                            last_screen_pos = path[-1] if hit_object['slides'] % 2 == 1 else path[0]
+                else: # Circle
+                    self._press_key(key_to_press, target_time_sec, emit_time_sec, hit_object_index, not catching_up)
+                    self.clock.sleep(0.01)
+                    self.input.keyUp(key_to_press)
+                    self.phases.add(CIRCLE, hit_started, hit_object_index)
+                    last_screen_pos = target_screen_pos
             
-            p_minus_1 = np.array(last_screen_pos)
-            last_action_time_sec = time.time()
-            use_s_key_ref['value'] = not use_s_key_ref['value']
-            hit_object_index += 1
-        
+                p_minus_1 = last_screen_pos
+                last_action_time_sec = self.clock.time()
+                use_s_key_ref['value'] = not use_s_key_ref['value']
+                hit_object_index += 1
+        finally:
+            # Restore gc, affinity and priority on ESC or an exception too.
+            self.realtime.exit()
+
         if hit_object_index >= len(self.beatmap_data["HitObjects"]):
             print("  -> Beatmap finished!")
-
-        self._reset_to_idle()
\ No newline at end of file
+        if break_stats['breaks']:
+            self._report_breaks(break_stats)
+        self._report_timing()
+        print(f"  -> {format_realtime_summary(self.realtime.summary(), self.worst_tick_sec * 1000.0)}")
+        print(f"  -> {format_phases(self.phases.summary())}")
+        self.profiler.finish(self.last_beatmap_title)
+        if self.phases.trace is not None:
+            self.phases.trace.export(self.trace_dir, self.last_beatmap_title)
+        if self.persist_emit_lead and self.lead_estimator.samples:
+            utils.save_emit_lead(self.lead_estimator.lead_sec)
+        self._reset_to_idle()
+
+    def _report_spinner(self, object_index, spinner_path):
+        summary = spinner_path.summary()
+        self.timing_recorder.record_spinner(object_index, summary['achieved_rpm'])
+        text = f"  -> Spinner #{object_index}: {summary['achieved_rpm']:.0f} / {summary['target_rpm']:.0f} RPM"
+        if summary['phase_corrections']:
+            text += f" ({summary['phase_corrections']} phase corrections)"
+        print(text)
+
+    def _report_timing(self):
+        summary = self.timing_recorder.summary()
+        if summary is None:
+            return
+        print(f"  -> {format_summary(summary)}")
+        self.overlay.update_timing_summary(format_summary(summary))
+        if self.timing_report_dir:
+            self.timing_recorder.export(self.timing_report_dir, self.last_beatmap_title)
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Maps osu! playfield coordinates to screen pixels and back.
+
+osu! places its 512x384 playfield in the middle of the game area, scaled to
+80% of the area's height with a 4:3 aspect ratio. The `Playfield` object
+works that geometry out once per game area and stores it as a 2x3 affine
+matrix, so converting points is a multiply-add instead of recomputing the
+layout on every call.
+
+- `to_screen()`: Converts a whole `(N, 2)` array of osu! points at once.
+- `to_screen_point()`: Cheap scalar path for a single point.
+- `to_osu()`: The inverse transform, for reading recorded cursor positions
+  back into playfield space.
+
+The game area defaults to the full screen. For windowed or letterboxed
+play, pass the game's client rectangle as `game_rect` (see
+`config.GAME_WINDOW_RECT`).
+"""
+
+import numpy as np
+
+OSU_PLAYFIELD_WIDTH = 512
+OSU_PLAYFIELD_HEIGHT = 384
+
+
+class Playfield:
+    """
+    Affine osu!-to-screen transform for one game area.
+
+    Attributes:
+        matrix (np.ndarray): 2x3 matrix so that `screen = matrix @ [x, y, 1]`.
+    """
+
+    def __init__(self, screen_width, screen_height, game_rect=None):
+        area_x, area_y, area_width, area_height = game_rect or (0, 0, screen_width, screen_height)
+        playfield_height = area_height * 0.8
+        playfield_width = playfield_height * (4 / 3)
+        self.scale_x = playfield_width / OSU_PLAYFIELD_WIDTH
+        self.scale_y = playfield_height / OSU_PLAYFIELD_HEIGHT
+        self.offset_x = area_x + (area_width - playfield_width) / 2
+        self.offset_y = area_y + (area_height - playfield_height) / 2
+        self.matrix = np.array([[self.scale_x, 0.0, self.offset_x],
+                                [0.0, self.scale_y, self.offset_y]])
+
+    def to_screen(self, points):
+        """Converts an `(N, 2)` array of osu! points to integer screen pixels."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return (points @ self.matrix[:, :2].T + self.matrix[:, 2]).astype(np.int64)
+
+    def to_screen_point(self, osu_x, osu_y):
+        return int(osu_x * self.scale_x + self.offset_x), int(osu_y * self.scale_y + self.offset_y)
+
+    def to_osu(self, points):
+        """Converts an `(N, 2)` array of screen pixels back to osu! coordinates."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return (points - self.matrix[:, 2]) / np.array([self.scale_x, self.scale_y])
@@ -0,0 +1,176 @@
+"""
+Phase timers and an on-demand profiler for the executor.
+
+- `PhaseTimers`: Always-on wall-clock totals for the main sections of a run
+  (stream detection, cursor curves, `moveTo` calls, key presses, overlay
+  calls, sleeps, beatmap lookup, reading and parsing, ...). Each section is timed with
+  two `time.perf_counter_ns()` reads and added into preallocated per-phase
+  lists, so nothing is allocated per call. Phases can nest (a stream group
+  contains its moves and sleeps), so the totals overlap and do not add up
+  to the map length.
+- `MapProfiler`: A `cProfile` session for the current map, started and
+  stopped with a hotkey. The profiler is switched on and off by the bot
+  thread itself (cProfile only sees the thread that enables it), and the
+  `.prof` file is written at map end, never from inside the loop. Open it
+  with `python -m pstats` or snakeviz.
+
+Overhead: with the profiler off, one timed section costs about 0.3-0.5 µs
+(two clock reads and two list updates). The executor times at most four
+sections per 1 ms cursor tick, so the timers cost about 0.2% of a tick.
+`python profiling.py` measures the cost on the current machine.
+"""
+
+import cProfile
+import os
+import time
+
+import utils
+
+PHASE_NAMES = (
+    'stream_detect',  # _find_stream_group
+    'stream_group',   # _execute_stream_group, including its moves and presses
+    'curve',          # Bezier + noise for one cursor position
+    'move',           # input.moveTo
+    'key',            # key-down and its timing bookkeeping
+    'wait',           # clock.wait_until before a press
+    'sleep',          # 1 ms cursor ticks
+    'overlay',        # overlay update calls from the bot thread
+    'slider_path',    # slider path lookup/conversion
+    'beatmap_lookup', # finding the .osu file for a title
+    'beatmap_parse',  # parsing the .osu file's lines
+    'apply_mods',     # ModHandler.apply_mods
+    'map_load',       # title change until ARMED (contains lookup, read, parse, mods)
+    'approach',       # eased cursor move towards one object
+    'circle',         # press to release of a circle
+    'slider',         # press to release of a slider
+    'spinner',        # press to release of a spinner
+    'beatmap_read',   # reading the .osu file from disk
+)
+(STREAM_DETECT, STREAM_GROUP, CURVE, MOVE, KEY, WAIT, SLEEP, OVERLAY, SLIDER_PATH,
+ BEATMAP_LOOKUP, BEATMAP_PARSE, APPLY_MODS, MAP_LOAD, APPROACH, CIRCLE, SLIDER,
+ SPINNER, BEATMAP_READ) = range(len(PHASE_NAMES))
+
+
+class PhaseTimers:
+    """
+    Preallocated wall-clock counters, one slot per phase in `PHASE_NAMES`.
+
+    Usage:
+        start = time.perf_counter_ns()
+        ...
+        timers.add(MOVE, start)
+
+    Attributes:
+        trace (timeline.TraceRecorder): When set, every timed section is also
+                                        recorded as a span, with `index` as
+                                        its hit object.
+    """
+
+    def __init__(self):
+        self.total_ns = [0] * len(PHASE_NAMES)
+        self.calls = [0] * len(PHASE_NAMES)
+        self.trace = None
+
+    def add(self, phase, start_ns, index=-1):
+        end_ns = time.perf_counter_ns()
+        self.total_ns[phase] += end_ns - start_ns
+        self.calls[phase] += 1
+        if self.trace is not None:
+            self.trace.span(phase, start_ns, end_ns, index)
+
+    def reset(self):
+        """Clears the counters (and the attached trace) for the next map."""
+        for phase in range(len(PHASE_NAMES)):
+            self.total_ns[phase] = 0
+            self.calls[phase] = 0
+        if self.trace is not None:
+            self.trace.clear()
+
+    def summary(self):
+        """Returns `{phase: {'ms', 'calls', 'mean_us'}}` for every phase that ran."""
+        return {
+            name: {
+                'ms': self.total_ns[i] / 1e6,
+                'calls': self.calls[i],
+                'mean_us': self.total_ns[i] / self.calls[i] / 1e3,
+            }
+            for i, name in enumerate(PHASE_NAMES) if self.calls[i]
+        }
+
+
+def format_phases(summary, top=6):
+    ranked = sorted(summary.items(), key=lambda item: item[1]['ms'], reverse=True)[:top]
+    if not ranked:
+        return "Phases: N/A"
+    return "Phases: " + ", ".join(f"{name} {p['ms']:.1f}ms ({p['calls']}x)" for name, p in ranked)
+
+
+class MapProfiler:
+    """
+    cProfile session for the current map, toggled from the hotkey thread.
+
+    Args:
+        directory (str): Folder the `.prof` files are written to.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.requested = False
+        self._profile = None
+        self._running = False
+
+    def toggle(self):
+        """Hotkey callback. The bot thread picks the change up at its next object."""
+        self.requested = not self.requested
+        print(f" -> Profiling {'requested' if self.requested else 'stopped'}.")
+
+    def sync(self):
+        """Called by the bot thread once per object; starts or pauses profiling."""
+        if self.requested == self._running:
+            return
+        if self.requested:
+            if self._profile is None:
+                self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._profile.disable()
+        self._running = self.requested
+
+    def finish(self, beatmap_title=None):
+        """
+        Ends the session at map end and writes `<time> <map>.prof`.
+
+        Returns:
+            str: The path of the profile, or None if nothing was profiled.
+        """
+        if self._running:
+            self._profile.disable()
+        profile, self._profile = self._profile, None
+        self._running = False
+        self.requested = False
+        if profile is None:
+            return None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            name = utils.clean_filename(beatmap_title or "unknown")[:80]
+            path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')} {name}.prof")
+            profile.dump_stats(path)
+            print(f" -> Profile saved: {path}")
+            return path
+        except Exception as e:
+            print(f" ! Could not save profile: {e}")
+            return None
+
+
+def measure_overhead(iterations=1_000_000):
+    """Returns the cost of one timed section in nanoseconds."""
+    timers = PhaseTimers()
+    perf_counter_ns = time.perf_counter_ns
+    start = perf_counter_ns()
+    for _ in range(iterations):
+        timers.add(MOVE, perf_counter_ns())
+    return (perf_counter_ns() - start) / iterations
+
+
+if __name__ == "__main__":
+    print(f" -> One timed section costs {measure_overhead():.0f}ns.")
@@ -0,0 +1,188 @@
+"""
+Real-time mode for the executor while a map is RUNNING.
+
+Two things outside the bot's own code can stall the hot loop:
+- Python's cyclic garbage collector. It starts whenever enough container
+  objects have been allocated and can pause the thread for milliseconds in
+  the middle of a slider.
+- The OS scheduler, which moves the bot thread between cores and lets the
+  overlay and other programs run ahead of it.
+
+`RealtimeSession` wraps one map. With `config.REALTIME_MODE` enabled,
+`enter()` runs one full collection once the map is prepared, moves every
+surviving object into the permanent generation (`gc.freeze()`) and turns
+the collector off. Where the OS allows it, it also pins the thread to one
+CPU and raises the process and thread priority. `exit()` undoes all of it.
+
+The session reports the GC activity either way, so runs with and without
+the mode can be compared: collections (and their pause time) that did run,
+and with the mode on, roughly how many were avoided.
+"""
+
+import gc
+import os
+import sys
+import time
+
+# Windows constants (winbase.h)
+HIGH_PRIORITY_CLASS = 0x00000080
+THREAD_PRIORITY_HIGHEST = 2
+# Unix nice value requested for the process; needs privileges to lower it.
+UNIX_NICE = -10
+
+
+class RealtimeSession:
+    """
+    Holds the GC and scheduling changes for one map.
+
+    Args:
+        enabled (bool): Whether to apply the real-time changes. When False,
+                        the session only measures GC pauses.
+        cpu (int, optional): CPU to pin the thread to. Defaults to the last one.
+    """
+
+    def __init__(self, enabled, cpu=None):
+        self.enabled = enabled
+        self.cpu = cpu
+        self.gc_collections = 0
+        self.gc_pause_sec = 0.0
+        self.gc_max_pause_sec = 0.0
+        self.gc_avoided = 0
+        self.applied = []
+        self._gc_started = None
+        self._gc_was_enabled = True
+        self._restore = []
+        self._active = False
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            pause = time.perf_counter() - self._gc_started
+            self._gc_started = None
+            self.gc_collections += 1
+            self.gc_pause_sec += pause
+            if pause > self.gc_max_pause_sec:
+                self.gc_max_pause_sec = pause
+
+    def enter(self):
+        """Call once the map is prepared, right before the hit-object loop."""
+        if self.enabled:
+            gc.collect()
+            if hasattr(gc, "freeze"):
+                gc.freeze()
+            self._gc_was_enabled = gc.isenabled()
+            gc.disable()
+            self.applied.append("gc off")
+            try:
+                self._raise_scheduling()
+            except Exception as e:
+                print(f" ! Could not change thread scheduling: {e}")
+        gc.callbacks.append(self._on_gc)
+        self._active = True
+        return self
+
+    def exit(self):
+        """Call at map end. Does nothing if the session is not active."""
+        if not self._active:
+            return
+        self._active = False
+        gc.callbacks.remove(self._on_gc)
+        if not self.enabled:
+            return
+        for restore in reversed(self._restore):
+            try:
+                restore()
+            except Exception as e:
+                print(f" ! Could not restore thread scheduling: {e}")
+        self._restore = []
+        # Everything allocated during the map still counts towards generation 0;
+        # each full threshold would have been one collection.
+        threshold = gc.get_threshold()[0]
+        if threshold:
+            self.gc_avoided = gc.get_count()[0] // threshold
+        if hasattr(gc, "unfreeze"):
+            gc.unfreeze()
+        if self._gc_was_enabled:
+            gc.enable()
+
+    def _target_cpu(self):
+        if self.cpu is not None:
+            return self.cpu
+        return (os.cpu_count() or 1) - 1
+
+    def _raise_scheduling(self):
+        if sys.platform == "win32":
+            self._raise_scheduling_windows()
+        else:
+            self._raise_scheduling_unix()
+
+    def _raise_scheduling_windows(self):
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentThread.restype = ctypes.c_void_p
+        kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+        kernel32.SetThreadAffinityMask.restype = ctypes.c_size_t
+        kernel32.SetThreadAffinityMask.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+        kernel32.SetThreadPriority.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        kernel32.GetThreadPriority.argtypes = [ctypes.c_void_p]
+        kernel32.SetPriorityClass.argtypes = [ctypes.c_void_p, ctypes.c_uint32]
+        kernel32.GetPriorityClass.argtypes = [ctypes.c_void_p]
+        thread = kernel32.GetCurrentThread()
+        process = kernel32.GetCurrentProcess()
+
+        cpu = self._target_cpu()
+        previous_mask = kernel32.SetThreadAffinityMask(thread, 1 << cpu)
+        if previous_mask:
+            self.applied.append(f"CPU {cpu}")
+            self._restore.append(lambda: kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), previous_mask))
+
+        previous_class = kernel32.GetPriorityClass(process)
+        if previous_class and kernel32.SetPriorityClass(process, HIGH_PRIORITY_CLASS):
+            self.applied.append("high priority")
+            self._restore.append(lambda: kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), previous_class))
+
+        previous_priority = kernel32.GetThreadPriority(thread)
+        if kernel32.SetThreadPriority(thread, THREAD_PRIORITY_HIGHEST):
+            self.applied.append("highest thread priority")
+            self._restore.append(lambda: kernel32.SetThreadPriority(kernel32.GetCurrentThread(), previous_priority))
+
+    def _raise_scheduling_unix(self):
+        # On Linux, pid 0 refers to the calling thread for both calls below.
+        if hasattr(os, "sched_setaffinity"):
+            previous_cpus = os.sched_getaffinity(0)
+            cpu = self._target_cpu()
+            if cpu in previous_cpus:
+                os.sched_setaffinity(0, {cpu})
+                self.applied.append(f"CPU {cpu}")
+                self._restore.append(lambda: os.sched_setaffinity(0, previous_cpus))
+        if hasattr(os, "setpriority"):
+            previous_nice = os.getpriority(os.PRIO_PROCESS, 0)
+            try:
+                os.setpriority(os.PRIO_PROCESS, 0, UNIX_NICE)
+            except PermissionError:
+                return
+            self.applied.append(f"nice {UNIX_NICE}")
+            self._restore.append(lambda: os.setpriority(os.PRIO_PROCESS, 0, previous_nice))
+
+    def summary(self):
+        return {
+            "realtime_mode": self.enabled,
+            "applied": list(self.applied),
+            "gc_collections": self.gc_collections,
+            "gc_pause_ms": self.gc_pause_sec * 1000.0,
+            "gc_max_pause_ms": self.gc_max_pause_sec * 1000.0,
+            "gc_avoided": self.gc_avoided,
+        }
+
+
+def format_summary(summary, worst_tick_ms):
+    if summary['realtime_mode']:
+        text = f"Real-time mode ({', '.join(summary['applied']) or 'nothing applied'}): "
+        text += f"~{summary['gc_avoided']} GC collection(s) avoided"
+    else:
+        text = "Real-time mode off: "
+        text += f"{summary['gc_collections']} GC collection(s)"
+    if summary['gc_collections']:
+        text += f", {summary['gc_pause_ms']:.1f}ms paused (longest {summary['gc_max_pause_ms']:.2f}ms)"
+    return text + f", worst tick overshoot {worst_tick_ms:.2f}ms."
@@ -0,0 +1,261 @@
+"""
+Scores a recorded input timeline the way the game would judge it.
+
+Given the beatmap that was played and the cursor moves and key events that
+were emitted (for example by `simulation.py`), this module judges every hit
+object offline. It gives one accuracy number to watch whenever scheduler or
+planner settings change, so a speed-up that costs accuracy shows up
+immediately.
+
+Judgment Rules:
+- Hit windows come from `OverallDifficulty`:
+  300 = 80 - 6*OD, 100 = 140 - 8*OD, 50 = 200 - 10*OD (ms, either side).
+- Circle radius comes from `CircleSize`: 54.4 - 4.48*CS osu! pixels.
+- Each key press is used by at most one object, in order. A press only
+  counts if the cursor is inside the circle at that moment.
+- Slider heads are judged like circles. While the slider is active the key
+  must stay held and the cursor must stay within the follow circle
+  (2.4x the circle radius) of the slider ball, from the head press until
+  shortly before the end; a slider that loses follow at any sample counts
+  as one follow break.
+- Spinners are judged on the rotations achieved while the key is held.
+
+Key Function:
+- `score_timeline()`: Returns a `ScoreResult` with judgment counts,
+  accuracy, slider-follow breaks and achieved RPM per spinner.
+
+Usage:
+    python scoring.py "path/to/map.osu" --seed 1 --mods HR,DT
+"""
+
+import argparse
+
+import numpy as np
+
+import parser
+import utils
+from utils import circle_radius_osu, hit_windows_ms, required_spins_per_sec
+
+FOLLOW_RADIUS_MULTIPLIER = 2.4
+# The game stops checking slider follow this long before the slider ends.
+SLIDER_END_LENIENCY_MS = 36
+SPINNER_CENTER_OSU = (256, 192)
+
+
+def _screen_to_osu(xy, screen_width, screen_height):
+    return utils.get_playfield(screen_width, screen_height).to_osu(xy)
+
+
+class ScoreResult:
+    """
+    Judgment totals of a scored run.
+
+    Attributes:
+        judgments (np.ndarray): Per-object judgment (300, 100, 50 or 0).
+        hit_error_ms (np.ndarray): Press time minus object time (NaN if unpressed).
+        slider_breaks (int): Sliders that lost follow at least once.
+        spinner_rpm (list): `(achieved_rpm, required_rpm)` per spinner.
+    """
+
+    def __init__(self, judgments, hit_error_ms, slider_breaks, spinner_rpm):
+        self.judgments = judgments
+        self.hit_error_ms = hit_error_ms
+        self.slider_breaks = slider_breaks
+        self.spinner_rpm = spinner_rpm
+
+    @property
+    def counts(self):
+        return {
+            "300": int(np.count_nonzero(self.judgments == 300)),
+            "100": int(np.count_nonzero(self.judgments == 100)),
+            "50": int(np.count_nonzero(self.judgments == 50)),
+            "miss": int(np.count_nonzero(self.judgments == 0)),
+        }
+
+    @property
+    def accuracy(self):
+        if self.judgments.size == 0:
+            return 0.0
+        return float(np.sum(self.judgments) / (300.0 * self.judgments.size))
+
+    def summary(self):
+        return {
+            **self.counts,
+            "accuracy": self.accuracy,
+            "slider_breaks": self.slider_breaks,
+            "spinner_rpm": [round(rpm, 1) for rpm, _ in self.spinner_rpm],
+        }
+
+
+def _timeline_arrays(events, start_time, screen_size):
+    """Splits `(time, kind, a, b)` events into song-time (ms) numpy arrays."""
+    move_t = np.array([e[0] for e in events if e[1] == 'move'], dtype=np.float64)
+    move_xy = np.array([(e[2], e[3]) for e in events if e[1] == 'move'], dtype=np.float64).reshape(-1, 2)
+    press_t = np.array([e[0] for e in events if e[1] == 'down'], dtype=np.float64)
+    key_t = np.array([e[0] for e in events if e[1] in ('down', 'up')], dtype=np.float64)
+    key_delta = np.array([1 if e[1] == 'down' else -1 for e in events if e[1] in ('down', 'up')],
+                         dtype=np.int64)
+
+    move_t = (move_t - start_time) * 1000.0
+    press_t = (press_t - start_time) * 1000.0
+    key_t = (key_t - start_time) * 1000.0
+    cursor_osu = _screen_to_osu(move_xy, *screen_size)
+    keys_held = np.cumsum(key_delta)
+    return move_t, cursor_osu, press_t, key_t, keys_held
+
+
+def _sample_at(sample_t, values, query_t, default):
+    """Returns the latest sample at or before each query time."""
+    idx = np.searchsorted(sample_t, query_t, side='right') - 1
+    out = np.empty((len(query_t),) + values.shape[1:], dtype=np.float64)
+    valid = idx >= 0
+    out[valid] = values[idx[valid]]
+    out[~valid] = default
+    return out
+
+
+def _assign_presses(object_t, press_t, window_ms):
+    """
+    Gives every object the first unused press inside its 50 window.
+
+    Presses are used in order, so an object can only take a press after the
+    one taken by the previous pressed object. Every object starts at the
+    first press of its window (`np.searchsorted`); each round then pushes
+    the objects whose press is already taken past the latest press taken
+    before them, until nothing moves. Rounds are vectorized and only
+    overlapping windows (dense streams) need more than one.
+    """
+    candidate = np.searchsorted(press_t, object_t - window_ms, side='left')
+    while True:
+        in_range = candidate < press_t.size
+        valid = in_range.copy()
+        valid[in_range] = press_t[candidate[in_range]] <= object_t[in_range] + window_ms
+        taken = np.maximum.accumulate(np.where(valid, candidate, -1))
+        taken_before = np.concatenate(([-1], taken[:-1]))
+        consumed = valid & (candidate <= taken_before)
+        if not np.any(consumed):
+            return np.where(valid, candidate, -1).astype(np.int64)
+        candidate[consumed] = taken_before[consumed] + 1
+
+
+def _slider_ball_positions(hit_object, path, duration_ms, sample_t):
+    slide_ms = duration_ms / hit_object['slides']
+    progress = (sample_t - hit_object['time']) / slide_ms
+    slide_index = np.floor(np.clip(progress, 0, hit_object['slides'] - 1e-9))
+    local = np.clip(progress - slide_index, 0.0, 1.0)
+    local = np.where(slide_index % 2 == 1, 1.0 - local, local)
+    path_pos = local * (len(path) - 1)
+    path_idx = np.arange(len(path))
+    return np.column_stack((np.interp(path_pos, path_idx, path[:, 0]),
+                            np.interp(path_pos, path_idx, path[:, 1])))
+
+
+def score_timeline(beatmap_data, events, start_time, screen_size):
+    """
+    Judges a run offline.
+
+    Args:
+        beatmap_data (dict): The beatmap that was played, with mods applied.
+        events (list): `(time, kind, a, b)` input events, as recorded by
+                       `simulation.RecordingInput`.
+        start_time (float): Timeline time that corresponds to song time 0.
+        screen_size (tuple): Screen resolution the cursor positions use.
+
+    Returns:
+        ScoreResult: The judged run.
+    """
+    hit_objects = beatmap_data["HitObjects"]
+    difficulty = beatmap_data["Difficulty"]
+    od = difficulty.get("OverallDifficulty", 5)
+    w300, w100, w50 = hit_windows_ms(od)
+    radius = circle_radius_osu(difficulty.get("CircleSize", 4))
+    follow_radius = radius * FOLLOW_RADIUS_MULTIPLIER
+
+    move_t, cursor_osu, press_t, key_t, keys_held = _timeline_arrays(events, start_time, screen_size)
+    keys_held = keys_held.astype(np.float64)
+    center = np.array(SPINNER_CENTER_OSU, dtype=np.float64)
+
+    object_t = np.array([obj['time'] for obj in hit_objects], dtype=np.float64)
+    object_xy = np.array([(obj['x'], obj['y']) for obj in hit_objects], dtype=np.float64).reshape(-1, 2)
+    is_spinner = np.array([bool(obj['type'] & 8) for obj in hit_objects], dtype=bool)
+    is_slider = np.array([bool(obj.get('curveType')) for obj in hit_objects], dtype=bool) & ~is_spinner
+
+    assigned = _assign_presses(object_t, press_t, w50)
+    pressed = assigned >= 0
+    hit_error_ms = np.full(object_t.size, np.nan)
+    hit_error_ms[pressed] = press_t[assigned[pressed]] - object_t[pressed]
+
+    cursor_at_press = _sample_at(move_t, cursor_osu, press_t[assigned[pressed]], center)
+    in_circle = np.zeros(object_t.size, dtype=bool)
+    in_circle[pressed] = np.linalg.norm(cursor_at_press - object_xy[pressed], axis=1) <= radius
+
+    abs_error = np.abs(hit_error_ms)
+    judgments = np.select(
+        [in_circle & (abs_error <= w300), in_circle & (abs_error <= w100), in_circle & (abs_error <= w50)],
+        [300, 100, 50], default=0).astype(np.int64)
+
+    # Key state and move ranges for every object at once; only the per-object
+    # slider paths and spinner angles are computed in the loop below.
+    held_at_move = _sample_at(key_t, keys_held, move_t, 0) > 0
+    span_end_t = np.array([obj.get('endTime', obj['time']) for obj in hit_objects], dtype=np.float64)
+    slider_breaks = 0
+    spinner_rpm = []
+    for i in np.flatnonzero(is_spinner | is_slider):
+        hit_object = hit_objects[i]
+        if is_spinner[i]:
+            end_t = span_end_t[i]
+            lo = np.searchsorted(move_t, object_t[i], side='left')
+            hi = np.searchsorted(move_t, end_t, side='right')
+            offsets = cursor_osu[lo:hi][held_at_move[lo:hi]] - center
+            spins = 0.0
+            if len(offsets) > 1:
+                angles = np.unwrap(np.arctan2(offsets[:, 1], offsets[:, 0]))
+                spins = float(np.sum(np.abs(np.diff(angles)))) / (2 * np.pi)
+            duration_sec = max((end_t - object_t[i]) / 1000.0, 1e-9)
+            required = required_spins_per_sec(od) * duration_sec
+            achieved_rpm = spins / duration_sec * 60.0
+            spinner_rpm.append((float(achieved_rpm), required_spins_per_sec(od) * 60.0))
+            judgments[i] = 300 if spins >= required else (50 if spins >= required / 2 else 0)
+        else:
+            path = np.asarray(parser.calculate_slider_path(hit_object), dtype=np.float64)
+            duration_ms = parser.get_slider_duration(hit_object, difficulty, beatmap_data["TimingPoints"])
+            if len(path) < 2 or duration_ms <= 0:
+                continue
+            follow_start = object_t[i] if not pressed[i] else max(object_t[i], press_t[assigned[i]])
+            follow_end = object_t[i] + duration_ms - SLIDER_END_LENIENCY_MS
+            lo = np.searchsorted(move_t, follow_start, side='left')
+            hi = np.searchsorted(move_t, follow_end, side='right')
+            if hi <= lo:
+                continue
+            ball = _slider_ball_positions(hit_object, path, duration_ms, move_t[lo:hi])
+            following = held_at_move[lo:hi] & (np.linalg.norm(cursor_osu[lo:hi] - ball, axis=1) <= follow_radius)
+            if not np.all(following):
+                slider_breaks += 1
+
+    return ScoreResult(judgments, hit_error_ms, slider_breaks, spinner_rpm)
+
+
+def main():
+    import simulation
+
+    arg_parser = argparse.ArgumentParser(description="Simulate a .osu file and score the run.")
+    arg_parser.add_argument("osu_file")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--mods", default="", help="Comma separated, e.g. HR,DT")
+    arg_parser.add_argument("--flow-aim", action="store_true")
+    args = arg_parser.parse_args()
+
+    beatmap_data = parser.parse_osu_file(args.osu_file)
+    if not beatmap_data or not beatmap_data.get("HitObjects"):
+        print(f" ! Could not load hit objects from '{args.osu_file}'")
+        return
+
+    mods = [m for m in args.mods.split(',') if m]
+    result = simulation.simulate_beatmap(beatmap_data, seed=args.seed, mods=mods, flow_aim=args.flow_aim)
+    score = score_timeline(result.beatmap_data, result.events, result.start_time, result.screen_size)
+    for key, value in score.summary().items():
+        print(f" -> {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
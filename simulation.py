@@ -0,0 +1,326 @@
+"""
+Runs the Pilot executor headless against a virtual clock.
+
+The real executor needs a screen, a running game and real time: a five
+minute map takes five minutes to play. This module swaps the executor's
+clock, input and window-title backends for deterministic stand-ins so that
+`Pilot._execute_beatmap` can play a whole map instantly on any platform.
+
+Components:
+- `VirtualClock`: Time only moves when the executor sleeps, busy-waits or
+  emits input. Sleeps can oversleep by a seeded random amount to mimic a
+  real scheduler.
+- `RecordingInput`: Records every cursor move and key event with its virtual
+  timestamp instead of sending it to the OS. Each emit costs a configurable
+  (seeded) amount of virtual time, like a real input API call.
+- `HeadlessOverlay`: A no-op stand-in for `OverlayWindow`.
+- `simulate_beatmap()`: Plays parsed beatmap data and returns a
+  `SimulationResult` with the full event timeline and the timing error of
+  every object's key press.
+
+Runs are fully deterministic for a given seed.
+
+Usage:
+    python simulation.py "path/to/map.osu" --seed 1 --mods HR,DT
+"""
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+import config
+import parser
+import utils
+from mods import ModHandler
+from pilot import Pilot
+from auto_offset import EmitLeadEstimator
+from profiling import MapProfiler
+from timeline import TraceRecorder
+
+
+class VirtualClock:
+    """A clock that advances instantly instead of sleeping."""
+
+    def __init__(self, rng, start=0.0, sleep_jitter_sec=0.0):
+        self.rng = rng
+        self.now = start
+        self.sleep_jitter_sec = sleep_jitter_sec
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        if self.sleep_jitter_sec > 0:
+            self.now += self.rng.uniform(0, self.sleep_jitter_sec)
+
+    def wait_event(self, event, timeout):
+        if not event.is_set():
+            self.sleep(timeout)
+        return event.is_set()
+
+    def wait_until(self, deadline, should_abort=None):
+        if self.now < deadline:
+            self.now = deadline
+        return True
+
+    def from_perf_counter_ns(self, ns):
+        # Real hook timestamps have no meaning on a virtual timeline.
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class RecordingInput:
+    """
+    Records input events as `(time, kind, a, b)` tuples.
+
+    `kind` is 'move' (a, b = x, y), 'down' or 'up' (a = key, b = None).
+    """
+
+    def __init__(self, clock, rng, screen_size=(1920, 1080), emit_cost_sec=0.0,
+                 emit_jitter_sec=0.0):
+        self.clock = clock
+        self.rng = rng
+        self.screen_size = screen_size
+        self.emit_cost_sec = emit_cost_sec
+        self.emit_jitter_sec = emit_jitter_sec
+        self.events = []
+        self.key_down_cpu_times = []
+        self._position = (screen_size[0] // 2, screen_size[1] // 2)
+
+    def _emit(self):
+        cost = self.emit_cost_sec
+        if self.emit_jitter_sec > 0:
+            cost += self.rng.uniform(0, self.emit_jitter_sec)
+        self.clock.advance(cost)
+        return self.clock.time()
+
+    def size(self):
+        return self.screen_size
+
+    def position(self):
+        return self._position
+
+    def moveTo(self, x, y):
+        self._position = (x, y)
+        self.events.append((self._emit(), 'move', x, y))
+
+    def keyDown(self, key):
+        self.events.append((self._emit(), 'down', key, None))
+        self.key_down_cpu_times.append(time.process_time())
+
+    def keyUp(self, key):
+        self.events.append((self._emit(), 'up', key, None))
+
+
+class HeadlessOverlay:
+    """Accepts every overlay call the Pilot makes and discards it."""
+
+    def __init__(self, flow_aim=False, debug_mode=False):
+        self.flow_aim = flow_aim
+        self.debug_mode = debug_mode
+
+    def is_flow_aim_active(self):
+        return self.flow_aim
+
+    def is_debug_mode_active(self):
+        return self.debug_mode
+
+    def update_status(self, status):
+        pass
+
+    def update_beatmap(self, beatmap_name=None):
+        pass
+
+    def update_difficulty(self, diff_dict=None):
+        pass
+
+    def update_note_info(self, hit_object=None, index=None):
+        pass
+
+    def update_debug_visuals(self, debug_data=None):
+        pass
+
+    def update_timing_summary(self, summary_text=None):
+        pass
+
+    def update_reaction_time(self, rt_sec=None):
+        pass
+
+    def update_metrics(self, metrics_text=None):
+        pass
+
+    def request_quit(self):
+        pass
+
+
+class SimulationResult:
+    """
+    Outcome of a simulated run.
+
+    Attributes:
+        beatmap_data (dict): The beatmap that was played, with mods applied.
+        screen_size (tuple): The simulated screen resolution.
+        events (list): Every recorded `(time, kind, a, b)` input event.
+        start_time (float): Virtual time that corresponds to song time 0.
+        scheduled_sec (np.ndarray): Intended key-press time of each object.
+        actual_sec (np.ndarray): Recorded key-press time of each object
+                                 (NaN if the object was never pressed).
+        error_ms (np.ndarray): `actual - scheduled` in milliseconds.
+        cpu_ms_per_object (np.ndarray): Host CPU time spent by the executor
+                                        since the previous key press (NaN if
+                                        the object was never pressed).
+        cpu_ms (float): Host CPU time of the whole simulated run.
+        virtual_duration_sec (float): Virtual time covered by the run.
+    """
+
+    def __init__(self, beatmap_data, screen_size, events, start_time, scheduled_sec, actual_sec,
+                 cpu_ms_per_object, cpu_ms, virtual_duration_sec):
+        self.beatmap_data = beatmap_data
+        self.screen_size = screen_size
+        self.events = events
+        self.start_time = start_time
+        self.scheduled_sec = scheduled_sec
+        self.actual_sec = actual_sec
+        self.error_ms = (actual_sec - scheduled_sec) * 1000.0
+        self.cpu_ms_per_object = cpu_ms_per_object
+        self.cpu_ms = cpu_ms
+        self.virtual_duration_sec = virtual_duration_sec
+
+    def summary(self):
+        errors = self.error_ms[~np.isnan(self.error_ms)]
+        if errors.size == 0:
+            return {"objects": int(self.error_ms.size), "pressed": 0}
+        return {
+            "objects": int(self.error_ms.size),
+            "pressed": int(errors.size),
+            "mean_error_ms": float(np.mean(errors)),
+            "p95_abs_error_ms": float(np.percentile(np.abs(errors), 95)),
+            "max_abs_error_ms": float(np.max(np.abs(errors))),
+            "virtual_duration_sec": self.virtual_duration_sec,
+            "cpu_ms": self.cpu_ms,
+        }
+
+    def to_dict(self):
+        return {
+            "summary": self.summary(),
+            "start_time": self.start_time,
+            "error_ms": [None if np.isnan(e) else float(e) for e in self.error_ms],
+            "cpu_ms_per_object": [None if np.isnan(c) else float(c) for c in self.cpu_ms_per_object],
+            "events": self.events,
+        }
+
+
+def simulate_beatmap(beatmap_data, seed=0, mods=(), screen_size=(1920, 1080), flow_aim=False,
+                     emit_cost_ms=0.0, emit_jitter_ms=0.0, sleep_jitter_ms=0.0, mod_handler=None,
+                     realtime_mode=False, profile_dir=None, trace_dir=None):
+    """
+    Plays `beatmap_data` through the real executor on a virtual clock.
+
+    Args:
+        beatmap_data (dict): Parsed beatmap, as returned by `parse_osu_file()`.
+        seed (int): Seed for every random source in the run.
+        mods (iterable): Mod names to apply, e.g. ('HR', 'DT').
+        screen_size (tuple): Simulated screen resolution.
+        flow_aim (bool): Whether the Flow Aim movement style is enabled.
+        emit_cost_ms (float): Fixed virtual cost of each input call.
+        emit_jitter_ms (float): Extra random cost of each input call.
+        sleep_jitter_ms (float): Maximum random oversleep of each sleep.
+        mod_handler (ModHandler, optional): Handler to apply mods with.
+        realtime_mode (bool): Run the map in real-time mode (see `realtime.py`).
+        profile_dir (str, optional): Profile the run with cProfile and write
+                                     the `.prof` file to this folder.
+        trace_dir (str, optional): Write a Chrome trace of the run to this folder.
+
+    Returns:
+        SimulationResult: The recorded timeline and per-object timing error.
+    """
+    rng = random.Random(seed)
+    clock = VirtualClock(rng, sleep_jitter_sec=sleep_jitter_ms / 1000.0)
+    recorder = RecordingInput(clock, rng, screen_size, emit_cost_ms / 1000.0, emit_jitter_ms / 1000.0)
+
+    mod_handler = mod_handler or ModHandler()
+    mod_handler.active_mods = {m.upper() for m in mods}
+    pilot = Pilot(HeadlessOverlay(flow_aim=flow_aim), 0.0, mod_handler, clock=clock,
+                  input_backend=recorder, title_source=lambda: "", seed=seed)
+    pilot.timing_report_dir = None
+    pilot.persist_emit_lead = False
+    pilot.realtime_mode = realtime_mode
+    if profile_dir:
+        pilot.profiler = MapProfiler(profile_dir)
+        pilot.profiler.requested = True
+    if trace_dir:
+        pilot.trace_dir = trace_dir
+        pilot.phases.trace = TraceRecorder(config.TRACE_CAPACITY)
+    pilot.lead_estimator = EmitLeadEstimator()
+    played_data = mod_handler.apply_mods(beatmap_data)
+    pilot.beatmap_data = played_data
+    # What the IDLE state does once a map is loaded; untimed, like arming.
+    pilot._prepare_map()
+    pilot._reserve_trace()
+    hit_objects = played_data["HitObjects"]
+
+    # Same sync math as the ARMED state, with a 'q' press at t=0 and no reaction delay.
+    ar = played_data["Difficulty"].get("ApproachRate", 9)
+    ar_fadein_ms = utils.calculate_ar_fadein_ms(ar)
+    start_time = clock.time() - (hit_objects[0]['time'] - ar_fadein_ms) / 1000.0
+
+    cpu_start = time.process_time()
+    pilot._execute_beatmap(start_time)
+    cpu_ms = (time.process_time() - cpu_start) * 1000.0
+
+    object_times_ms = np.array([obj['time'] for obj in hit_objects], dtype=np.float64)
+    scheduled_sec = start_time + object_times_ms / 1000.0 + config.TIMING_OFFSET_MS / 1000.0
+    # Key presses go out in object order, but dropped objects get none, so the
+    # executor's own timing recorder says which object each press belongs to.
+    actual_sec = pilot.timing_recorder.emitted_sec.copy()
+    pressed_indices = np.flatnonzero(~np.isnan(actual_sec))
+
+    cpu_marks = np.array([cpu_start] + recorder.key_down_cpu_times, dtype=np.float64)
+    cpu_ms_per_object = np.full(len(hit_objects), np.nan)
+    cpu_ms_per_object[pressed_indices] = np.diff(cpu_marks)[:pressed_indices.size] * 1000.0
+
+    return SimulationResult(played_data, screen_size, recorder.events, start_time,
+                            scheduled_sec, actual_sec, cpu_ms_per_object, cpu_ms, clock.time())
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Play a .osu file headless on a virtual clock.")
+    arg_parser.add_argument("osu_file")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--mods", default="", help="Comma separated, e.g. HR,DT")
+    arg_parser.add_argument("--flow-aim", action="store_true")
+    arg_parser.add_argument("--emit-cost-ms", type=float, default=0.0)
+    arg_parser.add_argument("--emit-jitter-ms", type=float, default=0.0)
+    arg_parser.add_argument("--sleep-jitter-ms", type=float, default=0.0)
+    arg_parser.add_argument("--realtime", action="store_true")
+    arg_parser.add_argument("--profile", metavar="DIR", help="Write a cProfile .prof file of the run to DIR.")
+    arg_parser.add_argument("--trace", metavar="DIR", help="Write a Chrome trace of the run to DIR.")
+    arg_parser.add_argument("--json", help="Write the full result to this file.")
+    args = arg_parser.parse_args()
+
+    beatmap_data = parser.parse_osu_file(args.osu_file)
+    if not beatmap_data or not beatmap_data.get("HitObjects"):
+        print(f" ! Could not load hit objects from '{args.osu_file}'")
+        return
+
+    mods = [m for m in args.mods.split(',') if m]
+    result = simulate_beatmap(beatmap_data, seed=args.seed, mods=mods, flow_aim=args.flow_aim,
+                              emit_cost_ms=args.emit_cost_ms, emit_jitter_ms=args.emit_jitter_ms,
+                              sleep_jitter_ms=args.sleep_jitter_ms, realtime_mode=args.realtime,
+                              profile_dir=args.profile, trace_dir=args.trace)
+    for key, value in result.summary().items():
+        print(f" -> {key}: {value}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result.to_dict(), f)
+        print(f" -> Result written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
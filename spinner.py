@@ -0,0 +1,101 @@
+"""
+Generates spinner cursor motion from a precomputed table.
+
+The spinner loop used to draw a random radius and call `cos`/`sin` on every
+1 ms tick. It also assumed that every `moveTo` landed on schedule. A
+`SpinnerTrajectory` computes the target angle and the fluctuating radius for
+the whole spinner up front, at `SAMPLE_HZ`. The loop then only indexes the
+table by elapsed time and looks up the unit circle in a shared LUT.
+
+The trajectory also tracks the angle it has actually emitted. If the loop
+stalls, the next sample would jump straight to the target angle. osu! reads
+a jump of half a turn or more as spinning the wrong way. Instead, the
+trajectory advances by at most `MAX_PHASE_STEP_RAD` per tick until it is back
+in phase. The achieved RPM comes from the emitted angle, not the scheduled
+one, so it shows what the game actually received.
+"""
+
+import math
+
+import numpy as np
+
+import fastmath
+
+SAMPLE_HZ = 1000
+
+# Largest angle the cursor may turn in one tick while catching up. It has to
+# stay below half a turn, or osu! reads the move as a reverse spin.
+MAX_PHASE_STEP_RAD = math.pi * 0.75
+
+_UNIT_LUT_SIZE = 4096
+_UNIT_LUT_SCALE = _UNIT_LUT_SIZE / (2 * math.pi)
+_UNIT_COS = [math.cos(i / _UNIT_LUT_SCALE) for i in range(_UNIT_LUT_SIZE)]
+_UNIT_SIN = [math.sin(i / _UNIT_LUT_SCALE) for i in range(_UNIT_LUT_SIZE)]
+
+
+class SpinnerTrajectory:
+    """
+    Precomputed angle and radius table for one spinner.
+
+    Args:
+        center (tuple): Spinner center in screen pixels.
+        duration_sec (float): How long the spinner lasts.
+        rpm (float): Target rotation speed.
+        radius (float): Base radius in pixels.
+        fluctuation (float): Maximum random radius change in pixels.
+        rng (random.Random): Source for the radius fluctuation, so seeded runs
+                             stay reproducible.
+    """
+
+    def __init__(self, center, duration_sec, rpm, radius, fluctuation, rng):
+        self.center_x, self.center_y = center
+        self.duration_sec = duration_sec
+        self.target_rpm = rpm
+        sample_count = max(2, int(duration_sec * SAMPLE_HZ) + 1)
+        elapsed = np.arange(sample_count) / SAMPLE_HZ
+
+        self._angles = (elapsed * (rpm / 60.0) * (2 * math.pi)).tolist()
+        ease = [fastmath.ease_in_out_sine_lut(t / duration_sec if duration_sec > 0 else 1.0) for t in elapsed]
+        jitter = np.random.default_rng(rng.getrandbits(32)).uniform(-fluctuation, fluctuation, sample_count)
+        self._radii = (radius + jitter * np.array(ease)).tolist()
+        self._last_index = sample_count - 1
+
+        self.emitted_angle = 0.0
+        self.phase_corrections = 0
+        self._first_emit_sec = None
+        self._last_emit_sec = None
+
+    def next_position(self, elapsed_sec):
+        """Returns the screen position for this tick and advances the emitted phase."""
+        i = int(elapsed_sec * SAMPLE_HZ)
+        if i > self._last_index:
+            i = self._last_index
+        step = self._angles[i] - self.emitted_angle
+        if step > MAX_PHASE_STEP_RAD:
+            step = MAX_PHASE_STEP_RAD
+            self.phase_corrections += 1
+        if step > 0.0:
+            self.emitted_angle += step
+        k = int(self.emitted_angle * _UNIT_LUT_SCALE) % _UNIT_LUT_SIZE
+        r = self._radii[i]
+        return int(self.center_x + r * _UNIT_COS[k]), int(self.center_y + r * _UNIT_SIN[k])
+
+    def record_emit(self, emitted_sec):
+        """Notes when the last position was actually sent to the OS."""
+        if self._first_emit_sec is None:
+            self._first_emit_sec = emitted_sec
+        self._last_emit_sec = emitted_sec
+
+    @property
+    def achieved_rpm(self):
+        if self._first_emit_sec is None or self._last_emit_sec <= self._first_emit_sec:
+            return 0.0
+        turns = self.emitted_angle / (2 * math.pi)
+        return turns / (self._last_emit_sec - self._first_emit_sec) * 60.0
+
+    def summary(self):
+        return {
+            "target_rpm": float(self.target_rpm),
+            "achieved_rpm": float(self.achieved_rpm),
+            "phase_corrections": self.phase_corrections,
+        }
@@ -0,0 +1,64 @@
+"""
+Turns 'q' sync taps into the song start time the executor schedules against.
+
+Every note in a run is placed relative to one start time derived from the
+user's 'q' tap, so any error in that tap shifts the whole map. The tap is
+therefore captured directly in the keyboard hook callback with
+`perf_counter_ns`, and the `keyboard` library's queue dispatch delay is
+measured and subtracted (see `Pilot._on_q_event`).
+
+Optionally, the user can keep tapping 'q' as each of the next approach
+circles appears. Tap `k` is matched to hit object `k`, each tap yields its
+own estimate of the start time, and the estimates are averaged. The first
+tap starts the run immediately; later taps refine the estimate while the
+executor is already playing.
+"""
+
+
+class SyncEstimator:
+    """
+    Averages per-tap estimates of the song start time.
+
+    `pipeline_latency_sec` must only cover the time from the return of the
+    key-down call until the OS sees the press. The cost of the call itself
+    is learned by `EmitLeadEstimator` and already subtracted from every emit
+    time, so `run_pipeline_calibration()` measures from the call's return
+    to avoid compensating it twice.
+
+    Attributes:
+        start_time (float): Current estimate of the clock time at song time 0.
+        tap_count (int): Number of taps used so far.
+    """
+
+    def __init__(self, hit_objects, ar_fadein_ms, reaction_time_sec, pipeline_latency_sec=0.0,
+                 max_taps=1):
+        self.hit_objects = hit_objects
+        self.ar_fadein_ms = ar_fadein_ms
+        self.reaction_time_sec = reaction_time_sec
+        self.pipeline_latency_sec = pipeline_latency_sec
+        self.max_taps = max(1, max_taps)
+        self.start_time = None
+        self._estimates = []
+
+    @property
+    def tap_count(self):
+        return len(self._estimates)
+
+    def add_tap(self, tap_time):
+        """
+        Adds a tap for the next unmatched hit object.
+
+        Returns:
+            bool: True if the tap was used, False once enough taps were taken.
+        """
+        k = len(self._estimates)
+        if k >= self.max_taps or k >= len(self.hit_objects):
+            return False
+        song_timeline_at_tap_sec = (self.hit_objects[k]['time'] - self.ar_fadein_ms) / 1000.0
+        time_circle_actually_appeared = tap_time - self.reaction_time_sec
+        # Key presses reach the game `pipeline_latency_sec` after they are sent,
+        # so the whole schedule is shifted earlier by that amount.
+        estimate = time_circle_actually_appeared - song_timeline_at_tap_sec - self.pipeline_latency_sec
+        self._estimates.append(estimate)
+        self.start_time = sum(self._estimates) / len(self._estimates)
+        return True
@@ -0,0 +1,151 @@
+"""
+Timeline of a run in Chrome Trace Event format (opens in Perfetto or
+chrome://tracing).
+
+`TraceRecorder` is attached to the executor's `profiling.PhaseTimers`.
+Every timed phase then also becomes a span on the timeline: map load,
+beatmap lookup, parse and mod application, stream groups, each object's
+approach move and its circle/slider/spinner phase, single cursor moves and
+ticks, key presses, and overlay calls. Timestamps are the same monotonic
+`time.perf_counter_ns()` reads the phase timers take anyway.
+
+Spans go into a preallocated ring (phase, start, end, object index).
+Recording one is four list writes. When a map is armed, `reserve()` sizes
+the ring from the map's length (up to `TRACE_CAPACITY` slots) and moves the
+spans recorded so far, the map load, aside where they are never
+overwritten. The hit-object loop then only calls `rewind()`, so nothing is
+allocated after the sync tap. Only a map longer than the cap loses spans,
+oldest first.
+Nothing is formatted or written until `export()` at map end.
+"""
+
+import json
+import os
+import time
+
+import utils
+from profiling import PHASE_NAMES
+
+# Ring size before `reserve()`: the map load records a handful of spans.
+LOAD_CAPACITY = 1024
+# Spans per object added on top of the per-millisecond estimate.
+SPANS_PER_OBJECT = 64
+
+
+class TraceRecorder:
+    """
+    Ring buffer of completed spans, plus the load spans kept aside by `reserve()`.
+
+    Args:
+        max_capacity (int): Largest ring `reserve()` may allocate.
+        capacity (int): Ring size until `reserve()` is called; enough for
+                        the map load.
+    """
+
+    def __init__(self, max_capacity, capacity=LOAD_CAPACITY):
+        self.max_capacity = max_capacity
+        self.pinned = []
+        self._allocate(min(capacity, max_capacity))
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.phase = [0] * capacity
+        self.start_ns = [0] * capacity
+        self.end_ns = [0] * capacity
+        self.index = [-1] * capacity
+        self.count = 0
+
+    def reserve(self, span_count):
+        """
+        Call once the map is loaded. Moves the spans recorded so far aside
+        (they are never overwritten) and makes the ring large enough for
+        `span_count` more spans, up to `max_capacity`.
+        """
+        self.pinned.extend((self.phase[s], self.start_ns[s], self.end_ns[s], self.index[s])
+                           for s in self._slots())
+        capacity = max(1, min(span_count, self.max_capacity))
+        if capacity > self.capacity:
+            self._allocate(capacity)
+        else:
+            self.count = 0
+
+    def rewind(self):
+        """Call right before the hit-object loop: the ring starts over, the pinned spans stay."""
+        self.count = 0
+
+    def span(self, phase, start_ns, end_ns, index=-1):
+        slot = self.count % self.capacity
+        self.phase[slot] = phase
+        self.start_ns[slot] = start_ns
+        self.end_ns[slot] = end_ns
+        self.index[slot] = index
+        self.count += 1
+
+    def clear(self):
+        self.count = 0
+        self.pinned = []
+
+    @property
+    def dropped(self):
+        return max(0, self.count - self.capacity)
+
+    def _slots(self):
+        """Slot numbers from the oldest kept span to the newest."""
+        if self.count <= self.capacity:
+            return range(self.count)
+        first = self.count % self.capacity
+        return list(range(first, self.capacity)) + list(range(first))
+
+    def _spans(self):
+        yield from self.pinned
+        for s in self._slots():
+            yield self.phase[s], self.start_ns[s], self.end_ns[s], self.index[s]
+
+    def to_chrome_trace(self, beatmap_title=None):
+        spans = list(self._spans())
+        origin_ns = min((start_ns for _, start_ns, _, _ in spans), default=0)
+        events = [
+            {"name": "process_name", "ph": "M", "pid": 1, "tid": 1,
+             "args": {"name": f"osu! bot: {beatmap_title or 'unknown'}"}},
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "executor"}},
+        ]
+        for phase, start_ns, end_ns, index in spans:
+            event = {
+                "name": PHASE_NAMES[phase],
+                "cat": "executor",
+                "ph": "X",
+                "ts": (start_ns - origin_ns) / 1000.0,
+                "dur": (end_ns - start_ns) / 1000.0,
+                "pid": 1,
+                "tid": 1,
+            }
+            if index >= 0:
+                event["args"] = {"object": index}
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"beatmap": beatmap_title, "spans": len(self.pinned) + self.count,
+                              "dropped_spans": self.dropped}}
+
+    def export(self, directory, beatmap_title=None):
+        """
+        Writes `<time> <map>.trace.json`.
+
+        Returns:
+            str: The path of the trace, or None if nothing was written.
+        """
+        if self.count == 0 and not self.pinned:
+            return None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            name = utils.clean_filename(beatmap_title or "unknown")[:80]
+            path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')} {name}.trace.json")
+            with open(path, 'w') as f:
+                json.dump(self.to_chrome_trace(beatmap_title), f)
+            text = f" -> Trace saved: {path}"
+            if self.dropped:
+                text += f" (oldest {self.dropped} spans overwritten)"
+            print(text)
+            return path
+        except Exception as e:
+            print(f" ! Could not save trace: {e}")
+            return None
@@ -0,0 +1,144 @@
+"""
+Records how late every key press went out during a real run.
+
+The executor decides when each object should be hit (`target_time_sec`),
+but nothing checked when the key press was actually emitted. The
+`HitTimingRecorder` fills three preallocated arrays - scheduled time,
+actual emit time and lateness - with one plain array write per object, so
+it is cheap enough to stay on in the hot loop.
+
+At map end the executor asks for a percentile summary (p50/p95/p99/max
+lateness), shows it in the overlay and exports the raw data as JSON and
+CSV. This is how we find out whether the machine keeps up under load.
+
+The recorder also logs every object on which the executor had to switch to
+catch-up mode (see `Pilot._execute_beatmap`), together with how late it
+was at that point, so recoveries show up in the same report. Spinners add
+the RPM they actually achieved (see `spinner.SpinnerTrajectory`).
+"""
+
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+import utils
+
+
+class HitTimingRecorder:
+    """
+    Preallocated per-object timing log.
+
+    Attributes:
+        scheduled_sec (np.ndarray): When each object's key press was due.
+        emitted_sec (np.ndarray): When the key-down call returned.
+        lateness_ms (np.ndarray): `emitted - scheduled` in milliseconds.
+        catch_up_ms (np.ndarray): How late the executor was when it started
+                                  catching up on an object (NaN otherwise).
+        dropped (np.ndarray): Objects skipped because their hit window had
+                              already passed.
+        spinner_rpm (np.ndarray): Achieved RPM of each spinner (NaN otherwise).
+    """
+
+    def __init__(self, object_count):
+        self.scheduled_sec = np.full(object_count, np.nan)
+        self.emitted_sec = np.full(object_count, np.nan)
+        self.lateness_ms = np.full(object_count, np.nan)
+        self.catch_up_ms = np.full(object_count, np.nan)
+        self.dropped = np.zeros(object_count, dtype=bool)
+        self.spinner_rpm = np.full(object_count, np.nan)
+
+    def record(self, index, scheduled_sec, emitted_sec):
+        self.scheduled_sec[index] = scheduled_sec
+        self.emitted_sec[index] = emitted_sec
+        self.lateness_ms[index] = (emitted_sec - scheduled_sec) * 1000.0
+
+    def record_catch_up(self, index, lateness_sec, dropped=False):
+        self.catch_up_ms[index] = lateness_sec * 1000.0
+        self.dropped[index] = dropped
+
+    def record_spinner(self, index, achieved_rpm):
+        self.spinner_rpm[index] = achieved_rpm
+
+    def _longest_catch_up_run(self):
+        active = np.concatenate(([0], (~np.isnan(self.catch_up_ms)).astype(np.int8), [0]))
+        edges = np.flatnonzero(np.diff(active))
+        if edges.size == 0:
+            return 0
+        return int(np.max(edges[1::2] - edges[::2]))
+
+    def summary(self):
+        recorded = self.lateness_ms[~np.isnan(self.lateness_ms)]
+        if recorded.size == 0:
+            return None
+        p50, p95, p99 = np.percentile(recorded, [50, 95, 99])
+        spinner_rpm = self.spinner_rpm[~np.isnan(self.spinner_rpm)]
+        return {
+            "objects": int(recorded.size),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(np.max(recorded)),
+            "catch_ups": int(np.count_nonzero(~np.isnan(self.catch_up_ms))),
+            "longest_catch_up_run": self._longest_catch_up_run(),
+            "dropped": int(np.count_nonzero(self.dropped)),
+            "spinners": int(spinner_rpm.size),
+            "min_spinner_rpm": float(np.min(spinner_rpm)) if spinner_rpm.size else None,
+        }
+
+    def export(self, directory, beatmap_title=None):
+        """
+        Writes `<name>.json` (summary and raw arrays) and `<name>.csv`.
+
+        Returns:
+            str: The path of the JSON report, or None if nothing was written.
+        """
+        summary = self.summary()
+        if summary is None:
+            return None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            name = utils.clean_filename(beatmap_title or "unknown")[:80]
+            base_path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')} {name}")
+
+            with open(base_path + ".json", 'w') as f:
+                json.dump({
+                    "beatmap": beatmap_title,
+                    "summary": summary,
+                    "scheduled_sec": _to_list(self.scheduled_sec),
+                    "emitted_sec": _to_list(self.emitted_sec),
+                    "lateness_ms": _to_list(self.lateness_ms),
+                    "catch_up_ms": _to_list(self.catch_up_ms),
+                    "dropped": np.flatnonzero(self.dropped).tolist(),
+                    "spinner_rpm": _to_list(self.spinner_rpm),
+                }, f, indent=4)
+
+            with open(base_path + ".csv", 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["index", "scheduled_sec", "emitted_sec", "lateness_ms"])
+                for i in range(self.lateness_ms.size):
+                    if not np.isnan(self.lateness_ms[i]):
+                        writer.writerow([i, f"{self.scheduled_sec[i]:.6f}", f"{self.emitted_sec[i]:.6f}",
+                                         f"{self.lateness_ms[i]:.3f}"])
+
+            print(f" -> Timing report saved: {base_path}.json")
+            return base_path + ".json"
+        except Exception as e:
+            print(f" ! Could not save timing report: {e}")
+            return None
+
+
+def _to_list(array):
+    return [None if np.isnan(v) else float(v) for v in array]
+
+
+def format_summary(summary):
+    if not summary:
+        return "Late: N/A"
+    text = (f"Late p50/p95/p99/max: {summary['p50_ms']:.1f}/{summary['p95_ms']:.1f}/"
+            f"{summary['p99_ms']:.1f}/{summary['max_ms']:.1f}ms")
+    if summary['catch_ups']:
+        text += f" | catch-ups: {summary['catch_ups']}"
+    return text
@@ -10,23 +10,37 @@ Key functional groups include:
 - Configuration Management:
   - `save_calibration_data()`: Persists user data, like reaction time, to a JSON file.
   - `load_calibration_data()`: Retrieves the saved user data upon startup.
+  - `save_pipeline_latency()` / `load_pipeline_latency()`: Persist the
+    measured input pipeline latency.
+  - `save_emit_lead()` / `load_emit_lead()`: Persist the key-emit lead time
+    learned by the executor, next to the calibration data.
 
 - System & File Operations:
   - `find_osu_directory()`: A robust multi-step function to automatically
     locate the user's osu! installation directory by checking running
     processes, the Windows Registry, and common installation paths.
+  - `find_osu_paths()` / `start_osu_discovery()`: The osu!, Songs and osu!.db
+    paths. They are saved in the settings file and, on later launches,
+    confirmed with a single `os.stat`. The full search only runs (in the
+    background) when that check fails. `refresh_osu_paths()` re-derives them
+    when a beatmap lookup fails, in case the Songs folder moved.
   - `get_active_window_title()`: Fetches the title of the current foreground
     window to detect when the user is playing a map.
 
 - Mathematical & Geometric Calculations:
   - `convert_coordinates()`: Translates osu!'s internal playfield coordinates
     to absolute screen coordinates for mouse control.
+  - `get_playfield()`: Returns the cached `playfield.Playfield` transform for
+    a screen geometry, for converting whole paths at once.
   - `calculate_quadratic_bezier_point()`: Computes points along a Bezier
     curve, used for generating human-like mouse paths.
   - `ease_in_out_sine()`: An easing function to create smooth acceleration and
     deceleration in mouse movements.
   - `calculate_ar_fadein_ms()`: A game-specific function to determine the
     fade-in time of hit objects based on the map's Approach Rate (AR).
+  - `hit_windows_ms()`, `circle_radius_osu()`, `required_spins_per_sec()`:
+    The judgment windows, circle size and spinner requirement for a map's
+    OD and CS, shared by the executor and the offline scorer.
 
 - String Manipulation:
   - `simplify_string()` and `clean_filename()`: Helper functions to
@@ -37,38 +51,85 @@ import re
 import math
 import os
 import json
-import win32gui
-import psutil
-import winreg
-import numpy as np
+import threading
+import time
+
+import config
+import fastmath
 
 SETTINGS_FILE = 'settings.json'
 
+def _read_settings():
+    if not os.path.exists(SETTINGS_FILE):
+        return {}
+    try:
+        with open(SETTINGS_FILE, 'r') as f:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except (json.JSONDecodeError, OSError) as e:
+        print(f" ! Could not read settings file: {e}")
+        return {}
+
+def _update_settings(**values):
+    data = _read_settings()
+    data.update(values)
+    with open(SETTINGS_FILE, 'w') as f:
+        json.dump(data, f, indent=4)
+
 def save_calibration_data(time_sec):
     try:
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump({'last_reaction_time_sec': time_sec}, f, indent=4)
+        _update_settings(last_reaction_time_sec=time_sec)
         print(f" -> Calibration data saved: {time_sec:.3f}s")
     except Exception as e:
         print(f" ! Could not save calibration data: {e}")
 
 def load_calibration_data():
-    if not os.path.exists(SETTINGS_FILE):
-        return None
+    rt_sec = _read_settings().get('last_reaction_time_sec')
+    if isinstance(rt_sec, (float, int)):
+        print(f" -> Previous calibration data loaded: {rt_sec:.3f}s")
+        return rt_sec
+    return None
+
+# Measured from the return of the key-down call. Values saved under the old
+# 'pipeline_latency_sec' key included the call itself and are ignored.
+_PIPELINE_LATENCY_KEY = 'pipeline_latency_after_call_sec'
+
+def save_pipeline_latency(latency_sec):
     try:
-        with open(SETTINGS_FILE, 'r') as f:
-            data = json.load(f)
-            rt_sec = data.get('last_reaction_time_sec')
-            if isinstance(rt_sec, (float, int)):
-                print(f" -> Previous calibration data loaded: {rt_sec:.3f}s")
-                return rt_sec
-    except (json.JSONDecodeError, KeyError) as e:
-        print(f" ! Could not read calibration data file: {e}")
+        _update_settings(**{_PIPELINE_LATENCY_KEY: latency_sec})
+        print(f" -> Input pipeline latency saved: {latency_sec * 1000:.2f}ms")
+    except Exception as e:
+        print(f" ! Could not save input pipeline latency: {e}")
+
+def load_pipeline_latency():
+    latency_sec = _read_settings().get(_PIPELINE_LATENCY_KEY)
+    if isinstance(latency_sec, (float, int)):
+        return latency_sec
+    return None
+
+def save_emit_lead(lead_sec):
+    try:
+        _update_settings(learned_emit_lead_sec=lead_sec)
+        print(f" -> Learned timing lead saved: {lead_sec * 1000:.2f}ms")
+    except Exception as e:
+        print(f" ! Could not save learned timing lead: {e}")
+
+def load_emit_lead():
+    lead_sec = _read_settings().get('learned_emit_lead_sec')
+    if isinstance(lead_sec, (float, int)):
+        return lead_sec
     return None
 
-_OSU_PATH_CACHE = None
+_OSU_PATHS_CACHE = None
+_OSU_PATH_KEYS = ('osu_directory', 'songs_directory', 'osu_db_path')
+_discovery_thread = None
+_discovery_lock = threading.Lock()
 
 def _find_from_process():
+    try:
+        import psutil
+    except ImportError:
+        return None
     for proc in psutil.process_iter(['name', 'exe']):
         if proc.info['name'] == 'osu!.exe':
             exe_path = proc.info['exe']
@@ -79,6 +140,7 @@ def _find_from_process():
 
 def _find_from_registry():
     try:
+        import winreg
         with winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, r"osu!\shell\open\command") as key:
             command, _ = winreg.QueryValueEx(key, None)
             match = re.search(r'"(.*?osu!\.exe)"', command)
@@ -87,7 +149,7 @@ def _find_from_registry():
                 if os.path.exists(exe_path):
                     print(" -> Found osu! path in registry.")
                     return os.path.dirname(exe_path)
-    except FileNotFoundError:
+    except (FileNotFoundError, ImportError):
         pass
     except Exception as e:
         print(f" ! Error reading registry: {e}")
@@ -117,33 +179,147 @@ def _find_in_common_locations():
             
     return None
 
-def find_osu_directory():
-    global _OSU_PATH_CACHE
-    if _OSU_PATH_CACHE and os.path.exists(_OSU_PATH_CACHE):
-        return _OSU_PATH_CACHE
-
-    print(" -> Searching for osu! directory...")
-    
-    path = _find_from_process()
-    if path:
-        _OSU_PATH_CACHE = path
-        return path
-        
-    path = _find_from_registry()
-    if path:
-        _OSU_PATH_CACHE = path
-        return path
-        
-    path = _find_in_common_locations()
-    if path:
-        _OSU_PATH_CACHE = path
-        return path
-        
-    print(" -> FAILED: Could not automatically find the osu! directory.")
+def _configured_songs_directory(osu_dir):
+    """Returns a custom `BeatmapDirectory` from the user's osu!.<name>.cfg, if set."""
+    try:
+        names = os.listdir(osu_dir)
+    except OSError:
+        return None
+    for name in names:
+        if not (name.startswith('osu!.') and name.endswith('.cfg')):
+            continue
+        try:
+            with open(os.path.join(osu_dir, name), encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    key, _, value = line.partition('=')
+                    if key.strip() == 'BeatmapDirectory' and value.strip():
+                        return os.path.join(osu_dir, value.strip())
+        except OSError:
+            continue
     return None
 
+def _osu_paths_for(osu_dir):
+    return {
+        'osu_directory': osu_dir,
+        'songs_directory': _configured_songs_directory(osu_dir) or os.path.join(osu_dir, 'Songs'),
+        'osu_db_path': os.path.join(osu_dir, 'osu!.db'),
+    }
+
+def _load_persisted_osu_paths():
+    """The fast path: the paths saved last time, confirmed with a single `os.stat` of osu!.db."""
+    settings = _read_settings()
+    paths = {key: settings.get(key) for key in _OSU_PATH_KEYS}
+    if not all(isinstance(value, str) for value in paths.values()):
+        return None
+    try:
+        os.stat(paths['osu_db_path'])
+    except OSError:
+        return None
+    return paths
+
+def _discover_osu_paths():
+    """The slow path: process scan, registry, then common locations. Logs each stage's time."""
+    stage_times = []
+    osu_dir = None
+    for stage, finder in (("process scan", _find_from_process), ("registry", _find_from_registry),
+                          ("common locations", _find_in_common_locations)):
+        stage_start = time.perf_counter()
+        osu_dir = finder()
+        stage_times.append(f"{stage} {(time.perf_counter() - stage_start) * 1000:.1f}ms")
+        if osu_dir:
+            break
+    print(f" -> osu! discovery: {', '.join(stage_times)}.")
+    if not osu_dir:
+        return None
+    paths = _osu_paths_for(osu_dir)
+    try:
+        _update_settings(**paths)
+    except Exception as e:
+        print(f" ! Could not save osu! paths: {e}")
+    return paths
+
+def _run_osu_discovery():
+    global _OSU_PATHS_CACHE
+    with _discovery_lock:
+        if _OSU_PATHS_CACHE is None:
+            _OSU_PATHS_CACHE = _load_persisted_osu_paths() or _discover_osu_paths()
+
+def start_osu_discovery():
+    """
+    Resolves the osu! paths at startup without blocking on the slow path.
+
+    The saved paths are checked right away. Only if that fails does the full
+    discovery start, on a background thread that `find_osu_paths()` joins
+    when the paths are first needed.
+    """
+    global _OSU_PATHS_CACHE, _discovery_thread
+    check_start = time.perf_counter()
+    paths = _load_persisted_osu_paths()
+    check_ms = (time.perf_counter() - check_start) * 1000
+    if paths:
+        _OSU_PATHS_CACHE = paths
+        print(f" -> osu! found at saved path in {check_ms:.2f}ms: {paths['osu_directory']}")
+        return
+    print(f" -> No valid saved osu! path ({check_ms:.2f}ms). Searching in the background...")
+    _discovery_thread = threading.Thread(target=_run_osu_discovery, daemon=True)
+    _discovery_thread.start()
+
+def find_osu_paths():
+    """
+    Returns a dict with `osu_directory`, `songs_directory` and `osu_db_path`,
+    or None if osu! could not be found.
+    """
+    global _discovery_thread
+    if _OSU_PATHS_CACHE:
+        return _OSU_PATHS_CACHE
+    if _discovery_thread is not None:
+        # The background search from startup: wait for it instead of searching twice.
+        _discovery_thread.join()
+        _discovery_thread = None
+    elif not _OSU_PATHS_CACHE:
+        print(" -> Searching for osu! directory...")
+        _run_osu_discovery()
+    if not _OSU_PATHS_CACHE:
+        print(" -> FAILED: Could not automatically find the osu! directory.")
+    return _OSU_PATHS_CACHE
+
+def refresh_osu_paths():
+    """
+    Re-checks the saved paths after a beatmap lookup failed.
+
+    The fast path only checks osu!.db, so a changed `BeatmapDirectory` or a
+    moved Songs folder would leave a stale `songs_directory` in use forever.
+    The paths are derived again from the osu! directory (one directory
+    listing and the .cfg read), or searched from scratch if that directory
+    is gone. Changed paths are saved.
+
+    Returns:
+        dict: The current paths, or None if osu! could not be found.
+    """
+    global _OSU_PATHS_CACHE
+    with _discovery_lock:
+        previous = _OSU_PATHS_CACHE
+        if previous and os.path.isdir(previous['osu_directory']):
+            paths = _osu_paths_for(previous['osu_directory'])
+            if paths != previous:
+                try:
+                    _update_settings(**paths)
+                except Exception as e:
+                    print(f" ! Could not save osu! paths: {e}")
+        else:
+            paths = _discover_osu_paths()
+        if paths and previous and paths['songs_directory'] != previous['songs_directory']:
+            print(f" -> Songs directory changed: {paths['songs_directory']}")
+        _OSU_PATHS_CACHE = paths
+    return paths
+
+def find_osu_directory():
+    paths = find_osu_paths()
+    return paths['osu_directory'] if paths else None
+
 def get_active_window_title():
     try:
+        import win32gui
         return win32gui.GetWindowText(win32gui.GetForegroundWindow())
     except Exception:
         return ""
@@ -154,14 +330,20 @@ def clean_filename(name):
 def simplify_string(text):
     return re.sub(r'[^a-z0-9]', '', text.lower())
 
+_playfields = {}
+
+def get_playfield(screen_width, screen_height, game_rect=None):
+    """Returns the cached `Playfield` for this screen geometry, building it on first use."""
+    game_rect = game_rect or config.GAME_WINDOW_RECT
+    key = (screen_width, screen_height, tuple(game_rect) if game_rect else None)
+    playfield = _playfields.get(key)
+    if playfield is None:
+        from playfield import Playfield
+        playfield = _playfields[key] = Playfield(screen_width, screen_height, game_rect)
+    return playfield
+
 def convert_coordinates(osu_x, osu_y, screen_width, screen_height):
-    playfield_height = screen_height * 0.8
-    playfield_width = playfield_height * (4 / 3)
-    x_offset = (screen_width - playfield_width) / 2
-    y_offset = (screen_height - playfield_height) / 2
-    screen_x = ((osu_x / 512) * playfield_width) + x_offset
-    screen_y = ((osu_y / 384) * playfield_height) + y_offset
-    return int(screen_x), int(screen_y)
+    return get_playfield(screen_width, screen_height).to_screen_point(osu_x, osu_y)
 
 def ease_in_out_sine(t):
     return -(math.cos(math.pi * t) - 1) / 2
@@ -174,10 +356,15 @@ def calculate_ar_fadein_ms(ar):
     else:
         return 1200 - 750 * (ar - 5) / 5
 
+def hit_windows_ms(od):
+    """Returns the 300, 100 and 50 hit windows (ms, either side) for an Overall Difficulty."""
+    return 80 - 6 * od, 140 - 8 * od, 200 - 10 * od
+
+def circle_radius_osu(cs):
+    return 54.4 - 4.48 * cs
+
+def required_spins_per_sec(od):
+    return 3 + 0.4 * od if od < 5 else 2.5 + 0.5 * od
+
 def calculate_quadratic_bezier_point(p0, p1, p2, t):
-    p0 = np.array(p0)
-    p1 = np.array(p1)
-    p2 = np.array(p2)
-    
-    point = ((1 - t)**2 * p0) + (2 * (1 - t) * t * p1) + (t**2 * p2)
-    return tuple(point)
\ No newline at end of file
+    return fastmath.bezier2(p0[0], p0[1], p1[0], p1[1], p2[0], p2[1], t)
\ No newline at end of file
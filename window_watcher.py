@@ -0,0 +1,239 @@
+"""
+Delivers foreground window title changes to the Pilot's state machine.
+
+The state machine used to read the foreground window title every 10 ms, even
+while the user sat in menus for hours. A watcher pushes each title change
+onto a queue instead. The state machine blocks on `next_title()` and costs
+nothing until something happens.
+
+Watchers:
+- `Win32TitleWatcher`: Hooks `EVENT_SYSTEM_FOREGROUND` and
+  `EVENT_OBJECT_NAMECHANGE` with `SetWinEventHook` (through ctypes) on its
+  own message-loop thread. Windows calls it only when the foreground window
+  or its title changes.
+- `PollingTitleWatcher`: Reads a title callable on a background thread at a
+  fixed interval. It is the fallback when the hook is unavailable.
+- `ScriptedTitleWatcher`: A fake source for tests and headless runs. Titles
+  are pushed with `set_title()`.
+
+`next_title()` debounces bursts of changes, such as scrolling through song
+select. The first change after a quiet period is returned right away, so a
+single change costs no debounce delay; changes that follow within the window
+are merged and only the title that settles is returned. Every change is
+timestamped with `time.perf_counter()` when it is detected, so callers can
+measure how long they take to react to it.
+
+Use `create_watcher()` to get the best watcher for the platform.
+"""
+
+import queue
+import sys
+import threading
+import time
+
+import config
+import utils
+
+
+class TitleWatcher:
+    """
+    Base class: a queue of `(title, detected_at)` changes with debouncing.
+
+    Attributes:
+        current_title (str): The most recent title seen by the source.
+        stats (dict): `changes` delivered and `debounced` (superseded) changes.
+    """
+
+    def __init__(self, debounce_sec=None):
+        self.debounce_sec = config.TITLE_DEBOUNCE_MS / 1000.0 if debounce_sec is None else debounce_sec
+        self.current_title = None
+        self.stats = {'changes': 0, 'debounced': 0}
+        self._queue = queue.Queue()
+        self._last_change_at = float('-inf')
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def _publish(self, title):
+        if title == self.current_title:
+            return
+        self.current_title = title
+        self._queue.put((title, time.perf_counter()))
+
+    def wake(self):
+        """Makes a blocked `next_title()` return None right away."""
+        self._queue.put(None)
+
+    def next_title(self, timeout=None):
+        """
+        Blocks until the title changes (and settles, within a burst), or until
+        `wake()` is called.
+
+        Returns:
+            tuple: `(title, detected_at)` of the settled title, or None if woken
+                   or the timeout expired.
+        """
+        try:
+            change = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if change is None:
+            return None
+        # A change after a quiet period is delivered at once (unless newer ones
+        # are already queued); only the changes that follow it within the
+        # debounce window are merged.
+        in_burst = change[1] - self._last_change_at < self.debounce_sec
+        self._last_change_at = change[1]
+        while True:
+            try:
+                newer = self._queue.get(timeout=self.debounce_sec if in_burst else 0)
+            except queue.Empty:
+                break
+            if newer is None:
+                # Woken mid-burst: hand back what we have so the caller can react.
+                break
+            self.stats['debounced'] += 1
+            change = newer
+            self._last_change_at = newer[1]
+            in_burst = True
+        self.stats['changes'] += 1
+        return change
+
+
+class ScriptedTitleWatcher(TitleWatcher):
+    """A fake title source: changes happen when `set_title()` is called."""
+
+    def __init__(self, initial_title="", debounce_sec=None):
+        super().__init__(debounce_sec)
+        self._publish(initial_title)
+
+    def set_title(self, title):
+        self._publish(title)
+
+
+class PollingTitleWatcher(TitleWatcher):
+    """Polls `title_source()` on a background thread and publishes changes."""
+
+    def __init__(self, title_source, interval_sec=None, debounce_sec=None):
+        super().__init__(debounce_sec)
+        self.title_source = title_source
+        self.interval_sec = config.TITLE_POLL_INTERVAL_MS / 1000.0 if interval_sec is None else interval_sec
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._publish(self.title_source())
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_sec):
+            self._publish(self.title_source())
+
+
+class Win32TitleWatcher(TitleWatcher):
+    """Publishes title changes from a Win32 WinEvent hook."""
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    WM_QUIT = 0x0012
+
+    def __init__(self, debounce_sec=None):
+        super().__init__(debounce_sec)
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._proc_type = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                             wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        self._user32.SetWinEventHook.restype = wintypes.HANDLE
+        self._user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, self._proc_type,
+                                                 wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+        self._user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+        self._user32.GetForegroundWindow.restype = wintypes.HWND
+        self._user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+        self._user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+        self._proc = None
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise OSError(self._error)
+
+    def stop(self):
+        if self._thread_id:
+            self._user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+
+    def _window_title(self, hwnd):
+        length = self._user32.GetWindowTextLengthW(hwnd)
+        buffer = self._ctypes.create_unicode_buffer(length + 1)
+        self._user32.GetWindowTextW(hwnd, buffer, length + 1)
+        return buffer.value
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, event_thread, event_time):
+        if id_object != self.OBJID_WINDOW or id_child != 0 or not hwnd:
+            return
+        if event == self.EVENT_OBJECT_NAMECHANGE and hwnd != self._user32.GetForegroundWindow():
+            return
+        self._publish(self._window_title(hwnd))
+
+    def _run(self):
+        self._thread_id = self._kernel32.GetCurrentThreadId()
+        # The callback object must outlive the hooks, so keep it on the instance.
+        self._proc = self._proc_type(self._on_event)
+        flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+        hooks = [self._user32.SetWinEventHook(event, event, None, self._proc, 0, 0, flags)
+                 for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE)]
+        if not all(hooks):
+            for hook in filter(None, hooks):
+                self._user32.UnhookWinEvent(hook)
+            self._error = "SetWinEventHook failed"
+            self._ready.set()
+            return
+        self._publish(self._window_title(self._user32.GetForegroundWindow()))
+        self._ready.set()
+
+        msg = self._wintypes.MSG()
+        while self._user32.GetMessageW(self._ctypes.byref(msg), None, 0, 0) > 0:
+            self._user32.TranslateMessage(self._ctypes.byref(msg))
+            self._user32.DispatchMessageW(self._ctypes.byref(msg))
+        for hook in hooks:
+            self._user32.UnhookWinEvent(hook)
+
+
+def create_watcher(title_source=None):
+    """
+    Returns a started watcher: the WinEvent hook on Windows, polling otherwise.
+
+    Args:
+        title_source (callable, optional): Returns the current title. If given,
+                                           it is polled instead of hooking.
+    """
+    if title_source is None and sys.platform == 'win32':
+        try:
+            watcher = Win32TitleWatcher()
+            watcher.start()
+            print(" -> Watching window titles with a WinEvent hook.")
+            return watcher
+        except Exception as e:
+            print(f" ! WinEvent hook unavailable ({e}). Falling back to polling.")
+    watcher = PollingTitleWatcher(title_source or utils.get_active_window_title)
+    watcher.start()
+    return watcher